@@ -0,0 +1,95 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Memory benchmark of the data structure, reporting the bytes  ║
+# ║              allocated per field, register and file after elaboration.    ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from omnicores_register import RegisterBank, RegisterFile, Register, Field, SoftwareAccessType, HardwareAccessType
+
+
+
+def measure(build):
+  """Return the result of the build function and the bytes it allocated and kept."""
+  gc.collect()
+  tracemalloc.start()
+  start, _ = tracemalloc.get_traced_memory()
+  result   = build()
+  gc.collect()
+  end, _   = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return result, end - start
+
+
+
+def layout_size(component):
+  """Return the bytes of the object itself and of its attribute dictionary if any."""
+  size = sys.getsizeof(component)
+  if hasattr(component, '__dict__'):
+    size += sys.getsizeof(component.__dict__)
+  return size
+
+
+
+def build_fields(count):
+  return [Field(f"field_{index}", width=1, offset=index % 32) for index in range(count)]
+
+
+
+def build_registers(count):
+  return [Register(f"register_{index}") for index in range(count)]
+
+
+
+def build_files(count):
+  return [RegisterFile(f"file_{index}") for index in range(count)]
+
+
+
+def build_bank(file_count, register_count, field_count):
+  """Build a bank of files of registers of fields, and elaborate it."""
+  bank = RegisterBank("memory_benchmark")
+  for file_index in range(file_count):
+    file = RegisterFile(f"file_{file_index}")
+    for register_index in range(register_count):
+      register = Register(f"register_{register_index}", software_access=SoftwareAccessType.READ_WRITE, hardware_access=HardwareAccessType.READ_ONLY)
+      for field_index in range(field_count):
+        register.add_field(Field(f"field_{field_index}", width=32 // field_count))
+      file.add(register)
+    bank.add(file)
+  bank.elaborate()
+  return bank
+
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Report the memory footprint of the register bank data structure.")
+  parser.add_argument('--count',     type=int, default=100000, help="Number of standalone objects of each class")
+  parser.add_argument('--files',     type=int, default=100,    help="Number of files in the elaborated bank")
+  parser.add_argument('--registers', type=int, default=100,    help="Number of registers per file in the elaborated bank")
+  parser.add_argument('--fields',    type=int, default=8,      help="Number of fields per register in the elaborated bank")
+  args = parser.parse_args()
+
+  # Standalone objects, the total includes the attribute values
+  for name, build in (("Field", build_fields), ("Register", build_registers), ("RegisterFile", build_files)):
+    components, size = measure(lambda: build(args.count))
+    print(f"{name:<14} {size / args.count:>8.1f} bytes per object, {layout_size(components[0])} bytes of object layout")
+
+  # Elaborated bank, including the attributes set by elaboration
+  bank, size = measure(lambda: build_bank(args.files, args.registers, args.fields))
+  field_count = args.files * args.registers * args.fields
+  print(f"{'Elaborated bank':<14} {size / 2**20:>8.1f} MiB for {field_count} fields, {size / field_count:.1f} bytes per field")
+
+
+
+if __name__ == '__main__':
+  main()
@@ -14,6 +14,9 @@ from omnicores_register.register_file import RegisterFile
 from omnicores_register.register import Register
 from omnicores_register.field import Field
 from omnicores_register.component_array import ComponentArray
+from omnicores_register.diagnostics import Diagnostic, Diagnostics
+from omnicores_register.generate import generate_many
+from omnicores_register.register_map import RegisterMap
 from omnicores_register.enums import (
   SoftwareAccessType,
   HardwareAccessType,
@@ -21,4 +24,5 @@ from omnicores_register.enums import (
   HardwareReadOptions,
   SoftwareWriteBehavior,
   SoftwareReadBehavior,
+  DiagnosticSeverity,
 )
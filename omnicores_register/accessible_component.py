@@ -11,6 +11,7 @@
 
 
 from typing import Optional
+from omnicores_register.tracked_component import TrackedComponent
 from omnicores_register.enums import (
   SoftwareAccessType,
   HardwareAccessType,
@@ -22,9 +23,30 @@ from omnicores_register.enums import (
 
 
 
-class AccessibleComponent:
+class AccessibleComponent(TrackedComponent):
   """Base class holding software/hardware access attributes and associated methods."""
 
+  # Mixin of Register alongside AddressableComponent, the slots are declared by the concrete classes
+  __slots__ = ()
+  _mixin_slots = (
+    'software_access',
+    'hardware_access',
+    'hw_write_options',
+    'hw_read_options',
+    'sw_write_behavior',
+    'sw_read_behavior',
+    'sw_read_side_effect_init',
+  )
+
+  _tracked_attributes = frozenset({
+    'software_access',
+    'hardware_access',
+    'hw_write_options',
+    'hw_read_options',
+    'sw_write_behavior',
+    'sw_read_behavior',
+  })
+
   def __init__(
       self,
       software_access   : Optional[SoftwareAccessType]    = None,  # Default defined in elaboration
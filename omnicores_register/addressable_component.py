@@ -10,14 +10,33 @@
 
 
 
+import re
 from typing import Optional
 from j2gpp.filters import humanize_title
+from omnicores_register.placed_component import PlacedComponent
 
+# Placeholder of an array element index in the names of the collapsed array elements of the paginated documentation
+element_index_token = re.compile(r'\{index\d+\}')
 
 
-class AddressableComponent:
+
+class AddressableComponent(PlacedComponent):
   """Base class for addressable components like register and register file."""
 
+  __slots__ = (
+    'name',
+    'title',
+    'description',
+    'hierarchical_name',
+    'offset',
+    'align',
+    'sw_struct_padding',
+    'is_array_element',
+    'array_index',
+  )
+
+  _tracked_attributes = frozenset({'name', 'offset', 'align'})
+
   def __init__(
       self,
       name        : str,
@@ -49,7 +68,7 @@ class AddressableComponent:
       # Convert underscore array-index suffix to bracket notation in all parts
       if '_' in part_name:
         base, _, suffix = part_name.rpartition('_')
-        if suffix.isdigit():
+        if suffix.isdigit() or element_index_token.fullmatch(suffix):
           part_name = f"{base}[{suffix}]"
       if index < len(parts) - 1:
         breadcrumbs.append({'name': part_name, 'anchor': '#file-' + prefix})
@@ -11,27 +11,49 @@
 
 
 
-import copy
 from omnicores_register.register import Register
 from omnicores_register.register_file import RegisterFile
+from omnicores_register.placed_component import PlacedComponent
 
 
 
-class ComponentArray:
+class ComponentArray(PlacedComponent):
   """Wraps a prototype component and expands it into an array of N instances."""
 
+  __slots__ = (
+    'prototype',
+    'length',
+    '_stride',
+    'sw_struct_padding',
+    '_expanded_registers',
+    '_expanded_files',
+    '_needs_wrapper',
+    '_wrapper_pad_words',
+  )
+
+  # Initial values of the slots, the element views are created on first access
+  _slot_defaults = PlacedComponent._slot_defaults | {
+    '_expanded_registers' : None,
+    '_expanded_files'     : None,
+  }
+
+  _tracked_attributes = frozenset({'prototype', 'length', '_stride'})
+
   def __init__(self, prototype, length:int, stride:int=None):
     self.prototype = prototype
     self.length     = length
     self._stride   = stride
 
+    # The prototype belongs to the array for change tracking
+    prototype.parent = self
+
     # Absolute byte address of the first element (set during elaboration)
     self.address = None
 
     # Firmware struct padding before the array
     self.sw_struct_padding = 0
 
-    # Cached expanded clones (populated on first access after elaboration)
+    # Cached element views (populated on first access after elaboration)
     self._expanded_registers = None
     self._expanded_files     = None
 
@@ -39,6 +61,13 @@ class ComponentArray:
     self._needs_wrapper = None
     self._wrapper_pad_words = 0
 
+  def __getstate__(self):
+    # Copies create their own element views
+    state = super().__getstate__()
+    state.pop('_expanded_registers', None)
+    state.pop('_expanded_files',     None)
+    return state
+
   # Proxy attributes that elaboration reads from the component
   @property
   def offset(self):
@@ -91,60 +120,20 @@ class ComponentArray:
       self._wrapper_pad_words = (self.stride - self.element_size) // 4
     return self._wrapper_pad_words
 
-  def _shift_subtree_addresses(self, component, delta):
-    """Recursively add delta to every component's address in the subtree."""
-    component.address += delta
-    if isinstance(component, RegisterFile):
-      for child in component.components:
-        self._shift_subtree_addresses(child, delta)
-
-  def _fixup_descendant_hierarchical_names(self, component, old_prefix, new_prefix):
-    """Recursively replace the prototype name prefix with the clone name prefix in all descendants."""
-    if isinstance(component, RegisterFile):
-      for child in component.components:
-        if child.hierarchical_name:
-          child.hierarchical_name = child.hierarchical_name.replace(old_prefix, new_prefix, 1)
-        self._fixup_descendant_hierarchical_names(child, old_prefix, new_prefix)
+  def _invalidate_expanded(self):
+    """Drop the cached element views and layout after the array or its prototype changed."""
+    self._expanded_registers = None
+    self._expanded_files     = None
+    self._needs_wrapper      = None
 
   def _create_and_get_expanded(self):
-    """Create N clones of the prototype with computed addresses and hierarchical names."""
+    """Create the N element views of the prototype, deriving their addresses and hierarchical names."""
     if self._expanded_registers is not None:
       return self._expanded_registers, self._expanded_files
-
-    expanded_registers = []
-    expanded_files     = []
-
-    for index in range(self.length):
-      clone = copy.deepcopy(self.prototype)
-
-      element_address = self.address + index * self.stride
-
-      # Apply the array element address to the clone and shift its subtree
-      offset_from_prototype = element_address - self.prototype.address
-      self._shift_subtree_addresses(clone, offset_from_prototype)
-
-      # The hierarchical name suffix uses underscore for array index
-      if index == 0:
-        index_suffix = "_0"
-      else:
-        index_suffix = f"_{index}"
-
-      if isinstance(clone, Register):
-        clone.is_array_element = True
-        clone.array_index = index
-        clone.hierarchical_name = self.prototype.hierarchical_name + index_suffix
-        expanded_registers.append(clone)
-      else:
-        clone.is_array_element = True
-        clone.array_index = index
-        old_prefix = self.prototype.hierarchical_name
-        clone.hierarchical_name = self.prototype.hierarchical_name + index_suffix
-        self._fixup_descendant_hierarchical_names(clone, old_prefix, clone.hierarchical_name)
-        expanded_files.append(clone)
-
-    self._expanded_registers = expanded_registers
-    self._expanded_files     = expanded_files
-    return expanded_registers, expanded_files
+    # Local import, the views derive from the component classes including this one
+    from omnicores_register.component_view import create_element_views
+    self._expanded_registers, self._expanded_files = create_element_views(self, self.prototype)
+    return self._expanded_registers, self._expanded_files
 
   def get_expanded_registers(self):
     registered_list, _ = self._create_and_get_expanded()
@@ -156,37 +145,39 @@ class ComponentArray:
     for file in files_list:
       yield file
 
-  def get_files_deep(self):
+  def iter_files_deep(self):
     _, files_list = self._create_and_get_expanded()
-    collected = []
     for file in files_list:
-      collected.append(file)
-      collected.extend(file.get_files_deep())
-    return collected
+      yield file
+      yield from file.iter_files_deep()
 
-  def get_registers_deep(self):
+  def iter_registers_deep(self):
     registers_list, files_list = self._create_and_get_expanded()
-    collected = []
-    for register in registers_list:
-      collected.append(register)
+    yield from registers_list
     for file in files_list:
-      collected.extend(file.get_registers_deep())
-    return collected
+      yield from file.iter_registers_deep()
 
-  def get_files_postorder(self):
+  def iter_files_postorder(self):
     _, files_list = self._create_and_get_expanded()
-    collected = []
     for file in files_list:
-      collected.extend(file.get_files_postorder())
-      collected.append(file)
-    return collected
+      yield from file.iter_files_postorder()
+      yield file
 
-  def get_components_deep(self):
+  def iter_components_deep(self):
     registers_list, files_list = self._create_and_get_expanded()
-    collected = []
-    for component in registers_list:
-      collected.append(component)
+    yield from registers_list
     for component in files_list:
-      collected.append(component)
-      collected.extend(component.get_components_deep())
-    return collected
+      yield component
+      yield from component.iter_components_deep()
+
+  def get_files_deep(self):
+    return list(self.iter_files_deep())
+
+  def get_registers_deep(self):
+    return list(self.iter_registers_deep())
+
+  def get_files_postorder(self):
+    return list(self.iter_files_postorder())
+
+  def get_components_deep(self):
+    return list(self.iter_components_deep())
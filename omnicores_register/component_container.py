@@ -12,55 +12,110 @@
 
 
 from omnicores_register.enums import PackingPolicy, UNSPECIFIED
+from omnicores_register.tracked_component import TrackedComponent
+from omnicores_register.placed_component import invalidate_layout
 
 
 
-class ComponentContainer:
+class ComponentContainer(TrackedComponent):
   """Base class for register bank and register files which can both contain registers and sub-files."""
 
+  # Mixin of RegisterFile alongside AddressableComponent, the slots are declared by the concrete classes
+  __slots__ = ()
+  _mixin_slots = ('name', 'components', 'packing', '_traversal_cache')
+
+  _tracked_attributes = frozenset({'packing', 'components'})
+
   def __init__(self, name:str, packing:PackingPolicy=UNSPECIFIED):
     self.name = name
     # Shared list before elaboration to preserve insertion order of registers and files
     self.components = []
     # Packing policy for this container and its children
     self.packing = packing
+    # Memoized traversals of the elaborated hierarchy, with the epoch they are valid for
+    self._traversal_cache = None
+
+  def __getstate__(self):
+    # Copies walk their own hierarchy
+    state = super().__getstate__()
+    state['_traversal_cache'] = None
+    return state
 
   def add(self, component):
     """Add a Register, RegisterFile, or ComponentArray to this container."""
     self.components.append(component)
+    component.parent = self
+    component.mark_dirty()
+    # The component resolves its absolute address from its new parent
+    invalidate_layout(self)
 
   # Tree traversal methods delegate to the standalone traversal module.
   # Local imports break the circular dependency: traversal imports RegisterFile
   # which imports ComponentContainer, which would otherwise form a cycle.
+  # The traversals of elaborated containers are memoized until the next change.
 
   def get_files_deep(self):
-    from omnicores_register.traversal import collect_files_deep
-    return collect_files_deep(self)
+    from omnicores_register.traversal import iter_files_deep, memoized_list
+    return memoized_list(self, iter_files_deep)
 
   def get_registers_deep(self):
-    from omnicores_register.traversal import collect_registers_deep
-    return collect_registers_deep(self)
+    from omnicores_register.traversal import iter_registers_deep, memoized_list
+    return memoized_list(self, iter_registers_deep)
 
   def get_files_postorder(self):
-    from omnicores_register.traversal import collect_files_postorder
-    return collect_files_postorder(self)
+    from omnicores_register.traversal import iter_files_postorder, memoized_list
+    return memoized_list(self, iter_files_postorder)
 
   def get_components_deep(self):
-    from omnicores_register.traversal import collect_components_deep
-    return collect_components_deep(self)
+    from omnicores_register.traversal import iter_components_deep, memoized_list
+    return memoized_list(self, iter_components_deep)
 
   def get_array_prototype_registers(self):
-    from omnicores_register.traversal import collect_array_prototype_registers
-    return collect_array_prototype_registers(self)
+    from omnicores_register.traversal import iter_array_prototype_registers, memoized_list
+    return memoized_list(self, iter_array_prototype_registers)
 
   def get_array_prototype_files(self):
-    from omnicores_register.traversal import collect_array_prototype_files
-    return collect_array_prototype_files(self)
+    from omnicores_register.traversal import iter_array_prototype_files, memoized_list
+    return memoized_list(self, iter_array_prototype_files)
 
   def get_arrays_deep(self):
-    from omnicores_register.traversal import collect_arrays_deep
-    return collect_arrays_deep(self)
+    from omnicores_register.traversal import iter_arrays_deep, memoized_list
+    return memoized_list(self, iter_arrays_deep)
 
   def get_register_macros_ordered(self):
-    from omnicores_register.traversal import collect_register_macros_ordered
-    return collect_register_macros_ordered(self)
+    from omnicores_register.traversal import iter_register_macros_ordered, memoized_list
+    return memoized_list(self, iter_register_macros_ordered)
+
+  # Generator variants, to stream or stop early without building the lists
+
+  def iter_files_deep(self):
+    from omnicores_register.traversal import iter_files_deep, memoized_iter
+    return memoized_iter(self, iter_files_deep)
+
+  def iter_registers_deep(self):
+    from omnicores_register.traversal import iter_registers_deep, memoized_iter
+    return memoized_iter(self, iter_registers_deep)
+
+  def iter_files_postorder(self):
+    from omnicores_register.traversal import iter_files_postorder, memoized_iter
+    return memoized_iter(self, iter_files_postorder)
+
+  def iter_components_deep(self):
+    from omnicores_register.traversal import iter_components_deep, memoized_iter
+    return memoized_iter(self, iter_components_deep)
+
+  def iter_array_prototype_registers(self):
+    from omnicores_register.traversal import iter_array_prototype_registers, memoized_iter
+    return memoized_iter(self, iter_array_prototype_registers)
+
+  def iter_array_prototype_files(self):
+    from omnicores_register.traversal import iter_array_prototype_files, memoized_iter
+    return memoized_iter(self, iter_array_prototype_files)
+
+  def iter_arrays_deep(self):
+    from omnicores_register.traversal import iter_arrays_deep, memoized_iter
+    return memoized_iter(self, iter_arrays_deep)
+
+  def iter_register_macros_ordered(self):
+    from omnicores_register.traversal import iter_register_macros_ordered, memoized_iter
+    return memoized_iter(self, iter_register_macros_ordered)
@@ -0,0 +1,138 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Lightweight views presenting the prototype of a component    ║
+# ║              array as its elements, sharing the prototype configuration   ║
+# ║              and deriving the address and name of each element.          ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from omnicores_register.register import Register
+from omnicores_register.register_file import RegisterFile
+from omnicores_register.component_array import ComponentArray
+
+
+
+class ComponentView:
+  """Read-only view of a prototype component as an array element, or as a descendant of an element."""
+
+  # Mixin alongside the component classes, the slots are declared by the concrete views
+  __slots__ = ()
+  _mixin_slots = ('_component', '_element', '_array', '_index', '_children')
+
+  def __new__(cls, *args, **kwargs):
+    # The view slots of the component attributes stay empty to delegate to the prototype
+    return object.__new__(cls)
+
+  def __init__(self, component, element=None, array=None, index=None):
+    object.__setattr__(self, '_component', component)
+    # The element view at the root of this view's subtree, and its position in the array
+    object.__setattr__(self, '_element',   element if element is not None else self)
+    object.__setattr__(self, '_array',     array)
+    object.__setattr__(self, '_index',     index)
+    # Views of the sub-components, created on first access
+    object.__setattr__(self, '_children',  None)
+
+  def __getattr__(self, name):
+    # Configuration and elaboration results are shared with the prototype
+    return getattr(self._component, name)
+
+  def __setattr__(self, name, value):
+    raise AttributeError(f"Cannot set '{name}' on an element of array '{self._element._array.prototype.name}', configure the prototype instead.")
+
+  def __repr__(self):
+    return f"<{type(self).__name__} {self.hierarchical_name}>"
+
+  @property
+  def _delta(self):
+    """Byte offset between the addresses of the viewed components and their prototypes."""
+    element = self._element
+    return element._array.address + element._index * element._array.stride - element._component.address
+
+  @property
+  def address(self):
+    return self._component.address + self._delta
+
+  @property
+  def hierarchical_name(self):
+    element = self._element
+    # The hierarchical name suffix uses underscore for array index
+    if self is element:
+      return f"{element._array.prototype.hierarchical_name}_{element._index}"
+    # Descendants replace the prototype name prefix with the element name prefix
+    return element.hierarchical_name + self._component.hierarchical_name[len(element._component.hierarchical_name):]
+
+  @property
+  def is_array_element(self):
+    return self is self._element or self._component.is_array_element
+
+  @property
+  def array_index(self):
+    return self._index if self is self._element else self._component.array_index
+
+
+
+class RegisterView(ComponentView, Register):
+  """View of a register prototype as an array element, or as a register of a file array element."""
+
+  __slots__ = ComponentView._mixin_slots
+
+
+
+class RegisterFileView(ComponentView, RegisterFile):
+  """View of a register file prototype as an array element, or as a sub-file of a file array element."""
+
+  __slots__ = ComponentView._mixin_slots
+
+  @property
+  def components(self):
+    if self._children is None:
+      object.__setattr__(self, '_children', [create_view(component, self._element) for component in self._component.components])
+    return self._children
+
+
+
+class ComponentArrayView(ComponentView, ComponentArray):
+  """View of an array nested in a file array prototype, as a sub-array of a file array element."""
+
+  __slots__ = ComponentView._mixin_slots
+
+  @property
+  def prototype(self):
+    return create_view(self._component.prototype, self._element)
+
+  @property
+  def needs_wrapper(self):
+    return self._component.needs_wrapper
+
+  @property
+  def wrapper_pad_words(self):
+    return self._component.wrapper_pad_words
+
+  def _create_and_get_expanded(self):
+    """Create the N element views of the nested prototype within the element of the enclosing array."""
+    if self._children is None:
+      object.__setattr__(self, '_children', create_element_views(self, self._component.prototype))
+    return self._children
+
+
+
+def create_view(component, element):
+  """Return the view of a prototype component within an array element."""
+  if isinstance(component, Register):
+    return RegisterView(component, element)
+  if isinstance(component, RegisterFile):
+    return RegisterFileView(component, element)
+  return ComponentArrayView(component, element)
+
+
+
+def create_element_views(array, prototype):
+  """Return the lists of register and file element views of an array of the prototype."""
+  if isinstance(prototype, Register):
+    return [RegisterView(prototype, array=array, index=index) for index in range(array.length)], []
+  return [], [RegisterFileView(prototype, array=array, index=index) for index in range(array.length)]
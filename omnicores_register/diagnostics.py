@@ -0,0 +1,145 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Diagnostics collected by the validation, with the component  ║
+# ║              and address of each entry, and their terminal renderer.      ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import sys
+from functools import total_ordering
+from typing import Optional
+from omnicores_register.utils import format_error, format_warning
+from omnicores_register.enums import DiagnosticSeverity
+
+
+
+class Diagnostic:
+  """Entry of the diagnostics, identified by a stable code for the tools processing the results."""
+
+  __slots__ = ('code', 'severity', 'message', 'path', 'address')
+
+  def __init__(
+      self,
+      code     : str,
+      severity : DiagnosticSeverity,
+      message  : str,
+      path     : Optional[str] = None,  # Hierarchical name of the component, with the field name after a dot
+      address  : Optional[int] = None,  # Address of the register or file
+    ):
+    self.code     = code
+    self.severity = severity
+    self.message  = message
+    self.path     = path
+    self.address  = address
+
+  def __repr__(self):
+    return f"<Diagnostic {self.severity!r} {self.code} {self.path}>"
+
+  def as_dict(self):
+    """Return the entry as a dictionary of plain values, for machine-readable reports."""
+    return {
+      'code'     : self.code,
+      'severity' : self.severity.name.lower(),
+      'message'  : self.message,
+      'path'     : self.path,
+      'address'  : self.address,
+    }
+
+
+
+class DiagnosticLimitReached(Exception):
+  """Raised by the diagnostics when the maximum number of errors is reached, to stop the validation early."""
+
+
+
+@total_ordering
+class Diagnostics:
+  """Collection of the diagnostics of a validation run."""
+
+  def __init__(self, max_errors:Optional[int]=None):
+    self.entries     = []
+    self.max_errors  = max_errors
+    self.error_count = 0
+    # Set when an error past the maximum number of errors was discarded, stopping the validation
+    self.truncated   = False
+
+  def add(self, code:str, severity:DiagnosticSeverity, message:str, path:Optional[str]=None, address:Optional[int]=None):
+    if severity == DiagnosticSeverity.ERROR:
+      if self.max_errors is not None and self.error_count >= self.max_errors:
+        self.truncated = True
+        raise DiagnosticLimitReached()
+      self.error_count += 1
+    self.entries.append(Diagnostic(code, severity, message, path, address))
+
+  def extend(self, entries):
+    """Add the entries collected separately, stopping at the maximum number of errors like the entries added one by one."""
+    for entry in entries:
+      self.add(entry.code, entry.severity, entry.message, entry.path, entry.address)
+
+  def error(self, code:str, message:str, path:Optional[str]=None, address:Optional[int]=None):
+    self.add(code, DiagnosticSeverity.ERROR, message, path, address)
+
+  def warning(self, code:str, message:str, path:Optional[str]=None, address:Optional[int]=None):
+    self.add(code, DiagnosticSeverity.WARNING, message, path, address)
+
+  @property
+  def errors(self):
+    return [entry for entry in self.entries if entry.severity == DiagnosticSeverity.ERROR]
+
+  @property
+  def warnings(self):
+    return [entry for entry in self.entries if entry.severity == DiagnosticSeverity.WARNING]
+
+  # The diagnostics stand for their error count, like the validation used to
+  # return, the entries are iterated or read from the entries list
+  def __index__(self):
+    return self.error_count
+
+  def __int__(self):
+    return self.error_count
+
+  def __eq__(self, other):
+    if isinstance(other, Diagnostics):
+      other = other.error_count
+    return self.error_count == other if isinstance(other, int) else NotImplemented
+
+  def __lt__(self, other):
+    if isinstance(other, Diagnostics):
+      other = other.error_count
+    return self.error_count < other if isinstance(other, int) else NotImplemented
+
+  def __bool__(self):
+    return self.error_count > 0
+
+  def __len__(self):
+    return self.error_count
+
+  def __iter__(self):
+    return iter(self.entries)
+
+  def __repr__(self):
+    return f"<Diagnostics {self.error_count} errors, {len(self.entries) - self.error_count} warnings>"
+
+  def as_dicts(self):
+    """Return the entries as dictionaries of plain values, for machine-readable reports."""
+    return [entry.as_dict() for entry in self.entries]
+
+
+
+def render_diagnostics(diagnostics:Diagnostics):
+  """Print the diagnostics to the terminal, with a single buffered write for each output stream."""
+  warnings = [format_warning(entry.message) for entry in diagnostics.entries if entry.severity == DiagnosticSeverity.WARNING]
+  errors   = [format_error(entry.message)   for entry in diagnostics.entries if entry.severity == DiagnosticSeverity.ERROR]
+  if diagnostics.truncated:
+    errors.append(format_error(f"Validation stopped after {diagnostics.error_count} errors."))
+  if warnings:
+    sys.stdout.write("\n".join(warnings) + "\n")
+    sys.stdout.flush()
+  if errors:
+    sys.stderr.write("\n".join(errors) + "\n")
+    sys.stderr.flush()
@@ -0,0 +1,88 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Layout of the paginated documentation. Each top-level file   ║
+# ║              or array has its own page, and the elements of the arrays    ║
+# ║              are documented once with placeholder indexes, instantiated   ║
+# ║              by the browser for the element selected.                     ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from typing import Optional
+from omnicores_register.register import Register
+from omnicores_register.component_array import ComponentArray
+from omnicores_register.component_view import RegisterView, RegisterFileView, ComponentArrayView
+from omnicores_register.addressable_component import element_index_token
+from omnicores_register.traversal import top_level_component
+
+
+
+class ElementIndexPlaceholder(int):
+  """Index of the element documented for a whole array, placed at the first element and formatted as the token replaced by the index of the selected element."""
+
+  def __new__(cls, depth:int):
+    index = super().__new__(cls, 0)
+    # Nested arrays have their own token, replaced when their element is selected
+    index.token = f"{{index{depth}}}"
+    return index
+
+  def __str__(self):
+    return self.token
+
+  def __format__(self, format_spec):
+    return self.token
+
+
+
+def element_placeholder(array):
+  """Return the view of the prototype of an array as the element with a placeholder index."""
+  prototype = array._component.prototype if isinstance(array, ComponentArrayView) else array.prototype
+  index     = ElementIndexPlaceholder(len(element_index_token.findall(array.prototype.hierarchical_name)))
+  if isinstance(prototype, Register):
+    return RegisterView(prototype, array=array, index=index)
+  return RegisterFileView(prototype, array=array, index=index)
+
+
+
+class DocumentationPages:
+  """Pages of the paginated documentation of a register bank, and the page rendered, passed to the documentation templates."""
+
+  def __init__(self, register_bank, page_index:Optional[int]=None):
+    register_bank_name = f'{register_bank.name}__register_bank'
+    self.register_bank = register_bank
+    self.index         = f'{register_bank_name}.html'
+    self.stylesheet    = f'{register_bank_name}.documentation.css'
+    self.script        = f'{register_bank_name}.documentation.js'
+    # One page per top-level file or array, the top-level registers are on the index page
+    self.pages         = [component for component in register_bank.components if not isinstance(component, Register)]
+    self.page_files    = {id(component): f'{register_bank_name}.{self.name_of(component)}.html' for component in self.pages}
+    self.page          = self.pages[page_index] if page_index is not None else None
+    self.file          = self.page_files[id(self.page)] if self.page is not None else self.index
+    # Components detailed on the rendered page
+    self.components    = [self.page] if self.page is not None else [component for component in register_bank.components if isinstance(component, Register)]
+
+  def name_of(self, component) -> str:
+    """Name of a component, the arrays are named after their prototype."""
+    return component.prototype.name if isinstance(component, ComponentArray) else component.name
+
+  def page_of(self, component) -> str:
+    """File of the page documenting a component."""
+    return self.page_files.get(id(top_level_component(self.register_bank, component)), self.index)
+
+  def anchor_of(self, component) -> str:
+    """Link to the section of a component, from any page."""
+    if isinstance(component, ComponentArray):
+      return f"{self.page_of(component)}#array-{component.prototype.hierarchical_name}"
+    if isinstance(component, Register):
+      return f"{self.page_of(component)}#register-{component.hierarchical_name}"
+    return f"{self.page_of(component)}#file-{component.hierarchical_name}"
+
+  def is_placeholder(self, component) -> bool:
+    """Whether a component belongs to an element with a placeholder index, its addresses are shifted with the selected element."""
+    return element_index_token.search(component.hierarchical_name) is not None
+
+  element_placeholder = staticmethod(element_placeholder)
@@ -10,11 +10,17 @@
 
 
 
+import io
+import pickle
 from math import ceil, log2
+from concurrent.futures import ProcessPoolExecutor
 from omnicores_register.utils import next_power_of_two
 from omnicores_register.register_file import RegisterFile
 from omnicores_register.register import Register
 from omnicores_register.component_array import ComponentArray
+from omnicores_register.lookup import build_lookup_indexes
+from omnicores_register.traversal import invalidate_traversals
+from omnicores_register.field_table import FieldTable, require_numpy, resolve_field_padding
 from omnicores_register.enums import (
   SoftwareAccessType,
   HardwareAccessType,
@@ -40,139 +46,226 @@ from omnicores_register.enums import (
 
 
 
-def _elaborate_inherited_settings(container, inherited_packing):
-  """Resolve the packing policy through the container hierarchy."""
-  # Resolve this container's effective packing for its children
-  resolved = container.packing
-  if resolved is UNSPECIFIED:
-    resolved = inherited_packing
-  if resolved is UNSPECIFIED:
-    resolved = PackingPolicy.DENSE
-  # For RegisterFiles, set their own packing attribute
-  if isinstance(container, RegisterFile):
-    container.packing = resolved
-  # Iterate over sub-components
-  for component in container.components:
-    if isinstance(component, ComponentArray):
-      # Resolve packing for the array prototype if it's a file
-      if isinstance(component.prototype, RegisterFile):
-        file_packing = component.prototype.packing
-        if file_packing is UNSPECIFIED:
-          file_packing = resolved
-        if file_packing is UNSPECIFIED:
-          file_packing = PackingPolicy.DENSE
-        component.prototype.packing = file_packing
-        _elaborate_inherited_settings(component.prototype, file_packing)
-    elif isinstance(component, RegisterFile):
-      file_packing = component.packing
-      if file_packing is UNSPECIFIED:
-        file_packing = resolved
-      if file_packing is UNSPECIFIED:
-        file_packing = PackingPolicy.DENSE
-      component.packing = file_packing
-      _elaborate_inherited_settings(component, file_packing)
-
-
-
-def _shift_addresses(container, delta):
-  """Add delta to every component's absolute address in the subtree."""
-  for component in container.components:
-    component.address += delta
-    if isinstance(component, RegisterFile):
-      _shift_addresses(component, delta)
+class ElaborationPass:
+  """Base class of the elaboration passes, instantiated for each elaboration run."""
 
+  # Key of the touched components counter of the pass
+  name = None
 
+  def __init__(self, bank, stats):
+    self.bank  = bank
+    self.stats = stats
 
-def _elaborate_addresses(container, container_base):
-  """Recursively resolve absolute addresses of registers and files within a container."""
-  running_offset = 0
-  # Iterate over components of this container
-  for component in container.components:
+  def end(self):
+    """Called once the walk running the pass is complete."""
+
+
+
+class StructurePass(ElaborationPass):
+  """Elaboration pass fused in the structure walk, which visits the components in address order."""
+
+  def enter(self, component, parent):
+    """Called pre-order on a component, return True to visit its subtree and be called on leaving it."""
+    return False
+
+  def leave(self, component, parent):
+    """Called post-order on the components entered by the pass."""
+
+
+
+class ComponentPass(ElaborationPass):
+  """Elaboration pass fused in the component walk, which visits registers pre-order and containers post-order."""
+
+  def visit_register(self, register):
+    """Called on each regular register and array prototype register."""
+
+  def leave_container(self, container):
+    """Called post-order on the bank, the regular files and the file array prototypes."""
+
+
+
+class _InheritedSettingsPass(StructurePass):
+  """Resolve the packing policy through the changed subtrees of the container hierarchy."""
+
+  name = 'inherited_settings'
+
+  def __init__(self, bank, stats):
+    super().__init__(bank, stats)
+    stats[self.name] += 1
+    # Resolve the bank's effective packing for its children
+    resolved = bank.packing
+    if resolved is UNSPECIFIED:
+      resolved = PackingPolicy.DENSE
+    # Resolved packing of the containers being visited
+    self.packings = [resolved]
+
+  def _resolve_packing(self, file, inherited):
+    """Resolve the packing of a file from its configuration, flagging the file for a new layout if it changed."""
+    file_packing = file._configured_value('packing')
+    if file_packing is UNSPECIFIED:
+      file_packing = inherited
+    if file.packing is not file_packing:
+      file._resolve('packing', file_packing)
+      file.mark_dirty()
+    return file_packing
+
+  def enter(self, component, parent):
+    # Unchanged subtrees already hold their resolved packing, unless the
+    # packing they inherit changed
+    if isinstance(component, ComponentArray):
+      if isinstance(component.prototype, RegisterFile):
+        self._resolve_packing(component.prototype, self.packings[-1])
+      if not component._dirty_subtree:
+        return False
+      self.packings.append(self.packings[-1])
+      return True
+    if isinstance(component, RegisterFile):
+      file_packing = self._resolve_packing(component, self.packings[-1])
+      if not component._dirty_subtree:
+        return False
+      self.stats[self.name] += 1
+      self.packings.append(file_packing)
+      return True
+    return False
+
+  def leave(self, component, parent):
+    self.packings.pop()
+
+
+
+class _AddressesPass(StructurePass):
+  """Resolve the relative addresses of the changed or moved registers and files."""
+
+  name = 'addresses'
+
+  def __init__(self, bank, stats):
+    super().__init__(bank, stats)
+    # Absolute base address and running offset of the containers being visited
+    self.frames = [[0, 0]]
+
+  def _end_file(self, file):
+    """Size a file once its components are placed, return the shift applied by its power-of-two alignment."""
+    base_address, dense_size = self.frames.pop()
+    # Compute the file region size based on the packing policy
+    if file.packing == PackingPolicy.POWER_OF_TWO:
+      pow2_size = next_power_of_two(dense_size)
+      file.size = pow2_size
+      # Align the file base address to its size
+      # We need to resolve the children to know the size of the file for the
+      # alignment, the children are placed relative to the file so they follow
+      # its shift.
+      misalignment = base_address % pow2_size
+      if misalignment != 0:
+        return pow2_size - misalignment
+    else:
+      file.size = dense_size
+    return 0
+
+  def enter(self, component, parent):
+    # Array prototypes are laid out from the base address of their array
+    if isinstance(parent, ComponentArray):
+      if isinstance(component, RegisterFile):
+        self.frames.append([parent.address, 0])
+        return True
+      return False
+    frame = self.frames[-1]
     # If the designer specified an explicit offset for this component,
     # jump the running offset to that position within the parent container.
     if component.offset is not None:
-      running_offset = component.offset
+      frame[1] = component.offset
     # The alignment modulo applies on the offset
     if component.align is not None:
-      running_offset = ceil(running_offset / component.align) * component.align
-    # The absolute address is the container base plus the relative offset
-    component.address = container_base + running_offset
+      frame[1] = ceil(frame[1] / component.align) * component.align
+    placement_address = frame[0] + frame[1]
+    # An unchanged component placed at the same address keeps the layout of the
+    # last elaboration, skip its subtree and only advance past its region.
+    if not component._dirty_subtree and component._placement_address == placement_address and component._placement_offset == frame[1]:
+      if isinstance(component, ComponentArray):
+        frame[1] = component.relative_address + component.region_size
+      elif isinstance(component, RegisterFile):
+        frame[1] = component.relative_address + component.size
+      else:
+        frame[1] += 4
+      return False
+    self.stats[self.name] += 1
+    component._placement_address = placement_address
+    component._placement_offset  = frame[1]
+    component._moved             = True
+    # The address is relative to the container base
+    component.relative_address = frame[1]
     # TODO: check that the address is aligned to the register width
-    # Handle array of registers or files
     if isinstance(component, ComponentArray):
-      prototype = component.prototype
-      if isinstance(prototype, RegisterFile):
-        # Elaborate the prototype to determine its internal size
-        end_address = _elaborate_addresses(prototype, component.address)
-        dense_size = end_address - component.address
-        if prototype.packing == PackingPolicy.POWER_OF_TWO:
-          pow2_size = next_power_of_two(dense_size)
-          prototype.size = pow2_size
-          # Again we need to realign and therefore shift components
-          misalignment = component.address % pow2_size
-          if misalignment != 0:
-            delta = pow2_size - misalignment
-            component.address += delta
-            _shift_addresses(prototype, delta)
-            running_offset += delta
-        else:
-          prototype.size = dense_size
-        # If stride not specified, default to the prototype size
-        if component._stride is None:
-          component._stride = prototype.size
-        running_offset += component.region_size
-      elif isinstance(prototype, Register):
-        if component._stride is None:
-          component._stride = 4
-        running_offset += component.region_size
-      # Sync prototype base address after any alignment shifts
-      prototype.address = component.address
-    # Recursively resolve the addresses for sub-files
-    elif isinstance(component, RegisterFile):
-      # The sub-file components offsets are relative to this file's base address
-      end_address = _elaborate_addresses(component, component.address)
-      # Compute the file region size based on the packing policy
-      dense_size = end_address - component.address
-      if component.packing == PackingPolicy.POWER_OF_TWO:
-        pow2_size = next_power_of_two(dense_size)
-        component.size = pow2_size
-        # Align the file base address to its size
-        # We need to resolve the children to know the size of the file for the
-        # alignment, but then we need to go back to the children to shift their
-        # addresses.
-        misalignment = component.address % pow2_size
-        if misalignment != 0:
-          delta = pow2_size - misalignment
-          component.address += delta
-          _shift_addresses(component, delta)
-          running_offset += delta
-      else:
-        component.size = dense_size
-      running_offset += component.size
+      component.prototype._moved = True
+      # The prototype is placed as the first element of the array
+      if component.prototype.relative_address != 0:
+        component.prototype.relative_address = 0
+      # The element views are rebuilt from the new layout on next access
+      component._invalidate_expanded()
+      return True
+    # The sub-file components offsets are relative to this file's base address
+    if isinstance(component, RegisterFile):
+      self.frames.append([placement_address, 0])
+      return True
     # Each register occupies 4 bytes (32-bit word alignment)
-    elif isinstance(component, Register):
-      running_offset += 4
-  return container_base + running_offset
+    frame[1] += 4
+    return False
+
+  def leave(self, component, parent):
+    if isinstance(parent, ComponentArray):
+      # The prototype alignment shifts the whole array
+      delta = self._end_file(component)
+      parent.relative_address += delta
+      self.frames[-1][1]      += delta
+    elif isinstance(component, ComponentArray):
+      # If stride not specified, it defaults to the prototype size
+      self.frames[-1][1] += component.region_size
+    else:
+      delta = self._end_file(component)
+      component.relative_address += delta
+      self.frames[-1][1]         += delta + component.size
 
 
 
-def _elaborate_hierarchical_names(container, parent_prefix):
-  """Recursively compute hierarchical names for all registers and files."""
-  for component in container.components:
-    if isinstance(component, ComponentArray):
-      prototype = component.prototype
+class _HierarchicalNamesPass(StructurePass):
+  """Compute hierarchical names for the changed registers and files, or all of them below a renamed container."""
+
+  name = 'hierarchical_names'
+
+  def __init__(self, bank, stats):
+    super().__init__(bank, stats)
+    # Name prefix and renamed flag of the containers being visited
+    self.frames = [("", False)]
+
+  def enter(self, component, parent):
+    parent_prefix, renamed = self.frames[-1]
+    if isinstance(parent, ComponentArray):
+      prototype_renamed = renamed or component._dirty
       # Compute the base hierarchical name for the prototype
-      prefix = f"{parent_prefix}__{prototype.name}" if parent_prefix else prototype.name
-      prototype.hierarchical_name = prefix
-      # If the prototype is a file, recurse into its children
-      if isinstance(prototype, RegisterFile):
-        _elaborate_hierarchical_names(prototype, prefix)
-    elif isinstance(component, RegisterFile):
       prefix = f"{parent_prefix}__{component.name}" if parent_prefix else component.name
+      if prototype_renamed:
+        self.stats[self.name] += 1
+        component.hierarchical_name = prefix
+      # If the prototype is a file, visit its children
+      if isinstance(component, RegisterFile):
+        self.frames.append((prefix, prototype_renamed))
+        return True
+      return False
+    if not (renamed or component._dirty_subtree):
+      return False
+    if isinstance(component, ComponentArray):
+      self.frames.append((parent_prefix, renamed))
+      return True
+    prefix = f"{parent_prefix}__{component.name}" if parent_prefix else component.name
+    if renamed or component._dirty:
+      self.stats[self.name] += 1
       component.hierarchical_name = prefix
-      _elaborate_hierarchical_names(component, prefix)
-    elif isinstance(component, Register):
-      component.hierarchical_name = f"{parent_prefix}__{component.name}" if parent_prefix else component.name
+    if isinstance(component, RegisterFile):
+      self.frames.append((prefix, renamed or component._dirty))
+      return True
+    return False
+
+  def leave(self, component, parent):
+    self.frames.pop()
 
 
 
@@ -184,7 +277,7 @@ def _resolve_field_offsets(register):
       if field.align is not None:
         running_offset = ceil(running_offset / field.align) * field.align
       if field.offset is None:
-        field.offset = running_offset
+        field._resolve('offset', running_offset)
       else:
         running_offset = field.offset
       running_offset += field.width
@@ -192,12 +285,15 @@ def _resolve_field_offsets(register):
 
 
 
-def _elaborate_field_offsets(container):
-  """Compute offsets of register fields for regular registers and array prototypes."""
-  for register in container.registers:
-    _resolve_field_offsets(register)
-  for prototype in container.get_array_prototype_registers():
-    _resolve_field_offsets(prototype)
+class _FieldOffsetsPass(ComponentPass):
+  """Compute offsets of register fields for the changed registers and array prototypes."""
+
+  name = 'field_offsets'
+
+  def visit_register(self, register):
+    if register._dirty_subtree:
+      self.stats[self.name] += 1
+      _resolve_field_offsets(register)
 
 
 
@@ -243,63 +339,26 @@ def _resolve_sw_read_side_effect_init(component):
 
 
 
-def _elaborate_sw_read_side_effects(bank):
-  """Flag non-NORMAL software read behaviors and resolve the testbench initialization mechanism."""
-  for register in bank.registers:
-    if register.fields:
-      for field in register.fields:
-        if field.sw_read_behavior != SoftwareReadBehavior.NORMAL:
-          register.has_sw_read_side_effect = True
-          bank.has_sw_read_side_effect = True
-          field.sw_read_side_effect_init = _resolve_sw_read_side_effect_init(field)
-    elif register.sw_read_behavior != SoftwareReadBehavior.NORMAL:
-      register.has_sw_read_side_effect = True
-      bank.has_sw_read_side_effect = True
-      register.sw_read_side_effect_init = _resolve_sw_read_side_effect_init(register)
-
-
-
-def _elaborate_sw_write_once(bank):
-  """Flag write-once software access to gate the dedicated RTL and testbench sections."""
-  for register in bank.registers:
-    if register.fields:
-      for field in register.fields:
-        if field.is_software_write_once():
-          bank.has_sw_write_once = True
-          return
-    elif register.is_software_write_once():
-      bank.has_sw_write_once = True
-      return
-
-
-
 def _resolve_register_access(register):
   """Resolve software and hardware access policies and options for a register and its fields."""
+  # The resolved values are kept apart from the configured ones, restored before
+  # the next elaboration of the register
   if register.fields:
     for field in register.fields:
-      field.software_access   = field.software_access   or register.software_access   or field_default_software_access
-      field.hardware_access   = field.hardware_access   or register.hardware_access   or field_default_hardware_access
-      field.hw_write_options  = field.hw_write_options  or register.hw_write_options  or (field_default_hw_write_options if field.is_hardware_writable() else HardwareWriteOptions(0))
-      field.hw_read_options   = field.hw_read_options   or register.hw_read_options   or (field_default_hw_read_options  if field.is_hardware_readable()  else HardwareReadOptions(0))
-      field.sw_write_behavior = field.sw_write_behavior or register.sw_write_behavior or field_default_sw_write_behavior
-      field.sw_read_behavior  = field.sw_read_behavior  or register.sw_read_behavior  or field_default_sw_read_behavior
-  register.software_access   = register.software_access   or register_default_software_access
-  register.hardware_access   = register.hardware_access   or register_default_hardware_access
+      field._resolve('software_access',   field.software_access   or register.software_access   or field_default_software_access)
+      field._resolve('hardware_access',   field.hardware_access   or register.hardware_access   or field_default_hardware_access)
+      field._resolve('hw_write_options',  field.hw_write_options  or register.hw_write_options  or (field_default_hw_write_options if field.is_hardware_writable() else HardwareWriteOptions(0)))
+      field._resolve('hw_read_options',   field.hw_read_options   or register.hw_read_options   or (field_default_hw_read_options  if field.is_hardware_readable()  else HardwareReadOptions(0)))
+      field._resolve('sw_write_behavior', field.sw_write_behavior or register.sw_write_behavior or field_default_sw_write_behavior)
+      field._resolve('sw_read_behavior',  field.sw_read_behavior  or register.sw_read_behavior  or field_default_sw_read_behavior)
+  register._resolve('software_access',   register.software_access   or register_default_software_access)
+  register._resolve('hardware_access',   register.hardware_access   or register_default_hardware_access)
   if register.fields:
     _upgrade_register_access_from_fields(register)
-  register.hw_write_options  = register.hw_write_options  or (register_default_hw_write_options if register.is_hardware_writable() else HardwareWriteOptions(0))
-  register.hw_read_options   = register.hw_read_options   or (register_default_hw_read_options  if register.is_hardware_readable()  else HardwareReadOptions(0))
-  register.sw_write_behavior = register.sw_write_behavior or register_default_sw_write_behavior
-  register.sw_read_behavior  = register.sw_read_behavior  or register_default_sw_read_behavior
-
-
-
-def _elaborate_access_policies(container):
-  """Compute software and hardware access policies for registers, fields, and array prototypes."""
-  for register in container.registers:
-    _resolve_register_access(register)
-  for prototype in container.get_array_prototype_registers():
-    _resolve_register_access(prototype)
+  register._resolve('hw_write_options',  register.hw_write_options  or (register_default_hw_write_options if register.is_hardware_writable() else HardwareWriteOptions(0)))
+  register._resolve('hw_read_options',   register.hw_read_options   or (register_default_hw_read_options  if register.is_hardware_readable()  else HardwareReadOptions(0)))
+  register._resolve('sw_write_behavior', register.sw_write_behavior or register_default_sw_write_behavior)
+  register._resolve('sw_read_behavior',  register.sw_read_behavior  or register_default_sw_read_behavior)
 
 
 
@@ -307,37 +366,37 @@ def _upgrade_register_access_from_fields(register):
   """Upgrade register access policies based on the access capabilities of its fields."""
   for field in register.fields:
     if field.is_software_writable():
-      register.software_access = {
+      register._resolve('software_access', {
         SoftwareAccessType.NONE            : SoftwareAccessType.WRITE_ONLY,
         SoftwareAccessType.READ_ONLY       : SoftwareAccessType.READ_WRITE,
         SoftwareAccessType.WRITE_ONLY      : SoftwareAccessType.WRITE_ONLY,
         SoftwareAccessType.READ_WRITE      : SoftwareAccessType.READ_WRITE,
         SoftwareAccessType.WRITE_ONCE      : SoftwareAccessType.WRITE_ONCE,
         SoftwareAccessType.READ_WRITE_ONCE : SoftwareAccessType.READ_WRITE_ONCE,
-      }[register.software_access]
+      }[register.software_access])
     if field.is_software_readable():
-      register.software_access = {
+      register._resolve('software_access', {
         SoftwareAccessType.NONE            : SoftwareAccessType.READ_ONLY,
         SoftwareAccessType.READ_ONLY       : SoftwareAccessType.READ_ONLY,
         SoftwareAccessType.WRITE_ONLY      : SoftwareAccessType.READ_WRITE,
         SoftwareAccessType.READ_WRITE      : SoftwareAccessType.READ_WRITE,
         SoftwareAccessType.WRITE_ONCE      : SoftwareAccessType.READ_WRITE_ONCE,
         SoftwareAccessType.READ_WRITE_ONCE : SoftwareAccessType.READ_WRITE_ONCE,
-      }[register.software_access]
+      }[register.software_access])
     if field.is_hardware_writable():
-      register.hardware_access = {
+      register._resolve('hardware_access', {
         HardwareAccessType.NONE       : HardwareAccessType.WRITE_ONLY,
         HardwareAccessType.READ_ONLY  : HardwareAccessType.READ_WRITE,
         HardwareAccessType.WRITE_ONLY : HardwareAccessType.WRITE_ONLY,
         HardwareAccessType.READ_WRITE : HardwareAccessType.READ_WRITE,
-      }[register.hardware_access]
+      }[register.hardware_access])
     if field.is_hardware_readable():
-      register.hardware_access = {
+      register._resolve('hardware_access', {
         HardwareAccessType.NONE       : HardwareAccessType.READ_ONLY,
         HardwareAccessType.READ_ONLY  : HardwareAccessType.READ_ONLY,
         HardwareAccessType.WRITE_ONLY : HardwareAccessType.READ_WRITE,
         HardwareAccessType.READ_WRITE : HardwareAccessType.READ_WRITE,
-      }[register.hardware_access]
+      }[register.hardware_access])
 
 
 
@@ -362,55 +421,115 @@ def _has_visible_child(container):
 
 
 
-def _elaborate_sw_struct_accessibility(container):
-  """Recursively determine which register files are empty in the firmware struct."""
-  for component in container.components:
-    if isinstance(component, ComponentArray):
-      prototype = component.prototype
-      if isinstance(prototype, RegisterFile):
-        _elaborate_sw_struct_accessibility(prototype)
-        prototype.sw_struct_empty = not _has_visible_child(prototype)
-    elif isinstance(component, RegisterFile):
-      _elaborate_sw_struct_accessibility(component)
-      component.sw_struct_empty = not _has_visible_child(component)
+class _AccessPoliciesPass(ComponentPass):
+  """Compute software and hardware access policies for the changed registers, fields, and array prototypes."""
 
+  name = 'access_policies'
 
+  def visit_register(self, register):
+    if register._dirty_subtree:
+      self.stats[self.name] += 1
+      _resolve_register_access(register)
 
-def _elaborate_component_padding(container, container_address):
-  """Recursively compute firmware struct padding for software-visible registers and files."""
-  # List components that appear in the C header struct (accessible by software)
-  fw_components = []
-  for component in container.components:
-    if isinstance(component, ComponentArray):
-      prototype = component.prototype
-      if isinstance(prototype, Register):
-        if prototype.is_software_accessible():
+
+
+class _SoftwareReadSideEffectsPass(ComponentPass):
+  """Flag non-NORMAL software read behaviors and resolve the testbench initialization mechanism of the changed registers."""
+
+  name = 'sw_read_side_effects'
+
+  def visit_register(self, register):
+    if not register._dirty_subtree:
+      return
+    self.stats[self.name] += 1
+    # The behaviors may have been reverted to NORMAL since the last elaboration
+    register.has_sw_read_side_effect = False
+    for component in register.fields or (register,):
+      if component.sw_read_behavior != SoftwareReadBehavior.NORMAL:
+        register.has_sw_read_side_effect = True
+        component.sw_read_side_effect_init = _resolve_sw_read_side_effect_init(component)
+      else:
+        component.sw_read_side_effect_init = None
+
+  def end(self):
+    # Recomputed on every run, the changed register may have been the only one flagged
+    self.bank.has_sw_read_side_effect = any(register.has_sw_read_side_effect for register in self.bank.registers)
+
+
+
+class _SoftwareWriteOncePass(ComponentPass):
+  """Flag write-once software access to gate the dedicated RTL and testbench sections."""
+
+  name = 'sw_write_once'
+
+  def end(self):
+    # Recomputed on every run, the changed register may have been the only write-once one
+    self.bank.has_sw_write_once = False
+    for register in self.bank.registers:
+      self.stats[self.name] += 1
+      if register.has_sw_write_once_field() if register.fields else register.is_software_write_once():
+        self.bank.has_sw_write_once = True
+        return
+
+
+
+class _SoftwareStructAccessibilityPass(ComponentPass):
+  """Determine which changed register files are empty in the firmware struct."""
+
+  name = 'sw_struct_accessibility'
+
+  def leave_container(self, container):
+    if container is not self.bank and container._dirty_subtree:
+      self.stats[self.name] += 1
+      container.sw_struct_empty = not _has_visible_child(container)
+
+
+
+class _ComponentPaddingPass(ComponentPass):
+  """Compute firmware struct padding for software-visible registers and files of the changed or moved containers."""
+
+  name = 'component_padding'
+
+  def leave_container(self, container):
+    # Unchanged containers at the same address keep their padding
+    if container is self.bank:
+      container_address = 0
+    elif container._dirty_subtree or container._moved:
+      container_address = container.address
+    else:
+      return
+    self.stats[self.name] += 1
+    # List components that appear in the C header struct (accessible by software)
+    fw_components = []
+    for component in container.components:
+      if isinstance(component, ComponentArray):
+        prototype = component.prototype
+        if isinstance(prototype, Register):
+          if prototype.is_software_accessible():
+            fw_components.append(component)
+        elif isinstance(prototype, RegisterFile):
+          if not prototype.sw_struct_empty:
+            fw_components.append(component)
+      elif isinstance(component, Register):
+        if component.is_software_accessible():
           fw_components.append(component)
-      elif isinstance(prototype, RegisterFile):
-        _elaborate_component_padding(prototype, prototype.address)
-        if not prototype.sw_struct_empty:
+      elif isinstance(component, RegisterFile):
+        if not component.sw_struct_empty:
           fw_components.append(component)
-    elif isinstance(component, Register):
-      if component.is_software_accessible():
-        fw_components.append(component)
-    elif isinstance(component, RegisterFile):
-      _elaborate_component_padding(component, component.address)
-      if not component.sw_struct_empty:
-        fw_components.append(component)
-  # Compute the padding (components are already in address order from elaboration)
-  previous_end_address = container_address
-  for component in fw_components:
-    component.sw_struct_padding = (component.address - previous_end_address) // 4
-    if isinstance(component, ComponentArray):
-      previous_end_address = component.address + component.region_size
-    elif isinstance(component, RegisterFile):
-      previous_end_address = component.address + component.size
-    else:
-      previous_end_address = component.address + 4
-  # For power-of-two files, compute trailing reserved words to fill the struct
-  if isinstance(container, RegisterFile) and container.packing == PackingPolicy.POWER_OF_TWO:
-    file_end = container.address + container.size
-    container.sw_struct_tail_padding = (file_end - previous_end_address) // 4
+    # Compute the padding (components are already in address order from elaboration)
+    previous_end_address = container_address
+    for component in fw_components:
+      component.sw_struct_padding = (component.address - previous_end_address) // 4
+      if isinstance(component, ComponentArray):
+        previous_end_address = component.address + component.region_size
+      elif isinstance(component, RegisterFile):
+        previous_end_address = component.address + component.size
+      else:
+        previous_end_address = component.address + 4
+    # For power-of-two files, compute trailing reserved words to fill the struct
+    if isinstance(container, RegisterFile) and container.packing == PackingPolicy.POWER_OF_TWO:
+      file_end = container.address + container.size
+      container.sw_struct_tail_padding = (file_end - previous_end_address) // 4
 
 
 
@@ -426,60 +545,505 @@ def _resolve_field_padding(register):
 
 
 
-def _elaborate_field_padding(bank):
-  """Compute firmware struct padding for software-visible fields of regular registers and array prototypes."""
-  for register in bank.registers:
-    _resolve_field_padding(register)
-  for prototype in bank.get_array_prototype_registers():
-    _resolve_field_padding(prototype)
-
-
+class _FieldPaddingPass(ComponentPass):
+  """Compute firmware struct padding for software-visible fields of the changed registers and array prototypes."""
 
-def _elaborate_bank_address_width(bank):
-  """Compute the bit width of the address signal."""
-  last_address = max(bank.registers, key=lambda register : register.address).address
-  last_address_pow2 = next_power_of_two(last_address)
-  bank.address_width = int(log2(last_address_pow2))
-  bank.address_width_nibbles = ceil(bank.address_width / 4)
+  name = 'field_padding'
 
+  def visit_register(self, register):
+    if register._dirty_subtree:
+      self.stats[self.name] += 1
+      _resolve_field_padding(register)
 
 
-def elaborate(self):
-  """Elaborate the data structure after configuration and before generation."""
 
-  # Resolve packing policies
-  _elaborate_inherited_settings(self, UNSPECIFIED)
+class _BankAddressWidthPass(ComponentPass):
+  """Compute the bit width of the address signal."""
 
-  # Resolve addresses recursively
-  _elaborate_addresses(self, 0)
+  name = 'bank_address_width'
+
+  def end(self):
+    self.stats[self.name] += len(self.bank.registers)
+    last_address = max((register.address for register in self.bank.registers), default=0)
+    last_address_pow2 = next_power_of_two(last_address)
+    self.bank.address_width = int(log2(last_address_pow2))
+    self.bank.address_width_nibbles = ceil(self.bank.address_width / 4)
+
+
+
+# Elaboration passes in execution order, consecutive passes of the same kind
+# are fused in a single walk. Each pass may only depend on the results of the
+# previous walks, and on the hooks of the previous passes of its own walk for
+# the components already visited.
+elaboration_pipeline = (
+  _InheritedSettingsPass,
+  _AddressesPass,
+  _HierarchicalNamesPass,
+  _FieldOffsetsPass,
+  _AccessPoliciesPass,
+  _SoftwareReadSideEffectsPass,
+  _SoftwareWriteOncePass,
+  _SoftwareStructAccessibilityPass,
+  _ComponentPaddingPass,
+  _FieldPaddingPass,
+  _BankAddressWidthPass,
+)
 
-  # Resolve hierarchical names recursively
-  _elaborate_hierarchical_names(self, "")
+# Names of the elaboration passes, used as keys of the touched components counters
+elaboration_passes = tuple(elaboration_pass.name for elaboration_pass in elaboration_pipeline)
 
-  # Separate registers and files recursively
-  self.registers = self.get_registers_deep()
-  self.files     = self.get_files_deep()
 
-  # Bit offset and padding of each register field
-  _elaborate_field_offsets(self)
 
-  # Access policy between fields and registers
-  _elaborate_access_policies(self)
+def _structure_walk(container, passes):
+  """Run the hooks of the fused structure passes on the components of a container."""
+  for component in container.components:
+    _structure_visit(component, container, passes)
 
-  # Flag software read side effect behaviors
-  _elaborate_sw_read_side_effects(self)
 
-  # Flag write-once software access
-  _elaborate_sw_write_once(self)
 
-  # Compute which register files are empty in the firmware struct
-  _elaborate_sw_struct_accessibility(self)
+def _structure_visit(component, parent, passes):
+  """Run the hooks of the fused structure passes on a component and the subtrees they entered."""
+  # Each pass only visits the subtrees it entered
+  entered = [elaboration_pass for elaboration_pass in passes if elaboration_pass.enter(component, parent)]
+  if not entered:
+    return
+  if isinstance(component, ComponentArray):
+    _structure_visit(component.prototype, component, entered)
+  elif isinstance(component, RegisterFile):
+    _structure_walk(component, entered)
+  for elaboration_pass in entered:
+    elaboration_pass.leave(component, parent)
 
-  # Padding before each register and file for the firmware struct header
-  _elaborate_component_padding(self, 0)
 
-  # Padding before each field for the firmware bitfield struct
-  _elaborate_field_padding(self)
 
-  # Bank address bus width
-  _elaborate_bank_address_width(self)
\ No newline at end of file
+def _component_walk(container, walk, collect=True, structural=True, offloaded=()):
+  """Run the hooks of the fused component passes on the structural components, collecting the flat lists of registers and files."""
+  register_hooks, container_hooks, registers, files, shapes = walk
+  for component in container.components:
+    # The hooks already ran on the subtrees offloaded to the worker processes
+    _component_visit(component, walk, collect, structural and component not in offloaded)
+  if structural:
+    for hook in container_hooks:
+      hook(container)
+
+
+
+def _component_visit(component, walk, collect, structural):
+  """Run the hooks of the fused component passes on a component and its subtree."""
+  register_hooks, container_hooks, registers, files, shapes = walk
+  if isinstance(component, ComponentArray):
+    prototype = component.prototype
+    # The element views are part of the flat lists
+    if collect:
+      expanded_registers, expanded_files = component._create_and_get_expanded()
+      registers.extend(expanded_registers)
+      for file in expanded_files:
+        files.append(file)
+        _component_walk(file, walk, True, False)
+    # The element views share the elaboration of the prototype
+    if structural:
+      if isinstance(prototype, Register):
+        for hook in register_hooks:
+          hook(prototype)
+      else:
+        _component_visit(prototype, walk, False, True)
+  elif isinstance(component, Register):
+    if collect:
+      registers.append(component)
+    if structural:
+      for hook in register_hooks:
+        hook(component)
+  elif isinstance(component, RegisterFile):
+    if collect:
+      files.append(component)
+    # Structurally identical files share the elaboration of their first instance
+    if structural and (component._dirty_subtree or component._moved) and shapes.reuse(component):
+      structural = False
+    _component_walk(component, walk, collect, structural)
+
+
+
+# Attributes left out of the structural signatures, the identity and the
+# placement of a subtree do not change its elaboration, the padding of a
+# component is computed by its container, and the configured values are only
+# kept to be restored.
+_unshaped_attributes = frozenset({
+  'name',
+  'title',
+  'description',
+  'hierarchical_name',
+  'is_array_element',
+  'array_index',
+  'sw_struct_padding',
+  '_relative_address',
+  '_placement_address',
+  '_placement_offset',
+  '_needs_wrapper',
+  '_wrapper_pad_words',
+  '_configured',
+})
+
+# Configuration attributes overwritten by the elaboration with their resolved
+# values.
+_resolved_attributes = frozenset({
+  'offset',
+  'packing',
+  'software_access',
+  'hardware_access',
+  'hw_write_options',
+  'hw_read_options',
+  'sw_write_behavior',
+  'sw_read_behavior',
+})
+
+_shaped_slots_cache = {}
+
+
+
+def _shaped_slots(component_class):
+  """Return the slots of a component class part of its structural signature."""
+  if component_class not in _shaped_slots_cache:
+    _shaped_slots_cache[component_class] = [name for name in _merged_slots(component_class) if name not in _unshaped_attributes]
+  return _shaped_slots_cache[component_class]
+
+
+
+class _ShapeTable:
+  """Structural signatures of the subtrees elaborated in a walk, interned to shape numbers, and the first elaborated instance of each shape."""
+
+  def __init__(self):
+    self.shapes          = {}  # Shape number of each interned signature
+    self.signatures      = {}  # Shape number of the components signed during the walk, by identity
+    self.representatives = {}  # First instance of each shape with its components before elaboration
+    self.instances       = 0
+    self.reused          = 0
+
+  def shape(self, component):
+    """Return the shape number of a component, signed on its configuration and layout before the component passes."""
+    shape = self.signatures.get(id(component))
+    if shape is None:
+      if isinstance(component, RegisterFile):
+        children = tuple((child.relative_address, self.shape(child)) for child in component.components)
+      elif isinstance(component, ComponentArray):
+        children = (self.shape(component.prototype),)
+      elif isinstance(component, Register):
+        children = tuple(self.shape(field) for field in component.fields)
+      else:
+        children = ()
+      attributes = tuple(getattr(component, name, None) for name in _shaped_slots(type(component)))
+      shape = self.shapes.setdefault((type(component), attributes, children), len(self.shapes))
+      self.signatures[id(component)] = shape
+    return shape
+
+  def reuse(self, component):
+    """Copy the elaboration of the first instance of the shape of a component, return False if it is the first instance."""
+    shape = self.shape(component)
+    self.instances += 1
+    if shape not in self.representatives:
+      self.representatives[shape] = _subtree_components(component)
+      return False
+    self.reused += 1
+    sources   = self.representatives[shape]
+    targets   = _subtree_components(component)
+    positions = {id(source): index for index, source in enumerate(sources)}
+    for index, (source, target) in enumerate(zip(sources, targets)):
+      for name in _shaped_slots(type(source)):
+        if hasattr(source, name):
+          # The resolved values keep the configuration of the instance
+          if name in _resolved_attributes:
+            target._resolve(name, getattr(source, name))
+          else:
+            object.__setattr__(target, name, getattr(source, name))
+      # The padding of the root is computed by its own container
+      if index and hasattr(source, 'sw_struct_padding'):
+        object.__setattr__(target, 'sw_struct_padding', source.sw_struct_padding)
+      if isinstance(source, Register):
+        target.fields[:] = [targets[positions[id(field)]] for field in source.fields]
+    return True
+
+  def report(self):
+    """Return the number of instances and of their distinct shapes, each elaborated from scratch once."""
+    return {'instances': self.instances, 'unique_shapes': len(self.representatives)}
+
+
+
+def _component_hooks(passes):
+  """Return the register and container hooks overridden by the component passes."""
+  register_hooks  = [elaboration_pass.visit_register  for elaboration_pass in passes if type(elaboration_pass).visit_register  is not ComponentPass.visit_register]
+  container_hooks = [elaboration_pass.leave_container for elaboration_pass in passes if type(elaboration_pass).leave_container is not ComponentPass.leave_container]
+  return register_hooks, container_hooks
+
+
+
+# Attributes not merged back from the worker processes, the structure and the
+# caches are only rebuilt in the main process, and the change flags are cleared
+# at the end of the elaboration.
+_unmerged_attributes = frozenset({
+  'parent',
+  'components',
+  'fields',
+  'prototype',
+  '_dirty',
+  '_dirty_subtree',
+  '_moved',
+  '_cached_address',
+  '_cached_epoch',
+  '_layout_epoch',
+  '_expanded_registers',
+  '_expanded_files',
+})
+
+_merged_slots_cache = {}
+
+
+
+def _merged_slots(component_class):
+  """Return the slots of a component class merged back from the worker processes."""
+  if component_class not in _merged_slots_cache:
+    _merged_slots_cache[component_class] = [
+      name
+      for cls in component_class.__mro__
+      for name in cls.__dict__.get('__slots__', ())
+      if name not in _unmerged_attributes
+    ]
+  return _merged_slots_cache[component_class]
+
+
+
+def _component_state(component):
+  """Return the values of the merged slots of a component."""
+  return {name: getattr(component, name) for name in _merged_slots(type(component)) if hasattr(component, name)}
+
+
+
+def _subtree_components(component, collected=None):
+  """Return the components of a subtree in pre-order, including the fields and the array prototypes."""
+  if collected is None:
+    collected = []
+  collected.append(component)
+  if isinstance(component, ComponentArray):
+    _subtree_components(component.prototype, collected)
+  elif isinstance(component, Register):
+    collected.extend(component.fields)
+  elif isinstance(component, RegisterFile):
+    for child in component.components:
+      _subtree_components(child, collected)
+  return collected
+
+
+
+class _SubtreePickler(pickle.Pickler):
+  """Pickler of a top-level subtree, leaving out its parent bank."""
+
+  def __init__(self, file, bank):
+    super().__init__(file, pickle.HIGHEST_PROTOCOL)
+    self.bank = bank
+
+  def persistent_id(self, obj):
+    return 'bank' if obj is self.bank else None
+
+
+
+class _SubtreeUnpickler(pickle.Unpickler):
+  """Unpickler of a top-level subtree, detached from the bank in the worker process."""
+
+  def persistent_load(self, persistent_id):
+    return None
+
+
+
+def _elaborate_subtree(payload):
+  """Run the component passes on a top-level subtree in a worker process, return the changes to merge back."""
+  pass_classes, flags, data = payload
+  root       = _SubtreeUnpickler(io.BytesIO(data)).load()
+  components = _subtree_components(root)
+  # The copies keep the change flags of the original components
+  for component, (dirty, dirty_subtree, moved) in zip(components, flags):
+    object.__setattr__(component, '_dirty',         dirty)
+    object.__setattr__(component, '_dirty_subtree', dirty_subtree)
+    object.__setattr__(component, '_moved',         moved)
+  states    = [_component_state(component) for component in components]
+  positions = {id(component): index for index, component in enumerate(components)}
+  fields    = [[positions[id(field)] for field in component.fields] if isinstance(component, Register) else None for component in components]
+  # The bank-level results are computed in the main process at the end of the passes
+  stats  = {name: 0 for name in elaboration_passes}
+  passes = [pass_class(None, stats) for pass_class in pass_classes]
+  shapes = _ShapeTable()
+  _component_visit(root, (*_component_hooks(passes), None, None, shapes), False, True)
+  # Changed attributes by position in the subtree, and new order of the sorted fields
+  changes = []
+  for index, component in enumerate(components):
+    state  = _component_state(component)
+    change = {name: value for name, value in state.items() if name not in states[index] or states[index][name] != value}
+    if fields[index] is not None:
+      order = [positions[id(field)] for field in component.fields]
+      if order != fields[index]:
+        change['fields'] = order
+    if change:
+      changes.append((index, change))
+  # First instances of the shapes, identified by position for the main process to merge their shapes
+  representatives = [positions[id(representative[0])] for representative in shapes.representatives.values()]
+  return changes, stats, (shapes.instances, shapes.reused, representatives)
+
+
+
+def _run_offloaded_walks(bank, passes, jobs, shapes):
+  """Run the component passes on the changed top-level subtrees in worker processes and merge the changes back, return the offloaded subtrees."""
+  candidates = [
+    component
+    for component in bank.components
+    if isinstance(component, (RegisterFile, ComponentArray)) and (component._dirty_subtree or component._moved)
+  ]
+  # Only the first instance of each shape is sent to the workers, the other
+  # instances are left to the walk of this process to reuse their elaboration
+  subtrees       = []
+  subtree_shapes = set()
+  for component in candidates:
+    shape = shapes.shape(component)
+    if shape not in subtree_shapes:
+      subtree_shapes.add(shape)
+      subtrees.append(component)
+  # Not worth the serialization overhead
+  if len(subtrees) < 2:
+    return ()
+  pass_classes = [type(elaboration_pass) for elaboration_pass in passes]
+  payloads     = []
+  subtrees_components = []
+  for subtree in subtrees:
+    components = _subtree_components(subtree)
+    subtrees_components.append(components)
+    data = io.BytesIO()
+    _SubtreePickler(data, bank).dump(subtree)
+    flags = [(component._dirty, component._dirty_subtree, component._moved) for component in components]
+    payloads.append((pass_classes, flags, data.getvalue()))
+  # One batch of subtrees per worker process to limit the inter-process traffic
+  workers = min(jobs, len(subtrees))
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    results = list(executor.map(_elaborate_subtree, payloads, chunksize=ceil(len(payloads) / workers)))
+  # Merge the changes into the original components
+  stats = passes[0].stats
+  for components, (changes, subtree_stats, (instances_count, reused_count, representatives)) in zip(subtrees_components, results):
+    shapes.instances += instances_count
+    shapes.reused    += reused_count
+    # The shapes of the subtrees were signed in this process before offloading them,
+    # the same shape can be elaborated from scratch in several workers
+    for position in representatives:
+      shapes.representatives.setdefault(shapes.shape(components[position]), _subtree_components(components[position]))
+    for index, change in changes:
+      component = components[index]
+      for name, value in change.items():
+        if name == 'fields':
+          component.fields[:] = [components[position] for position in value]
+        else:
+          object.__setattr__(component, name, value)
+    for name, count in subtree_stats.items():
+      stats[name] += count
+  return set(subtrees)
+
+
+
+def _run_structure_walk(bank, passes, jobs=1):
+  """Walk the components in address order once for all the fused structure passes."""
+  # Always serial, the placement couples the siblings through the running offset
+  _structure_walk(bank, passes)
+
+
+
+def _run_component_walk(bank, passes, jobs=1):
+  """Walk the registers and containers once for all the fused component passes."""
+  shapes = _ShapeTable()
+  # The changed top-level subtrees are independent for the component passes
+  offloaded = _run_offloaded_walks(bank, passes, jobs, shapes) if jobs > 1 else ()
+  bank.registers = []
+  bank.files     = []
+  _component_walk(bank, (*_component_hooks(passes), bank.registers, bank.files, shapes), offloaded=offloaded)
+  bank.shape_stats = shapes.report()
+
+
+
+def _schedule_walks(bank, stats, pipeline=elaboration_pipeline):
+  """Group the consecutive passes of the pipeline sharing the same kind of walk."""
+  walks = []
+  for pass_class in pipeline:
+    run_walk = _run_structure_walk if issubclass(pass_class, StructurePass) else _run_component_walk
+    if not walks or walks[-1][0] is not run_walk:
+      walks.append((run_walk, []))
+    walks[-1][1].append(pass_class(bank, stats))
+  return walks
+
+
+
+def _restore_configurations(component):
+  """Recursively restore the configured values of the changed components before they are resolved again."""
+  if not component._dirty_subtree:
+    return
+  component._restore_configuration()
+  if isinstance(component, Register):
+    for field in component.fields:
+      field._restore_configuration()
+  elif isinstance(component, ComponentArray):
+    _restore_configurations(component.prototype)
+  else:
+    for child in component.components:
+      _restore_configurations(child)
+
+
+
+def _clear_dirty_flags(component, elaborated=False):
+  """Recursively reset the change flags of the components elaborated in this run."""
+  if not (elaborated or component._dirty_subtree or component._moved):
+    return
+  component._clear_dirty()
+  if isinstance(component, Register):
+    for field in component.fields:
+      field._clear_dirty()
+  elif isinstance(component, ComponentArray):
+    _clear_dirty_flags(component.prototype, elaborated)
+  else:
+    for child in component.components:
+      _clear_dirty_flags(child, elaborated)
+
+
+
+def elaborate(self, columnar:bool=False, jobs:int=1):
+  """Elaborate the data structure after configuration and before generation, optionally keeping the fields in a columnar NumPy table and running the independent subtrees in parallel processes."""
+  # Only the subtrees changed since the last elaboration and the components they
+  # move are recomputed, count the components touched by each pass.
+  stats = self.elaboration_stats = {name: 0 for name in elaboration_passes}
+  self.shape_stats = {'instances': 0, 'unique_shapes': 0}
+  if columnar:
+    require_numpy()
+
+  # Nothing changed since the last elaboration
+  if not self._dirty_subtree:
+    if columnar and self.field_table is None:
+      self.field_table = FieldTable(self)
+    return
+
+  # The columnar backend computes the field padding on the table instead
+  pipeline = elaboration_pipeline
+  if columnar:
+    pipeline = tuple(pass_class for pass_class in pipeline if pass_class is not _FieldPaddingPass)
+
+  # The changed components are resolved again from their configuration
+  _restore_configurations(self)
+
+  # Run the pipeline with as few walks of the hierarchy as possible
+  for run_walk, passes in _schedule_walks(self, stats, pipeline):
+    run_walk(self, passes, jobs)
+    for elaboration_pass in passes:
+      elaboration_pass.end()
+
+  # Columnar field table, reused by the validation
+  if columnar:
+    self.field_table = FieldTable(self)
+    stats[_FieldPaddingPass.name] = resolve_field_padding(self.field_table)
+  else:
+    self.field_table = None
+
+  # Everything is up to date until the next change
+  _clear_dirty_flags(self)
+  invalidate_traversals(self)
+
+  # Address and hierarchical name lookup indexes
+  build_lookup_indexes(self)
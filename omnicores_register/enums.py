@@ -114,6 +114,15 @@ field_default_sw_read_behavior  = SoftwareReadBehavior.NORMAL
 
 
 
+class DiagnosticSeverity(Enum):
+  """Severity of the validation diagnostics."""
+  ERROR   = auto()
+  WARNING = auto()
+  def __repr__(self):
+    return self.name.title()
+
+
+
 class PackingPolicy(Enum):
   """Controls register file address resolution and padding."""
   DENSE        = auto()
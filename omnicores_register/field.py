@@ -17,6 +17,20 @@ from omnicores_register.accessible_component import AccessibleComponent
 
 
 class Field(AccessibleComponent):
+
+  __slots__ = AccessibleComponent._mixin_slots + (
+    'name',
+    'width',
+    'offset',
+    'align',
+    'reset_value',
+    'title',
+    'description',
+    'sw_struct_padding',
+  )
+
+  _tracked_attributes = AccessibleComponent._tracked_attributes | {'name', 'width', 'offset', 'align', 'reset_value'}
+
   def __init__(
       self,
       name              : str,
@@ -0,0 +1,174 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Optional columnar backend keeping the elaborated fields in   ║
+# ║              parallel NumPy arrays, to compute the field padding and the  ║
+# ║              field checks of the validation with vectorized operations.   ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from operator import attrgetter, is_not
+from itertools import chain, compress, repeat
+from omnicores_register.component_view import ComponentView
+from omnicores_register.enums import (
+  SoftwareAccessType,
+  HardwareAccessType,
+  HardwareWriteOptions,
+  SoftwareWriteBehavior,
+  SoftwareReadBehavior,
+)
+
+# NumPy is an optional dependency only required by the columnar backend
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+
+
+def require_numpy():
+  """Raise an error if the optional NumPy dependency of the columnar backend is missing."""
+  if numpy is None:
+    raise ImportError("The columnar field table requires NumPy, install it or elaborate with columnar=False.")
+
+
+
+def _access_lookup(access_types):
+  """Return a boolean array indexed by access type value, True for the given access types."""
+  lookup = numpy.zeros(max(access_type.value for access_type in type(access_types[0])) + 1, dtype=bool)
+  lookup[[access_type.value for access_type in access_types]] = True
+  return lookup
+
+
+
+def _column(components, attribute:str, dtype):
+  """Return the column of an attribute of the components, read without a Python-level loop."""
+  return numpy.fromiter(map(attrgetter(attribute), components), dtype=dtype, count=len(components))
+
+
+
+class FieldTable:
+  """Parallel arrays of the fields of the elaborated registers, one row per field or per register without fields."""
+
+  def __init__(self, bank):
+    require_numpy()
+    # Registers owning the rows, the array prototypes stand for their elements
+    self.registers = [register for register in bank.registers if not isinstance(register, ComponentView)]
+    self.registers.extend(bank.get_array_prototype_registers())
+    # Rows of each register, registers without fields hold their own access attributes
+    register_fields    = list(map(attrgetter('fields'), self.registers))
+    field_counts       = numpy.fromiter(map(len, register_fields), dtype=numpy.int64, count=len(register_fields))
+    has_fields         = field_counts > 0
+    row_counts         = numpy.maximum(field_counts, 1)
+    row_ends           = numpy.cumsum(row_counts)
+    row_starts         = row_ends - row_counts
+    self.register_rows = dict(zip(self.registers, zip(row_starts.tolist(), row_ends.tolist())))
+    self.register_index = numpy.repeat(numpy.arange(len(self.registers), dtype=numpy.int64), row_counts)
+    self.is_field       = numpy.repeat(has_fields, row_counts)
+    # Flat list of the rows, the fields in register order and the registers without fields in between
+    fields      = list(chain.from_iterable(register_fields))
+    fieldless   = list(compress(self.registers, (~has_fields).tolist()))
+    rows        = numpy.empty(len(fields) + len(fieldless), dtype=object)
+    rows[self.is_field]             = numpy.fromiter(fields,    dtype=object, count=len(fields))
+    rows[row_starts[~has_fields]]   = numpy.fromiter(fieldless, dtype=object, count=len(fieldless))
+    self.components = components = rows.tolist()
+    # Columns read from the flat lists without per-row Python code
+    self.offset                = numpy.zeros(len(components), dtype=numpy.int64)
+    self.offset[self.is_field] = _column(fields, 'offset', numpy.int64)
+    self.width             = _column(components, 'width', numpy.int64)
+    self.has_reset         = numpy.fromiter(map(is_not, map(attrgetter('reset_value'), components), repeat(None)), dtype=bool, count=len(components))
+    # The enumeration values are read from the members, bypassing the value property
+    self.software_access   = _column(components, 'software_access._value_',   numpy.uint8)
+    self.hardware_access   = _column(components, 'hardware_access._value_',   numpy.uint8)
+    self.sw_write_behavior = _column(components, 'sw_write_behavior._value_', numpy.uint8)
+    self.sw_read_behavior  = _column(components, 'sw_read_behavior._value_',  numpy.uint8)
+    self.hw_write_options  = _column(components, 'hw_write_options._value_',  numpy.int64)
+    self.hw_read_options   = _column(components, 'hw_read_options._value_',   numpy.int64)
+    # Per-register columns
+    self.register_width = _column(self.registers, 'width',          numpy.int64)
+    self.register_dirty = _column(self.registers, '_dirty_subtree', bool)
+
+  def __len__(self):
+    return len(self.components)
+
+  def registers_with(self, *masks):
+    """Return the registers owning at least one of the rows selected by the masks in table order, array elements are represented by their prototype."""
+    rows = numpy.logical_or.reduce(masks)
+    return [self.registers[index] for index in numpy.unique(self.register_index[rows]).tolist()]
+
+  # Access capabilities of the rows
+  def is_software_readable(self):
+    return _access_lookup((SoftwareAccessType.READ_ONLY, SoftwareAccessType.READ_WRITE, SoftwareAccessType.READ_WRITE_ONCE))[self.software_access]
+
+  def is_software_writable(self):
+    return _access_lookup((SoftwareAccessType.WRITE_ONLY, SoftwareAccessType.READ_WRITE, SoftwareAccessType.WRITE_ONCE, SoftwareAccessType.READ_WRITE_ONCE))[self.software_access]
+
+  def is_hardware_readable(self):
+    return _access_lookup((HardwareAccessType.READ_ONLY, HardwareAccessType.READ_WRITE))[self.hardware_access]
+
+  def is_hardware_writable(self):
+    return _access_lookup((HardwareAccessType.WRITE_ONLY, HardwareAccessType.READ_WRITE))[self.hardware_access]
+
+  def _previous_end(self, rows):
+    """Return the end bit of the previous row of the same register for each of the rows, or 0 for the first row of a register."""
+    end          = self.offset[rows] + self.width[rows]
+    previous_end = numpy.concatenate(([0], end[:-1]))
+    registers    = self.register_index[rows]
+    previous_end[1:][registers[1:] != registers[:-1]] = 0
+    return previous_end
+
+
+
+def resolve_field_padding(table) -> int:
+  """Compute firmware struct padding for the software-visible fields of the changed registers, return the number of registers."""
+  visible          = numpy.flatnonzero(table.is_field & (table.is_software_readable() | table.is_software_writable()))
+  padding          = numpy.zeros(len(table), dtype=numpy.int64)
+  padding[visible] = table.offset[visible] - table._previous_end(visible)
+  # End of the last visible field of each register
+  registers        = table.register_index[visible]
+  last             = numpy.concatenate((registers[1:] != registers[:-1], [True])) if len(visible) else numpy.zeros(0, dtype=bool)
+  visible_end      = numpy.zeros(len(table.registers), dtype=numpy.int64)
+  visible_end[registers[last]] = table.offset[visible[last]] + table.width[visible[last]]
+  tail_padding     = table.register_width - visible_end
+  # Only the changed registers are updated, like the object pass
+  for row in visible[table.register_dirty[registers]].tolist():
+    table.components[row].sw_struct_padding = int(padding[row])
+  for index in numpy.flatnonzero(table.register_dirty).tolist():
+    register = table.registers[index]
+    if register.fields:
+      register.sw_struct_fields_padding = int(tail_padding[index])
+  return int(numpy.count_nonzero(table.register_dirty))
+
+
+
+def field_placement_errors(table):
+  """Return the masks of the fields overlapping a previous field and of the fields extending beyond the register width."""
+  end         = table.offset + table.width
+  overlapping = table.is_field & (table.offset < table._previous_end(numpy.arange(len(table))))
+  beyond      = table.is_field & (end > table.register_width[table.register_index])
+  return overlapping, beyond
+
+
+
+def reset_access_behavior_errors(table):
+  """Return the masks of the rows with a hardware reset signal or a read-resets behavior but no reset value."""
+  hw_reset    = ~table.has_reset & ((table.hw_write_options & HardwareWriteOptions.RESET.value) != 0)
+  read_resets = ~table.has_reset & (table.sw_read_behavior == SoftwareReadBehavior.READ_RESETS.value)
+  return hw_reset, read_resets
+
+
+
+def access_option_errors(table):
+  """Return the masks of the rows with access options or behaviors incompatible with their access types."""
+  continuous = HardwareWriteOptions.CONTINUOUS.value
+  return (
+    (table.sw_write_behavior != SoftwareWriteBehavior.NORMAL.value) & ~table.is_software_writable(),
+    (table.sw_read_behavior  != SoftwareReadBehavior.NORMAL.value)  & ~table.is_software_readable(),
+    (table.hw_write_options  != 0) & ~table.is_hardware_writable(),
+    (table.hw_read_options   != 0) & ~table.is_hardware_readable(),
+    ((table.hw_write_options & continuous) != 0) & (table.hw_write_options != continuous),
+  )
@@ -11,18 +11,146 @@
 
 
 
+import os
+import time
 import j2gpp
 import importlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_all_start_methods, get_context
 from pathlib import Path
+from typing import Optional
+import jinja2.exceptions as jinja2_exceptions
+from j2gpp.utils import jinja2_render_traceback
 from omnicores_register.register import Register
-from omnicores_register.register_file import RegisterFile
 from omnicores_register.component_array import ComponentArray
+from omnicores_register.component_view import ComponentView
+from omnicores_register.template_cache import compile_template
+from omnicores_register.streaming import streamed_source, write_stream
+from omnicores_register.profiling import profile_render
+from omnicores_register.sharding import check_shard_options, register_shards
+from omnicores_register.documentation import DocumentationPages
+from omnicores_register.search_index import search_index_source
+from omnicores_register.register_map import write_register_map
+from omnicores_register.manifest import bank_digest, tool_versions, template_digest, file_digest, file_stamp, read_manifest, write_manifest
 from omnicores_register.enums import HardwareWriteOptions, HardwareReadOptions, SoftwareWriteBehavior, SoftwareReadBehavior
 
 
 
-def render_template(render_engine:j2gpp.J2GPP, template_path:str|Path, output_path:str|Path):
-  """Render a template from the library package to a given path."""
+# Types of the access options and behaviors used by the RTL templates
+_access_option_types = (HardwareWriteOptions, HardwareReadOptions, SoftwareWriteBehavior, SoftwareReadBehavior)
+
+# Templates rendered for each register bank by target name, with the suffix of
+# their output file and the types they use besides the register bank. Binary
+# outputs are written by a module of the library instead of a template
+generation_targets = {
+  'register_bank' : ('register_bank.sv.j2',   '.sv',           _access_option_types),
+  'package'       : ('package.sv.j2',         '.package.sv',   ()),
+  'testbench'     : ('testbench.sv.j2',       '.testbench.sv', (Register,) + _access_option_types),
+  'macros'        : ('macros.h.j2',           '.macros.h',     ()),
+  'structs'       : ('structs.h.j2',          '.structs.h',    (Register, ComponentArray, ComponentView)),
+  'documentation' : ('documentation.html.j2', '.html',         (Register, ComponentArray)),
+  'register_map'  : ('register_map.py',       '.regmap',       ()),
+}
+
+# Functions writing the outputs of the modules of the library by module file
+_output_writers = {
+  'register_map.py' : write_register_map,
+}
+
+
+
+def select_targets(targets=None) -> list:
+  """Return the names of the selected generation targets in generation order, all of them by default."""
+  if targets is None:
+    return list(generation_targets)
+  for target in targets:
+    if target not in generation_targets:
+      raise ValueError(f"Unknown generation target '{target}', expected one of {', '.join(generation_targets)}.")
+  return [target for target in generation_targets if target in targets]
+
+
+
+def create_render_engine(register_bank, targets=None):
+  """Create the rendering engine configured with the data structure of the register bank, and the types used by the selected targets."""
+  # J2GPP environment
+  render_engine = j2gpp.J2GPP()
+  render_engine.load_extensions()
+  render_engine.set_option('trim_whitespace', True)
+
+  # Templates included by other templates are loaded from the library package
+  render_engine.set_include_directories([str(importlib.resources.files('omnicores_register').joinpath('templates'))])
+
+  # Header warning for generated files
+  render_engine.define_variable('header_warning_generated_file', """
+// ╟───────────────────────────────────────────────────────────────────────────╢
+// ║ Generated:   This file has been generated by OmniCores-Registers. Please  ║
+// ║              refer to the original configuration source script.           ║""")
+
+  # Pass the data structure to the render engine for use in templates
+  render_engine.define_variable('register_bank', register_bank)
+
+  # Pass the types used in the templates of the selected targets
+  for target in select_targets(targets):
+    for used_type in generation_targets[target][2]:
+      render_engine.define_variable(used_type.__name__, used_type)
+  return render_engine
+
+
+
+def _trimmed(rendered:str, trim_whitespace:bool) -> str:
+  """Trim the trailing whitespace at the end of each line if enabled."""
+  if not trim_whitespace:
+    return rendered
+  return '\n'.join(line.rstrip(' \t') for line in rendered.split('\n'))
+
+
+
+def _render_compiled_template(render_engine:j2gpp.J2GPP, source_path:str, output_path:str|Path, output_variables:Optional[dict]=None, template_cache:bool=True, disk_cache:bool=False, streaming:bool=False, profile:Optional[dict]=None) -> Optional[str]:
+  """Render a template file like the render engine does, with the variables specific to this output and the compiled template cached, return the error message if it failed. The profile dictionary is filled with the measures of the render if given."""
+  with open(source_path, 'r') as source_file:
+    source = source_file.read()
+  # Context variables specific to this template
+  variables = render_engine.get_variables()
+  variables.update({
+    '__output_directory__' : os.getcwd(),
+    '__source_path__'      : source_path,
+    '__output_path__'      : str(output_path),
+  })
+  variables.update(output_variables or {})
+  environment     = render_engine.jinja_env
+  trim_whitespace = render_engine.get_options()['trim_whitespace']
+  Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+  start = time.perf_counter()
+  try:
+    # Streamed to the output file in chunks instead of rendered as a whole
+    if streaming:
+      source   = streamed_source(source)
+      template = compile_template(environment, source, template_cache, disk_cache)
+      render   = lambda output_file: write_stream(template.generate(variables), output_file, environment.filters['restructure'], trim_whitespace)
+    else:
+      template = compile_template(environment, source, template_cache, disk_cache)
+      render   = lambda output_file: output_file.write(_trimmed(template.render(variables), trim_whitespace))
+    with open(output_path, 'w') as output_file:
+      render(output_file)
+    # Render again under the profiler, the output is discarded
+    if profile is not None:
+      profile['wall_time']    = time.perf_counter() - start
+      profile['output_bytes'] = os.path.getsize(output_path)
+      with open(os.devnull, 'w') as null_file:
+        profile.update(profile_render(template, source, lambda: render(null_file)))
+  except jinja2_exceptions.UndefinedError as exception:
+    return f"Undefined object encountered while rendering '{source_path}' :\n{jinja2_render_traceback(source_path)}\n      {exception.message}"
+  except jinja2_exceptions.TemplateSyntaxError as exception:
+    return f"Syntax error encountered while rendering '{source_path}' :\n{jinja2_render_traceback(source_path)}\n      {exception.message}"
+  except Exception as exception:
+    return f"Exception occurred while rendering '{source_path}' :\n{jinja2_render_traceback(source_path, including_non_template=True)}\n      {type(exception).__name__} - {exception}"
+  return None
+
+
+
+def render_template(render_engine:j2gpp.J2GPP, template_path:str|Path, output_path:str|Path, **render_options) -> Optional[str]:
+  """Render a template from the library package to a given path, return the error message if it failed. The render options control the template cache, the streaming mode and the profiling."""
   # Rendering with exception handling
   try:
     # Load template from package resources
@@ -30,57 +158,354 @@ def render_template(render_engine:j2gpp.J2GPP, template_path:str|Path, output_pa
     with importlib.resources.as_file(template_path_reference) as template_path_object:
       template_path_string = str(template_path_object)
       # Render the template file to the output path
-      render_results = render_engine.render_file(template_path_string, output_path)
+      error = _render_compiled_template(render_engine, template_path_string, output_path, **render_options)
       # Check success
-      if render_results.success:
-        print(f"Successfully generated file '{output_path}'.")
-      else:
-        print(f"ERROR: Could not render the template '{template_path}': {render_results.error_message}")
-        exit(1)
+      if error is not None:
+        return f"Could not render the template '{template_path}': {error}"
   # Exception handling
   except FileNotFoundError:
-    print(f"ERROR: Template file '{template_path}' not found in package.")
-    exit(1)
+    return f"Template file '{template_path}' not found in package."
   except Exception as exception:
-    print(f"ERROR: {exception}.")
-    exit(1)
+    return f"{exception}."
+  return None
 
 
 
-def generate(self):
-  """Generate all files of the register bank after configuration and elaboration."""
-  # J2GPP environment
-  render_engine = j2gpp.J2GPP()
-  render_engine.load_extensions()
-  render_engine.set_option('trim_whitespace', True)
+def write_output(render_engine:j2gpp.J2GPP, source_path:Path, output_path:str|Path, profile:Optional[dict]=None) -> Optional[str]:
+  """Write an output with the module of the library generating it, from the register bank of the render engine, return the error message if it failed. The profile dictionary is filled with the measures of the writing if given."""
+  start = time.perf_counter()
+  try:
+    _output_writers[source_path.name](render_engine.get_variables()['register_bank'], output_path)
+  except Exception as exception:
+    return f"Could not write the output of '{source_path}': {type(exception).__name__} - {exception}."
+  if profile is not None:
+    profile['wall_time']    = time.perf_counter() - start
+    profile['output_bytes'] = os.path.getsize(output_path)
+  return None
 
-  # Header warning for generated files
-  render_engine.define_variable('header_warning_generated_file', """
-// ╟───────────────────────────────────────────────────────────────────────────╢
-// ║ Generated:   This file has been generated by OmniCores-Registers. Please  ║
-// ║              refer to the original configuration source script.           ║""")
 
-  # Pass the data structure to the render engine for use in templates
-  render_engine.define_variable('register_bank', self)
 
-  # Pass some types used in certain templates
-  render_engine.define_variable('Register', Register)
-  render_engine.define_variable('RegisterFile', RegisterFile)
-  render_engine.define_variable('ComponentArray', ComponentArray)
-  render_engine.define_variable('HardwareWriteOptions', HardwareWriteOptions)
-  render_engine.define_variable('HardwareReadOptions', HardwareReadOptions)
-  render_engine.define_variable('SoftwareWriteBehavior', SoftwareWriteBehavior)
-  render_engine.define_variable('SoftwareReadBehavior', SoftwareReadBehavior)
+def render_output(render_engine:j2gpp.J2GPP, template_path:Path, output_path:Path, output_variables:Optional[dict]=None, profile:bool=False, **render_options):
+  """Render a template, or write the output of a module, next to its output file and only replace the output if its content changed, to keep its modification time. Return the error message, the hash of the output, whether it was written, and the profile of the render if profiled."""
+  temporary_path = output_path.with_name(output_path.name + '.tmp')
+  report = {'template': str(template_path)} if profile else None
+  if template_path.name in _output_writers:
+    error = write_output(render_engine, template_path, temporary_path, report)
+  else:
+    error = render_template(render_engine, template_path, temporary_path, output_variables=output_variables, profile=report, **render_options)
+  if error is not None:
+    temporary_path.unlink(missing_ok=True)
+    return error, None, False, None
+  digest = file_digest(temporary_path)
+  if output_path.is_file() and file_digest(output_path) == digest:
+    temporary_path.unlink()
+    return None, digest, False, report
+  os.replace(temporary_path, output_path)
+  return None, digest, True, report
+
+
+
+# Render engines of this process by selected targets, reused across the register banks
+_render_engines = {}
+
+# Elaborated bank, selected targets, render options and testbench shards inherited by the forked worker processes
+_generated_bank = None
+
+# Register banks, selected targets and generation options inherited by the forked worker processes of a batch
+_generated_banks = None
+
+
+
+def warmed_render_engine(register_bank, targets:list):
+  """Return the render engine of this process for the selected targets configured with the register bank, created with its extensions on first use only."""
+  key = tuple(targets)
+  if key not in _render_engines:
+    _render_engines[key] = create_render_engine(register_bank, targets)
+  else:
+    # Rebound in place, defining the variable again would warn about its overwrite
+    _render_engines[key].variables['register_bank'] = register_bank
+  return _render_engines[key]
+
+
+
+def _release_render_engine(render_engine):
+  """Drop the register bank from a render engine kept for the next generations, for the bank to be freed."""
+  render_engine.variables.pop('register_bank', None)
+
+
+
+def _output_variables(register_bank, part:Optional[list], testbench_shards:Optional[list]=None) -> dict:
+  """Return the template variables specific to an output, the registers tested by a testbench shard from the shards of the bank, the page of the paginated documentation or the search index of the documentation."""
+  if part is None:
+    return {}
+  if part[0] == 'documentation_page':
+    return {'documentation_pages': DocumentationPages(register_bank, part[1])}
+  if part[0] == 'documentation_search':
+    return {'search_index': search_index_source(register_bank, DocumentationPages(register_bank) if part[1] else None)}
+  index = part[1]
+  return {'testbench_shard': {'index': index, 'count': len(testbench_shards), 'registers': testbench_shards[index]}}
+
+
+
+def _target_outputs(register_bank, target:str, testbench_sharding:Optional[tuple]=None, testbench_shards:Optional[list]=None, documentation_pages:bool=False) -> list:
+  """Return the outputs of a target as (template path, output path, part) tuples. The sharded testbench has one output per shard and their shared include, the documentation has its search index, and the paginated documentation has one output per page and its shared assets."""
+  register_bank_name = f'{register_bank.name}__register_bank'
+  template_folder    = Path('templates')
+  output_folder      = Path(register_bank_name)
+  template, suffix, _ = generation_targets[target]
+  if target == 'testbench' and testbench_sharding is not None:
+    shards, policy = testbench_sharding
+    outputs = [(template_folder / 'testbench_apb.svh.j2', output_folder / f'{register_bank_name}.testbench_apb.svh', None)]
+    for index in range(len(testbench_shards)):
+      outputs.append((template_folder / template, output_folder / f'{register_bank_name}.testbench_shard_{index}.sv', ['testbench_shard', index, shards, policy]))
+    return outputs
+  if target == 'documentation':
+    search = (template_folder / 'documentation_search.js.j2', output_folder / f'{register_bank_name}.documentation_search.js', ['documentation_search', documentation_pages])
+    if not documentation_pages:
+      return [(template_folder / template, output_folder / f'{register_bank_name}{suffix}', None), search]
+    pages   = DocumentationPages(register_bank)
+    outputs = [
+      (template_folder / 'documentation.css.j2', output_folder / pages.stylesheet, ['documentation_page', None]),
+      (template_folder / 'documentation.js.j2',  output_folder / pages.script,     ['documentation_page', None]),
+      search,
+      (template_folder / template,               output_folder / pages.index,      ['documentation_page', None]),
+    ]
+    for index, page in enumerate(pages.pages):
+      outputs.append((template_folder / template, output_folder / pages.page_files[id(page)], ['documentation_page', index]))
+    return outputs
+  if template in _output_writers:
+    return [(Path(template), output_folder / f'{register_bank_name}{suffix}', None)]
+  return [(template_folder / template, output_folder / f'{register_bank_name}{suffix}', None)]
+
+
+
+def _render_target(output):
+  """Render an output of the bank inherited from the parent process, with one render engine per worker."""
+  register_bank, targets, render_options, testbench_shards = _generated_bank
+  template_path, output_path, part = output
+  return render_output(warmed_render_engine(register_bank, targets), template_path, output_path, _output_variables(register_bank, part, testbench_shards), **render_options)
+
+
+
+def _write_shard_list(shard_list_path:Path, outputs:list, register_bank, testbench_shards:list, log=print):
+  """Write the list of the testbench shards next to them if it changed, for the simulation flow to compile and run them in parallel."""
+  register_bank_name = f'{register_bank.name}__register_bank'
+  shard_list = {'include': outputs[0][1].name, 'shards': []}
+  for _, output_path, part in outputs[1:]:
+    _, index, _, policy = part
+    shard_list['policy'] = policy
+    shard_list['shards'].append({
+      'file'      : output_path.name,
+      'top'       : f'{register_bank_name}__testbench_shard_{index}',
+      'registers' : len(testbench_shards[index]),
+    })
+  if read_manifest(shard_list_path) != shard_list:
+    write_manifest(shard_list_path, shard_list)
+    log(f"Successfully generated file '{shard_list_path}'.")
+
+
+
+def _generate_bank(self, targets:list, jobs:int, force:bool, render_options:dict, testbench_sharding:Optional[tuple]=None, documentation_pages:bool=False, log=print) -> dict:
+  """Generate the files of the selected targets of the register bank, passing the progress messages to the log function. Return the error messages of the failed output files."""
+  global _generated_bank
+  streaming = render_options['streaming']
+  profile   = render_options['profile']
+  start     = time.perf_counter()
 
   # Path objects
   register_bank_name = f'{self.name}__register_bank'
-  template_folder    = Path('templates')
   output_folder      = Path(register_bank_name)
+  manifest_path      = output_folder / f'{register_bank_name}.manifest.json'
+  profile_path       = output_folder / f'{register_bank_name}.profile.json'
+  # The registers of the bank are partitioned once for all the testbench shards
+  testbench_shards = register_shards(self, *testbench_sharding) if 'testbench' in targets and testbench_sharding is not None else None
+  outputs = {target: _target_outputs(self, target, testbench_sharding, testbench_shards, documentation_pages) for target in targets}
+
+  # The outputs of the last generation are still valid if the bank, the tool
+  # versions, their template and the output file did not change since
+  last      = read_manifest(manifest_path)
+  previous  = {} if force or profile else last
+  manifest  = {'tool': tool_versions(), 'input': bank_digest(self), 'targets': {}}
+  templates = {template_path: template_digest(template_path) for target in targets for template_path, _, _ in outputs[target]}
+  previous_targets = {}
+  if previous.get('tool') == manifest['tool'] and previous.get('input') == manifest['input']:
+    previous_targets = previous.get('targets', {})
+  # The outputs of the other targets keep their entry, the generation only covers the selected ones
+  for name, entry in previous_targets.items():
+    if entry.get('target') not in targets:
+      manifest['targets'][name] = entry
+  pending = []
+  for target in targets:
+    for output in outputs[target]:
+      template_path, output_path, part = output
+      entry = previous_targets.get(output_path.name)
+      if entry is not None and entry.get('template') == templates[template_path] and entry.get('streaming', False) == streaming and entry.get('part') == part and output_path.is_file() and entry.get('stamp') == file_stamp(output_path):
+        manifest['targets'][output_path.name] = entry
+      else:
+        pending.append(output)
+
+  # Render each outdated template, the workers are forked to share the elaborated
+  # bank without serializing it, each one reusing the render engine of its process
+  output_folder.mkdir(parents=True, exist_ok=True)
+  if not pending:
+    results = []
+  elif jobs <= 1 or len(pending) < 2 or 'fork' not in get_all_start_methods():
+    render_engine = warmed_render_engine(self, targets)
+    try:
+      results = [render_output(render_engine, template_path, output_path, _output_variables(self, part, testbench_shards), **render_options) for template_path, output_path, part in pending]
+    finally:
+      _release_render_engine(render_engine)
+  else:
+    _generated_bank = (self, targets, render_options, testbench_shards)
+    try:
+      with ProcessPoolExecutor(max_workers=min(jobs, len(pending)), mp_context=get_context('fork')) as executor:
+        results = list(executor.map(_render_target, pending))
+    finally:
+      _generated_bank = None
+  results = {output_path.name: result for (_, output_path, _), result in zip(pending, results)}
+
+  # Report each output file, a failed template does not stop the others
+  failures = {}
+  profiles = {}
+  for target in targets:
+    for template_path, output_path, part in outputs[target]:
+      if output_path.name not in results:
+        log(f"File '{output_path}' is up to date.")
+        continue
+      error, digest, written, report = results[output_path.name]
+      if error is not None:
+        log(f"ERROR: {error}")
+        failures[str(output_path)] = error
+        continue
+      if written:
+        log(f"Successfully generated file '{output_path}'.")
+      else:
+        log(f"File '{output_path}' is unchanged.")
+      manifest['targets'][output_path.name] = {'target': target, 'template': templates[template_path], 'streaming': streaming, 'output': digest, 'stamp': file_stamp(output_path)}
+      if part is not None:
+        manifest['targets'][output_path.name]['part'] = part
+      if report is not None:
+        profiles[output_path.name] = report
+  write_manifest(manifest_path, manifest)
+
+  # Outputs of the selected targets from the last generation that are not generated anymore, like the shards of a previous shard count or the pages of a previous layout
+  output_names = {output_path.name for target in targets for _, output_path, _ in outputs[target]}
+  for name, entry in last.get('targets', {}).items():
+    if entry.get('target') in targets and name not in output_names and (output_folder / name).is_file():
+      (output_folder / name).unlink()
+      log(f"Removed outdated file '{output_folder / name}'.")
+
+  # List of the testbench shards
+  if 'testbench' in targets:
+    shard_list_path = output_folder / f'{register_bank_name}.testbench_shards.json'
+    if testbench_sharding is not None:
+      _write_shard_list(shard_list_path, outputs['testbench'], self, testbench_shards, log)
+    elif shard_list_path.is_file():
+      shard_list_path.unlink()
+      log(f"Removed outdated file '{shard_list_path}'.")
+
+  # Report of the profiled renders, in the same format as the manifest
+  if profile:
+    write_manifest(profile_path, {'tool': tool_versions(), 'jobs': jobs, 'streaming': streaming, 'wall_time': time.perf_counter() - start, 'targets': profiles})
+    log(f"Profile of the generation written to '{profile_path}'.")
+  return failures
+
+
+
+def _testbench_sharding(testbench_shards:Optional[int], shard_policy:str) -> Optional[tuple]:
+  """Return the number of shards and the shard policy of the sharded testbench, or None for the single testbench."""
+  if testbench_shards is None:
+    return None
+  check_shard_options(testbench_shards, shard_policy)
+  return testbench_shards, shard_policy
+
+
+
+def generate(self, targets:Optional[list]=None, jobs:int=1, force:bool=False, template_cache:bool=True, disk_cache:bool=False, streaming:bool=False, profile:bool=False, testbench_shards:Optional[int]=None, shard_policy:str='register_count', documentation_pages:bool=False) -> dict:
+  """Generate the files of the selected targets of the elaborated register bank, all of them by default, return the error messages of the failed output files."""
+  # Only the outputs whose inputs changed since the last generation are
+  # rendered, in jobs worker processes, and only the changed outputs are
+  # written, unless forced.
+  # - template_cache keeps the compiled templates for the process, and
+  #   disk_cache in the user cache directory.
+  # - streaming writes the outputs in chunks with the alignment local to each
+  #   chunk, to bound the memory on large banks.
+  # - profile renders all the selected targets and reports the wall time, peak
+  #   memory, output size and time breakdown of each template next to them.
+  # - testbench_shards splits the testbench into standalone shards of balanced
+  #   register count, keeping the top-level register files and arrays whole
+  #   with the register_file shard_policy, listed next to them.
+  # - documentation_pages splits the documentation into an index page and one
+  #   page per top-level register file or array, the array elements being
+  #   instantiated by the browser.
+  render_options = {'template_cache': template_cache, 'disk_cache': disk_cache, 'streaming': streaming, 'profile': profile}
+  return _generate_bank(self, select_targets(targets), jobs, force, render_options, _testbench_sharding(testbench_shards, shard_policy), documentation_pages)
+
+
+
+def _generate_batch_bank(register_bank, targets:list, force:bool, render_options:dict, testbench_sharding:Optional[tuple], documentation_pages:bool):
+  """Generate a register bank of a batch, return its progress messages, the error messages of its failed output files, and its generation time."""
+  messages = []
+  start    = time.perf_counter()
+  try:
+    failures = _generate_bank(register_bank, targets, 1, force, render_options, testbench_sharding, documentation_pages, messages.append)
+  # A failed bank does not stop the others
+  except Exception as exception:
+    error = f"Could not generate the register bank '{register_bank.name}': {exception}"
+    messages.append(f"ERROR: {error}")
+    failures = {f'{register_bank.name}__register_bank': error}
+  return messages, failures, time.perf_counter() - start
+
+
+
+def _generate_inherited_bank(index:int):
+  """Generate a register bank of the batch inherited from the parent process."""
+  register_banks, targets, force, render_options, testbench_sharding, documentation_pages = _generated_banks
+  return _generate_batch_bank(register_banks[index], targets, force, render_options, testbench_sharding, documentation_pages)
+
+
+
+def _collect_batch_results(register_banks:list, results) -> dict:
+  """Print the progress messages of the banks as their generation completes, return their generation time and failures by name."""
+  summary = {}
+  for index, (messages, failures, seconds) in results:
+    for message in messages:
+      print(message)
+    summary[register_banks[index].name] = {'time': seconds, 'failures': failures}
+  return summary
+
+
+
+def generate_many(register_banks:list, targets:Optional[list]=None, jobs:int=1, force:bool=False, template_cache:bool=True, disk_cache:bool=False, streaming:bool=False, profile:bool=False, testbench_shards:Optional[int]=None, shard_policy:str='register_count', documentation_pages:bool=False) -> dict:
+  """Generate the files of many elaborated register banks, return the generation time and the error messages of the failed output files of each bank by name."""
+  # The banks are generated in jobs worker processes, each one reusing one
+  # render engine, with the options of generate.
+  global _generated_banks
+  targets            = select_targets(targets)
+  render_options     = {'template_cache': template_cache, 'disk_cache': disk_cache, 'streaming': streaming, 'profile': profile}
+  testbench_sharding = _testbench_sharding(testbench_shards, shard_policy)
+  start          = time.perf_counter()
+
+  # Banks with the same name would overwrite each other's files
+  names = Counter(register_bank.name for register_bank in register_banks)
+  duplicates = [name for name, count in names.items() if count > 1]
+  if duplicates:
+    raise ValueError(f"Several register banks are named {', '.join(repr(name) for name in duplicates)}, their generated files would collide.")
+
+  # The largest banks are started first, for the smaller ones to balance the workers at the end
+  order = sorted(range(len(register_banks)), key=lambda index: -len(register_banks[index].registers))
+  if jobs <= 1 or len(register_banks) < 2 or 'fork' not in get_all_start_methods():
+    summary = _collect_batch_results(register_banks, ((index, _generate_batch_bank(register_banks[index], targets, force, render_options, testbench_sharding, documentation_pages)) for index in order))
+  else:
+    _generated_banks = (register_banks, targets, force, render_options, testbench_sharding, documentation_pages)
+    try:
+      with ProcessPoolExecutor(max_workers=min(jobs, len(register_banks)), mp_context=get_context('fork')) as executor:
+        futures = {executor.submit(_generate_inherited_bank, index): index for index in order}
+        summary = _collect_batch_results(register_banks, ((futures[future], future.result()) for future in as_completed(futures)))
+    finally:
+      _generated_banks = None
 
-  # Render each templates
-  render_template(render_engine, template_folder / 'register_bank.sv.j2',   output_folder/ f'{register_bank_name}.sv')
-  render_template(render_engine, template_folder / 'package.sv.j2',         output_folder/ f'{register_bank_name}.package.sv')
-  render_template(render_engine, template_folder / 'testbench.sv.j2',       output_folder/ f'{register_bank_name}.testbench.sv')
-  render_template(render_engine, template_folder / 'macros.h.j2',           output_folder/ f'{register_bank_name}.macros.h')
-  render_template(render_engine, template_folder / 'structs.h.j2',          output_folder/ f'{register_bank_name}.structs.h')
-  render_template(render_engine, template_folder / 'documentation.html.j2', output_folder/ f'{register_bank_name}.html')
+  # Summary in the order of the banks
+  failed = sum(1 for name in summary if summary[name]['failures'])
+  print(f"Generated {len(register_banks)} register banks in {time.perf_counter() - start:.2f} seconds, {failed} with errors.")
+  return {register_bank.name: summary[register_bank.name] for register_bank in register_banks}
@@ -0,0 +1,97 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Lookup methods of the register bank. The address and path    ║
+# ║              indexes are built at the end of the elaboration.             ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from bisect import bisect_right
+from omnicores_register.register_file import RegisterFile
+from omnicores_register.register import Register
+from omnicores_register.component_array import ComponentArray
+
+
+
+def _index_register(register, index, outer_entry, segments):
+  """Add the address segment of a register, followed by the entry of the enclosing region."""
+  segments.append((register.address,     (register, index)))
+  segments.append((register.address + 4, outer_entry))
+
+
+
+def _index_file(file, index, outer_entry, segments):
+  """Add the address segments of a file and its components, followed by the entry of the enclosing region."""
+  file_entry = (file, index)
+  segments.append((file.address, file_entry))
+  _index_components(file, index, file_entry, segments)
+  segments.append((file.address + file.size, outer_entry))
+
+
+
+def _index_components(container, index, container_entry, segments):
+  """Add the address segments of the components of a container in address order."""
+  for component in container.components:
+    if isinstance(component, ComponentArray):
+      # The gaps between strided elements resolve to the array itself
+      array_entry = (component, index)
+      segments.append((component.address, array_entry))
+      expanded_registers, expanded_files = component._create_and_get_expanded()
+      for register in expanded_registers:
+        _index_register(register, register.array_index, array_entry, segments)
+      for file in expanded_files:
+        _index_file(file, file.array_index, array_entry, segments)
+      segments.append((component.address + component.region_size, container_entry))
+    elif isinstance(component, Register):
+      _index_register(component, index, container_entry, segments)
+    elif isinstance(component, RegisterFile):
+      _index_file(component, index, container_entry, segments)
+
+
+
+def build_lookup_indexes(bank):
+  """Build the address and hierarchical name indexes of the register bank after elaboration."""
+  # Pairs of registers sharing an address, with the first register at this address
+  registers_by_address    = {}
+  bank._address_conflicts = []
+  for register in bank.registers:
+    conflicting_register = registers_by_address.setdefault(register.address, register)
+    if conflicting_register is not register:
+      bank._address_conflicts.append((conflicting_register, register))
+  # Address segments, each one resolving to the innermost component starting
+  # there until the next segment. Nested regions are listed after their
+  # parent, the stable sort keeps the innermost entry last for each address.
+  segments = []
+  _index_components(bank, None, None, segments)
+  segments.sort(key=lambda segment: segment[0])
+  bank._address_starts  = []
+  bank._address_entries = []
+  for start, entry in segments:
+    if bank._address_starts and bank._address_starts[-1] == start:
+      bank._address_entries[-1] = entry
+    else:
+      bank._address_starts.append(start)
+      bank._address_entries.append(entry)
+  # Hierarchical names of the registers and files
+  bank._components_by_path = {}
+  for component in bank.registers + bank.files:
+    bank._components_by_path.setdefault(component.hierarchical_name, component)
+
+
+
+def find_by_address(self, address:int):
+  """Return the register at an address, or the innermost file or array region containing it, with the index of the enclosing array element."""
+  position = bisect_right(self._address_starts, address) - 1
+  if position < 0:
+    return None
+  return self._address_entries[position]
+
+
+
+def find_by_path(self, path:str):
+  """Return the register or file with the hierarchical name, or None."""
+  return self._components_by_path.get(path)
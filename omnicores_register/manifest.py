@@ -0,0 +1,184 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Generation manifest stored next to the generated files. It   ║
+# ║              records the hashes of the inputs, templates, tool versions,  ║
+# ║              and outputs of the last generation to skip the unchanged.    ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import re
+import json
+import hashlib
+import importlib.metadata
+import importlib.resources
+from enum import Enum
+from functools import cache
+from pathlib import Path
+from omnicores_register.enums import UNSPECIFIED
+from omnicores_register.tracked_component import TrackedComponent
+
+
+
+# Templates included by a template, loaded from the same folder
+_include_tag = re.compile(r'''\{%-?\s*include\s+['"]([^'"]+)['"]''')
+
+# Attributes left out of the bank digest: links, change flags, configured values
+# kept aside by the elaboration, caches, and the flat lists, statistics and
+# indexes derived from the hierarchy
+_undigested_attributes = frozenset({
+  'parent',
+  '_dirty',
+  '_dirty_subtree',
+  '_moved',
+  '_configured',
+  '_cached_address',
+  '_cached_epoch',
+  '_layout_epoch',
+  '_placement_address',
+  '_placement_offset',
+  '_traversal_cache',
+  '_expanded_registers',
+  '_expanded_files',
+  '_needs_wrapper',
+  '_wrapper_pad_words',
+  'registers',
+  'files',
+  'elaboration_stats',
+  'shape_stats',
+  'traversal_stats',
+  '_traversal_epoch',
+  '_address_starts',
+  '_address_entries',
+  '_address_conflicts',
+  '_components_by_path',
+  'field_table',
+})
+
+_digested_slots_cache = {}
+
+
+
+def _digested_slots(component_class):
+  """Return the slots of a component class included in the bank digest."""
+  if component_class not in _digested_slots_cache:
+    _digested_slots_cache[component_class] = [
+      name
+      for cls in component_class.__mro__
+      for name in cls.__dict__.get('__slots__', ())
+      if name not in _undigested_attributes
+    ]
+  return _digested_slots_cache[component_class]
+
+
+
+def _digest_value(value, digest):
+  """Feed a configuration or elaboration value to the digest, recursing into the components."""
+  if isinstance(value, (list, tuple)):
+    digest.update(b'[')
+    for item in value:
+      _digest_value(item, digest)
+    digest.update(b']')
+  elif isinstance(value, dict):
+    digest.update(b'{')
+    for key in sorted(value, key=repr):
+      _digest_value(key,        digest)
+      _digest_value(value[key], digest)
+    digest.update(b'}')
+  elif isinstance(value, TrackedComponent):
+    _digest_component(value, digest)
+  elif value is UNSPECIFIED:
+    digest.update(b'UNSPECIFIED;')
+  elif isinstance(value, Enum):
+    digest.update(f"{type(value).__name__}.{value.value};".encode())
+  else:
+    digest.update(f"{value!r};".encode())
+
+
+
+def _digest_component(component, digest):
+  """Feed the attributes of a component and its sub-components to the digest."""
+  digest.update(f"<{type(component).__name__}".encode())
+  for name in _digested_slots(type(component)):
+    digest.update(f" {name}=".encode())
+    _digest_value(getattr(component, name, None), digest)
+  digest.update(b">")
+
+
+
+def bank_digest(bank) -> str:
+  """Return the hash of the configuration and elaboration of the register bank."""
+  digest = hashlib.sha256()
+  _digest_component(bank, digest)
+  return digest.hexdigest()
+
+
+
+# Installed versions cannot change during the process, read once for all the
+# templates, outputs and manifests
+@cache
+def tool_versions() -> str:
+  """Return the versions of the generator and of the rendering engine."""
+  versions = []
+  for package in ('omnicores-registers', 'j2gpp', 'j2gpp_verilog'):
+    try:
+      versions.append(f"{package} {importlib.metadata.version(package)}")
+    except importlib.metadata.PackageNotFoundError:
+      versions.append(f"{package} unknown")
+  return ", ".join(versions)
+
+
+
+def template_digest(template_path:str|Path) -> str:
+  """Return the hash of a template from the library package and of the templates it includes, or None if one of them is missing."""
+  try:
+    source = importlib.resources.files('omnicores_register').joinpath(template_path).read_bytes()
+  except FileNotFoundError:
+    return None
+  digest = hashlib.sha256(source)
+  for included_name in _include_tag.findall(source.decode()):
+    included_digest = template_digest(Path(template_path).parent / included_name)
+    if included_digest is None:
+      return None
+    digest.update(included_digest.encode())
+  return digest.hexdigest()
+
+
+
+def file_digest(path:str|Path) -> str:
+  """Return the hash of a file, read in chunks."""
+  digest = hashlib.sha256()
+  with open(path, 'rb') as file:
+    for chunk in iter(lambda: file.read(1 << 20), b''):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+
+def file_stamp(path:str|Path) -> list:
+  """Return the size and modification time of a file, to detect outside changes without hashing it."""
+  stat = Path(path).stat()
+  return [stat.st_size, stat.st_mtime_ns]
+
+
+
+def read_manifest(path:str|Path) -> dict:
+  """Return the manifest of the last generation, or an empty manifest if missing or unreadable."""
+  try:
+    with open(path) as file:
+      manifest = json.load(file)
+  except (OSError, ValueError):
+    return {}
+  return manifest if isinstance(manifest, dict) else {}
+
+
+
+def write_manifest(path:str|Path, manifest:dict):
+  """Write the manifest of the generation next to the generated files."""
+  with open(path, 'w') as file:
+    json.dump(manifest, file, indent=2, sort_keys=True)
+    file.write("\n")
@@ -0,0 +1,96 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Base class of the components placed in the address map. The ║
+# ║              address is stored relative to the parent's base address and  ║
+# ║              the absolute address is resolved lazily.                     ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from itertools import count
+from omnicores_register.tracked_component import TrackedComponent
+
+
+
+# Layout epochs of the roots of the hierarchies, drawn from a single sequence so a
+# component moved to another root never matches the epoch of its cached address
+_layout_epochs = count(1)
+
+
+
+def invalidate_layout(component):
+  """Invalidate the cached absolute addresses of the components in the hierarchy of a component, after a placement change."""
+  root = component
+  while root.parent is not None:
+    root = root.parent
+  object.__setattr__(root, '_layout_epoch', next(_layout_epochs))
+
+
+
+class PlacedComponent(TrackedComponent):
+  """Base class of the components placed relative to the base address of their parent."""
+
+  __slots__ = ('_relative_address', '_cached_address', '_cached_epoch', '_layout_epoch', '_placement_address', '_placement_offset')
+
+  # Initial values of the slots, the component is placed during elaboration
+  _slot_defaults = TrackedComponent._slot_defaults | {
+    '_relative_address'  : None,  # Byte offset from the base address of the parent
+    '_cached_address'    : None,  # Absolute address resolved during the layout epoch below
+    '_cached_epoch'      : None,
+    '_layout_epoch'      : 0,     # Epoch of the cached addresses of the hierarchy, when this component is its root
+    '_placement_address' : None,  # Absolute address before own alignment, from the last elaboration
+    '_placement_offset'  : None,  # Offset within the parent before own alignment, from the last elaboration
+  }
+
+  def __getstate__(self):
+    # Copies resolve their absolute address from their own parent
+    state = super().__getstate__()
+    state.pop('_cached_address', None)
+    state.pop('_cached_epoch',   None)
+    return state
+
+  @property
+  def relative_address(self):
+    """Byte offset from the base address of the parent container or array."""
+    return self._relative_address
+
+  @relative_address.setter
+  def relative_address(self, value):
+    object.__setattr__(self, '_relative_address', value)
+    invalidate_layout(self)
+
+  def _resolved_address(self, epoch):
+    """Return the absolute byte address cached for the layout epoch of the root, resolving the parents once per epoch."""
+    if self._cached_epoch != epoch:
+      address = self._relative_address
+      if address is not None and isinstance(self.parent, PlacedComponent):
+        parent_address = self.parent._resolved_address(epoch)
+        address = None if parent_address is None else address + parent_address
+      object.__setattr__(self, '_cached_address', address)
+      object.__setattr__(self, '_cached_epoch',   epoch)
+    return self._cached_address
+
+  @property
+  def address(self):
+    """Absolute byte address, resolved from the parent's base address and cached until the layout of the hierarchy changes."""
+    root = self.parent
+    if root is None:
+      return self._resolved_address(self._layout_epoch)
+    while root.parent is not None:
+      root = root.parent
+    if self._cached_epoch == root._layout_epoch:
+      return self._cached_address
+    return self._resolved_address(root._layout_epoch)
+
+  @address.setter
+  def address(self, value):
+    if value is not None and isinstance(self.parent, PlacedComponent):
+      parent_address = self.parent.address
+      if parent_address is None:
+        raise ValueError(f"Cannot set the absolute address of a {type(self).__name__} before the address of its parent is resolved by the elaboration.")
+      value -= parent_address
+    self.relative_address = value
@@ -0,0 +1,165 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Render profiling of the templates. An instrumented render    ║
+# ║              attributes the time to the template lines, the loops, macros ║
+# ║              and filter blocks, and the functions called by the template. ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import os
+import re
+import sys
+import time
+import jinja2
+import tracemalloc
+
+# Template statements delimiting the sections of the breakdown
+_section_tag = re.compile(r'\{%[-+]?\s*(end)?(for|macro|block|call|filter)\b(.*?)[-+]?%\}', re.S)
+
+# Jinja runtime helpers between the template code and the functions it calls
+_jinja_directory = os.path.dirname(jinja2.__file__)
+
+# Number of hottest template lines in the report
+profiled_lines_count = 20
+
+
+
+def template_sections(source:str) -> list:
+  """Return the loops, macros, blocks and filter blocks of a template source as (kind, statement, first line, last line) tuples."""
+  sections = []
+  opened   = []
+  for match in _section_tag.finditer(source):
+    line = source.count('\n', 0, match.start()) + 1
+    end, kind, arguments = match.groups()
+    if not end:
+      opened.append((kind, f"{kind} {' '.join(arguments.split())}", line))
+    elif opened and opened[-1][0] == kind:
+      sections.append(opened.pop() + (source.count('\n', 0, match.end()) + 1,))
+  sections.sort(key=lambda section: section[2])
+  return sections
+
+
+
+class TemplateProfiler:
+  """Tracer attributing the time of a render to the lines of the template, and to the functions called from the template code."""
+
+  def __init__(self, template):
+    self.template      = template
+    self.globals       = template.root_render_func.__globals__  # Namespace shared by the compiled template functions
+    self.line_numbers  = {}     # Template line of each line of the compiled code
+    self.line_times    = {}     # Time spent on each template line, including the functions it calls
+    self.call_stats    = {}     # Number of calls and cumulative time of each function called by the template
+    self.jinja_codes   = {}     # Whether each code object belongs to the Jinja runtime
+    self.current_line  = None
+    self.current_time  = None
+
+  def _is_jinja(self, code) -> bool:
+    if code not in self.jinja_codes:
+      self.jinja_codes[code] = code.co_filename.startswith(_jinja_directory)
+    return self.jinja_codes[code]
+
+  def _template_event(self, frame=None):
+    """Attribute the time since the last template event to the last template line, and move to the line of the frame."""
+    now = time.perf_counter()
+    if self.current_line is not None:
+      self.line_times[self.current_line] = self.line_times.get(self.current_line, 0.0) + now - self.current_time
+    self.current_time = now
+    if frame is None:
+      self.current_line = None
+      return
+    if frame.f_lineno not in self.line_numbers:
+      self.line_numbers[frame.f_lineno] = self.template.get_corresponding_lineno(frame.f_lineno)
+    self.current_line = self.line_numbers[frame.f_lineno]
+
+  def _trace_template(self, frame, event, argument):
+    self._template_event(frame)
+    return self._trace_template
+
+  def _trace(self, frame, event, argument):
+    # Frames of the template code trace their lines
+    if frame.f_globals is self.globals:
+      self._template_event(frame)
+      return self._trace_template
+    # Functions called from the template code, directly or through a runtime helper
+    if self._is_jinja(frame.f_code):
+      return None
+    caller = frame.f_back
+    if caller is not None and caller.f_globals is not self.globals and self._is_jinja(caller.f_code):
+      caller = caller.f_back
+    if caller is None or caller.f_globals is not self.globals:
+      return None
+    code  = frame.f_code
+    name  = f"{frame.f_globals.get('__name__', '')}.{getattr(code, 'co_qualname', code.co_name)}"
+    start = time.perf_counter()
+    frame.f_trace_lines = False
+    def trace_return(frame, event, argument):
+      if event == 'return':
+        calls, total = self.call_stats.get(name, (0, 0.0))
+        self.call_stats[name] = (calls + 1, total + time.perf_counter() - start)
+      return trace_return
+    return trace_return
+
+  def run(self, render):
+    """Call the render function under the tracer."""
+    previous = sys.gettrace()
+    sys.settrace(self._trace)
+    try:
+      render()
+    finally:
+      sys.settrace(previous)
+      self._template_event()
+
+  def report(self, source:str) -> dict:
+    """Return the breakdown of the render time by section, line and called function, hottest first."""
+    total        = sum(self.line_times.values())
+    share        = lambda seconds: seconds / total if total else 0.0
+    source_lines = source.split('\n')
+    sections = []
+    for kind, statement, first_line, last_line in template_sections(source):
+      seconds = sum(self.line_times.get(line, 0.0) for line in range(first_line, last_line + 1))
+      sections.append({'kind': kind, 'statement': statement, 'lines': [first_line, last_line], 'time': seconds, 'share': share(seconds)})
+    lines = [
+      {'line': line, 'source': source_lines[line - 1].strip() if 0 < line <= len(source_lines) else "", 'time': seconds, 'share': share(seconds)}
+      for line, seconds in sorted(self.line_times.items(), key=lambda item: -item[1])[:profiled_lines_count]
+    ]
+    calls = [
+      {'function': name, 'calls': calls, 'time': seconds, 'share': share(seconds)}
+      for name, (calls, seconds) in sorted(self.call_stats.items(), key=lambda item: -item[1][1])
+    ]
+    return {
+      'profiled_time' : total,
+      'sections'      : sorted(sections, key=lambda section: -section['time']),
+      'lines'         : lines,
+      'calls'         : calls,
+    }
+
+
+
+def peak_render_memory(render) -> int:
+  """Call the render function under the memory tracing, return the peak memory allocated during the render."""
+  started_tracing = not tracemalloc.is_tracing()
+  if started_tracing:
+    tracemalloc.start()
+  tracemalloc.reset_peak()
+  baseline = tracemalloc.get_traced_memory()[0]
+  try:
+    render()
+    return tracemalloc.get_traced_memory()[1] - baseline
+  finally:
+    if started_tracing:
+      tracemalloc.stop()
+
+
+
+def profile_render(template, source:str, render) -> dict:
+  """Render a compiled template again under the memory tracing and under the profiler, return its peak memory and its time breakdown."""
+  # Separate renders, the memory tracing would also trace the allocations of the profiler
+  peak_memory = peak_render_memory(render)
+  profiler    = TemplateProfiler(template)
+  profiler.run(render)
+  return {'peak_memory': peak_memory} | profiler.report(source)
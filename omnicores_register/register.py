@@ -18,6 +18,17 @@ from omnicores_register.accessible_component import AccessibleComponent
 
 
 class Register(AddressableComponent, AccessibleComponent):
+
+  __slots__ = AccessibleComponent._mixin_slots + (
+    'width',
+    'reset_value',
+    'fields',
+    'sw_struct_fields_padding',
+    'has_sw_read_side_effect',
+  )
+
+  _tracked_attributes = AddressableComponent._tracked_attributes | AccessibleComponent._tracked_attributes | {'width', 'reset_value', 'fields'}
+
   def __init__(
       self,
       name              : str,
@@ -55,6 +66,8 @@ class Register(AddressableComponent, AccessibleComponent):
     self.width       = width
     self.reset_value = reset_value
     self.fields      = fields or []
+    for field in self.fields:
+      field.parent = self
 
     # Padding after the last field to fill the register width
     self.sw_struct_fields_padding = 0
@@ -71,6 +84,8 @@ class Register(AddressableComponent, AccessibleComponent):
 
   def add_field(self, field:Field):
     self.fields.append(field)
+    field.parent = self
+    field.mark_dirty()
 
   def has_sw_write_once_field(self) -> bool:
     """Return True if any field has write-once software access."""
@@ -15,12 +15,33 @@ from omnicores_register.component_container import ComponentContainer
 from omnicores_register.elaborate import elaborate
 from omnicores_register.validate import validate
 from omnicores_register.generate import generate
+from omnicores_register.lookup import find_by_address, find_by_path
 from omnicores_register.enums import PackingPolicy, UNSPECIFIED
 
 
 
 class RegisterBank(ComponentContainer):
   """Core class and root of the data structure describing the generated register bank."""
+
+  __slots__ = ComponentContainer._mixin_slots + (
+    'registers',
+    'files',
+    'has_sw_read_side_effect',
+    'has_sw_write_once',
+    'address_width',
+    'address_width_nibbles',
+    'elaboration_stats',
+    'shape_stats',
+    'traversal_stats',
+    '_traversal_epoch',
+    '_layout_epoch',
+    '_address_starts',
+    '_address_entries',
+    '_address_conflicts',
+    '_components_by_path',
+    'field_table',
+  )
+
   # Constructor
   def __init__(self, name:str, packing:PackingPolicy=UNSPECIFIED):
     super().__init__(name, packing=packing)
@@ -38,7 +59,32 @@ class RegisterBank(ComponentContainer):
     self.address_width         = 0
     self.address_width_nibbles = 0
 
+    # Number of components touched by each pass of the last elaboration
+    self.elaboration_stats = {}
+
+    # Number of register file instances and of their unique shapes in the last elaboration
+    self.shape_stats = {}
+
+    # Hit and miss counts of the memoized traversals of the containers of the bank,
+    # invalidated by incrementing the epoch at the end of every elaboration
+    self.traversal_stats  = {'hits': 0, 'misses': 0}
+    self._traversal_epoch = 0
+
+    # Epoch of the cached absolute addresses of the components of the bank
+    self._layout_epoch = 0
+
+    # Lookup indexes, built at the end of elaboration
+    self._address_starts     = []
+    self._address_entries    = []
+    self._address_conflicts  = []
+    self._components_by_path = {}
+
+    # Columnar field table of the optional NumPy backend (built during elaboration)
+    self.field_table = None
+
   # Import the methods from their dedicated files
-  elaborate = elaborate
-  validate  = validate
-  generate  = generate
+  elaborate       = elaborate
+  validate        = validate
+  generate        = generate
+  find_by_address = find_by_address
+  find_by_path    = find_by_path
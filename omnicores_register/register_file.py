@@ -19,6 +19,16 @@ from omnicores_register.enums import PackingPolicy, UNSPECIFIED
 
 
 class RegisterFile(ComponentContainer, AddressableComponent):
+
+  # The name slot is already held by AddressableComponent
+  __slots__ = tuple(name for name in ComponentContainer._mixin_slots if name not in AddressableComponent.__slots__) + (
+    'size',
+    'sw_struct_empty',
+    'sw_struct_tail_padding',
+  )
+
+  _tracked_attributes = ComponentContainer._tracked_attributes | AddressableComponent._tracked_attributes
+
   def __init__(
       self,
       name        : str,
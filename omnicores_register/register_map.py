@@ -0,0 +1,321 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Binary register map of the elaborated register bank, with    ║
+# ║              fixed-size register and field records, a reset value table,  ║
+# ║              a string table and a register index sorted by address. The   ║
+# ║              reader decodes the records from the memory-mapped file,      ║
+# ║              without the model.                                           ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Optional
+from omnicores_register.enums import (
+  SoftwareAccessType,
+  HardwareAccessType,
+  HardwareWriteOptions,
+  HardwareReadOptions,
+  SoftwareWriteBehavior,
+  SoftwareReadBehavior,
+)
+
+# Identification of the file format
+register_map_magic   = b'OCREGMAP'
+register_map_version = 2
+
+# Little-endian records, the offsets are from the start of the file, the names
+# are offsets in the string table of null-terminated UTF-8 strings, and the
+# reset values are offsets and sizes in the value table of little-endian
+# unsigned integers of any width
+_header_record = struct.Struct('<8sHHHHIIIIIIIIII')
+# magic, version, address width, register record size, field record size,
+# register count, field count, registers offset, fields offset, index offset,
+# values offset, values size, strings offset, strings size, bank name
+
+_register_record = struct.Struct('<QIIIIIHHHHHBBBBB1x')
+# address, reset value, name, hierarchical name, first field, array index,
+# field count, width, reset value size, hardware write options, hardware read
+# options, software access, hardware access, software write behavior, software
+# read behavior, flags
+
+_field_record = struct.Struct('<IIIHHHHHBBBBB1x')
+# reset value, name, register, offset, width, reset value size, hardware write
+# options, hardware read options, software access, hardware access, software
+# write behavior, software read behavior, flags
+
+_index_record = struct.Struct('<I')
+# register, in address order
+
+# Flags of the records
+_has_reset_value  = 1
+_is_array_element = 2
+
+# Array index of the registers that are not array elements
+_no_array_index = 0xFFFFFFFF
+
+
+
+class _StringTable:
+  """String table of the register map, each distinct string stored once."""
+
+  def __init__(self):
+    self.offsets = {}
+    self.data    = bytearray()
+
+  def add(self, string:str) -> int:
+    if string not in self.offsets:
+      self.offsets[string] = len(self.data)
+      self.data += string.encode() + b'\x00'
+    return self.offsets[string]
+
+
+
+class _ValueTable:
+  """Reset value table of the register map, each distinct value stored once as little-endian bytes sized to its width."""
+
+  def __init__(self):
+    self.offsets = {}
+    self.data    = bytearray()
+
+  def add(self, value:Optional[int], width:int) -> tuple:
+    if value is None:
+      return 0, 0
+    data = value.to_bytes(max((width + 7) // 8, (value.bit_length() + 7) // 8), 'little')
+    if data not in self.offsets:
+      self.offsets[data] = len(self.data)
+      self.data += data
+    return self.offsets[data], len(data)
+
+
+
+def _access_values(component) -> tuple:
+  """Return the values of the access types, options and behaviors of a register or field, in record order."""
+  return (
+    component.hw_write_options.value,
+    component.hw_read_options.value,
+    component.software_access.value,
+    component.hardware_access.value,
+    component.sw_write_behavior.value,
+    component.sw_read_behavior.value,
+  )
+
+
+
+def write_register_map(register_bank, output_path:str|Path):
+  """Write the binary register map of the elaborated register bank."""
+  strings   = _StringTable()
+  values    = _ValueTable()
+  registers = register_bank.registers
+  register_records = []
+  field_records    = []
+  for index, register in enumerate(registers):
+    reset_offset, reset_size = values.add(register.reset_value, register.width)
+    flags = (_has_reset_value if register.reset_value is not None else 0) | (_is_array_element if register.is_array_element else 0)
+    register_records.append(_register_record.pack(
+      register.address,
+      reset_offset,
+      strings.add(register.name),
+      strings.add(register.hierarchical_name),
+      len(field_records),
+      register.array_index if register.is_array_element else _no_array_index,
+      len(register.fields),
+      register.width,
+      reset_size,
+      *_access_values(register),
+      flags,
+    ))
+    for field in register.fields:
+      reset_offset, reset_size = values.add(field.reset_value, field.width)
+      field_records.append(_field_record.pack(
+        reset_offset,
+        strings.add(field.name),
+        index,
+        field.offset,
+        field.width,
+        reset_size,
+        *_access_values(field),
+        _has_reset_value if field.reset_value is not None else 0,
+      ))
+  index_records = [_index_record.pack(index) for index in sorted(range(len(registers)), key=lambda index: registers[index].address)]
+  bank_name     = strings.add(register_bank.name)
+
+  # Sections in file order
+  registers_offset = _header_record.size
+  fields_offset    = registers_offset + len(register_records) * _register_record.size
+  index_offset     = fields_offset    + len(field_records)    * _field_record.size
+  values_offset    = index_offset     + len(index_records)    * _index_record.size
+  strings_offset   = values_offset    + len(values.data)
+  header = _header_record.pack(
+    register_map_magic,
+    register_map_version,
+    register_bank.address_width,
+    _register_record.size,
+    _field_record.size,
+    len(register_records),
+    len(field_records),
+    registers_offset,
+    fields_offset,
+    index_offset,
+    values_offset,
+    len(values.data),
+    strings_offset,
+    len(strings.data),
+    bank_name,
+  )
+  with open(output_path, 'wb') as output_file:
+    output_file.write(header)
+    output_file.write(b''.join(register_records))
+    output_file.write(b''.join(field_records))
+    output_file.write(b''.join(index_records))
+    output_file.write(values.data)
+    output_file.write(strings.data)
+
+
+
+class MappedField:
+  """Field decoded from a register map."""
+
+  __slots__ = ('name', 'offset', 'width', 'reset_value', 'software_access', 'hardware_access', 'sw_write_behavior', 'sw_read_behavior', 'hw_write_options', 'hw_read_options')
+
+  def __repr__(self):
+    return f"<MappedField {self.name} [{self.offset + self.width - 1}:{self.offset}]>"
+
+
+
+class MappedRegister:
+  """Register decoded from a register map, with its fields."""
+
+  __slots__ = ('name', 'hierarchical_name', 'address', 'width', 'reset_value', 'array_index', 'fields', 'software_access', 'hardware_access', 'sw_write_behavior', 'sw_read_behavior', 'hw_write_options', 'hw_read_options')
+
+  def __repr__(self):
+    return f"<MappedRegister {self.hierarchical_name} 0x{self.address:x}>"
+
+  @property
+  def size(self) -> int:
+    """Number of bytes of the register."""
+    return (self.width + 7) // 8
+
+
+
+class RegisterMap:
+  """Reader of a binary register map, decoding the records on access from the memory-mapped file. The registers are looked up by address in logarithmic time."""
+
+  def __init__(self, path:str|Path):
+    with open(path, 'rb') as map_file:
+      self._map = mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(self._map) < _header_record.size:
+      self._map.close()
+      raise ValueError(f"The file '{path}' is not a register map.")
+    (magic, version, self.address_width, register_record_size, field_record_size,
+     self.register_count, self.field_count, self._registers_offset, self._fields_offset,
+     self._index_offset, self._values_offset, _, self._strings_offset, _, bank_name) = _header_record.unpack_from(self._map, 0)
+    if magic != register_map_magic:
+      self._map.close()
+      raise ValueError(f"The file '{path}' is not a register map.")
+    if version != register_map_version or register_record_size != _register_record.size or field_record_size != _field_record.size:
+      self._map.close()
+      raise ValueError(f"The register map '{path}' has version {version}, expected version {register_map_version}.")
+    self.name = self._string(bank_name)
+
+  def close(self):
+    self._map.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exception):
+    self.close()
+
+  def __len__(self):
+    return self.register_count
+
+  def __getitem__(self, index:int) -> MappedRegister:
+    """Register of the given index, in hierarchy order."""
+    if not 0 <= index < self.register_count:
+      raise IndexError(f"Register index {index} out of range of the register map.")
+    return self._register(index)
+
+  def __iter__(self):
+    for index in range(self.register_count):
+      yield self._register(index)
+
+  def _string(self, offset:int) -> str:
+    start = self._strings_offset + offset
+    return self._map[start:self._map.find(b'\x00', start)].decode()
+
+  def _value(self, offset:int, size:int) -> int:
+    start = self._values_offset + offset
+    return int.from_bytes(self._map[start:start + size], 'little')
+
+  def _address(self, position:int) -> int:
+    """Address of the register at a position of the address index."""
+    return struct.unpack_from('<Q', self._map, self._registers_offset + self._indexed(position) * _register_record.size)[0]
+
+  def _indexed(self, position:int) -> int:
+    return _index_record.unpack_from(self._map, self._index_offset + position * _index_record.size)[0]
+
+  def _lower_bound(self, address:int) -> int:
+    """First position of the address index with an address not below the given one."""
+    low, high = 0, self.register_count
+    while low < high:
+      middle = (low + high) // 2
+      if self._address(middle) < address:
+        low = middle + 1
+      else:
+        high = middle
+    return low
+
+  def _decode_access(self, component, values:tuple):
+    """Decode the access types, options and behaviors of a register or field from their record values."""
+    hw_write_options, hw_read_options, software_access, hardware_access, sw_write_behavior, sw_read_behavior = values
+    component.hw_write_options  = HardwareWriteOptions(hw_write_options)
+    component.hw_read_options   = HardwareReadOptions(hw_read_options)
+    component.software_access   = SoftwareAccessType(software_access)
+    component.hardware_access   = HardwareAccessType(hardware_access)
+    component.sw_write_behavior = SoftwareWriteBehavior(sw_write_behavior)
+    component.sw_read_behavior  = SoftwareReadBehavior(sw_read_behavior)
+
+  def _field(self, index:int) -> MappedField:
+    record = _field_record.unpack_from(self._map, self._fields_offset + index * _field_record.size)
+    field = MappedField()
+    field.name        = self._string(record[1])
+    field.offset      = record[3]
+    field.width       = record[4]
+    field.reset_value = self._value(record[0], record[5]) if record[12] & _has_reset_value else None
+    self._decode_access(field, record[6:12])
+    return field
+
+  def _register(self, index:int) -> MappedRegister:
+    record = _register_record.unpack_from(self._map, self._registers_offset + index * _register_record.size)
+    register = MappedRegister()
+    register.address           = record[0]
+    register.reset_value       = self._value(record[1], record[8]) if record[15] & _has_reset_value else None
+    register.name              = self._string(record[2])
+    register.hierarchical_name = self._string(record[3])
+    register.array_index       = record[5] if record[15] & _is_array_element else None
+    register.width             = record[7]
+    register.fields            = [self._field(field_index) for field_index in range(record[4], record[4] + record[6])]
+    self._decode_access(register, record[9:15])
+    return register
+
+  def find(self, address:int) -> Optional[MappedRegister]:
+    """Return the register containing the byte address, or None if no register does."""
+    position = self._lower_bound(address + 1) - 1
+    if position < 0:
+      return None
+    register = self._register(self._indexed(position))
+    return register if address < register.address + register.size else None
+
+  def registers_between(self, first:int, last:int):
+    """Yield the registers starting between the first and last byte addresses included, in address order."""
+    for position in range(self._lower_bound(first), self.register_count):
+      if self._address(position) > last:
+        break
+      yield self._register(self._indexed(position))
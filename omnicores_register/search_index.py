@@ -0,0 +1,64 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Search index of the documentation, built at generation and   ║
+# ║              queried by the browser. The components are sorted by address ║
+# ║              for the address range lookup, and their names, paths and     ║
+# ║              field names are sorted for the prefix lookup.                ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import json
+from itertools import accumulate
+from omnicores_register.register import Register
+
+
+
+def search_index(register_bank, documentation_pages=None) -> dict:
+  """Return the search index of the elaborated register bank as parallel columns, the registers and files in address order with the page documenting them, and the search terms in sorted order with their component."""
+  components = sorted(register_bank.iter_components_deep(), key=lambda component: component.address)
+  # Pages of the documentation, the single page links to its own anchors
+  if documentation_pages is None:
+    pages        = ['']
+    page_numbers = [0] * len(components)
+  else:
+    pages        = [documentation_pages.index] + [documentation_pages.page_files[id(page)] for page in documentation_pages.pages]
+    page_number  = {page: number for number, page in enumerate(pages)}
+    page_numbers = [page_number[documentation_pages.page_of(component)] for component in components]
+
+  # Lowercase names, hierarchical names and field names
+  terms = set()
+  for entry, component in enumerate(components):
+    terms.add((component.name.lower(), entry))
+    terms.add((component.hierarchical_name.lower(), entry))
+    if isinstance(component, Register):
+      terms.update((field.name.lower(), entry) for field in component.fields)
+  terms = sorted(terms)
+
+  # Furthest end address of the components up to each one, bounding the walk
+  # back to the components containing an address
+  sizes   = [(component.width + 7) // 8 if isinstance(component, Register) else component.size for component in components]
+  reaches = list(accumulate((component.address + size for component, size in zip(components, sizes)), max))
+
+  return {
+    'nibbles'     : register_bank.address_width_nibbles,
+    'pages'       : pages,
+    'paths'       : [component.hierarchical_name for component in components],
+    'kinds'       : ''.join('r' if isinstance(component, Register) else 'f' for component in components),
+    'addresses'   : [component.address for component in components],
+    'sizes'       : sizes,
+    'reaches'     : reaches,
+    'entryPages'  : page_numbers,
+    'terms'       : [term for term, _ in terms],
+    'termEntries' : [entry for _, entry in terms],
+  }
+
+
+
+def search_index_source(register_bank, documentation_pages=None) -> str:
+  """Return the search index of the elaborated register bank as compact JSON, for the search script of the documentation."""
+  return json.dumps(search_index(register_bank, documentation_pages), separators=(',', ':'))
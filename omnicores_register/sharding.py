@@ -0,0 +1,54 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Split of the registers of the register bank into balanced    ║
+# ║              shards, each one tested by a standalone testbench to compile ║
+# ║              and simulate the shards in parallel.                         ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import heapq
+from omnicores_register.traversal import top_level_component
+
+# Policies splitting the registers into shards
+shard_policies = ('register_count', 'register_file')
+
+
+
+def check_shard_options(shards:int, policy:str):
+  """Raise an error if the number of shards or the shard policy is invalid."""
+  if policy not in shard_policies:
+    raise ValueError(f"Unknown shard policy '{policy}', expected one of {', '.join(shard_policies)}.")
+  if shards < 1:
+    raise ValueError(f"The number of shards must be positive, got {shards}.")
+
+
+
+def register_shards(register_bank, shards:int, policy:str='register_count') -> list:
+  """Split the registers of the elaborated register bank into at most the given number of non-empty shards of balanced register count, in address order within each shard. The register_file policy keeps the registers of each top-level register file or array in the same shard."""
+  check_shard_options(shards, policy)
+  registers = register_bank.registers
+  shards    = min(shards, len(registers))
+  if shards <= 1:
+    return [list(registers)] if registers else []
+
+  # Contiguous slices of the register list
+  if policy == 'register_count':
+    return [registers[index * len(registers) // shards : (index + 1) * len(registers) // shards] for index in range(shards)]
+
+  # Indexes of the registers grouped by top-level component, in address order
+  groups = {}
+  for index, register in enumerate(registers):
+    groups.setdefault(id(top_level_component(register_bank, register)), []).append(index)
+  # Largest groups first, each one to the least loaded shard
+  loads = [(0, shard) for shard in range(shards)]
+  shard_indexes = [[] for _ in range(shards)]
+  for group in sorted(groups.values(), key=lambda group: (-len(group), group[0])):
+    load, shard = heapq.heappop(loads)
+    shard_indexes[shard].extend(group)
+    heapq.heappush(loads, (load + len(group), shard))
+  return [[registers[index] for index in sorted(indexes)] for indexes in shard_indexes if indexes]
@@ -0,0 +1,197 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Streaming generation mode. The rendered templates are        ║
+# ║              written in chunks, and the whole-file restructure filter is  ║
+# ║              applied on the fly with the alignment local to each chunk.   ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import re
+
+# Whole-file restructure filter of the templates, replaced by stream markers
+_restructure_begin_tag = re.compile(r'\{%-?\s*filter\s+restructure\s*-?%\}')
+_endfilter_tag         = re.compile(r'\{%-?\s*endfilter\s*-?%\}')
+_restructure_begin     = '\x00STREAM_RESTRUCTURE_BEGIN\x00'
+_restructure_end       = '\x00STREAM_RESTRUCTURE_END\x00'
+
+# Structure tags of the restructure filter
+_structure_tag = re.compile(r'{§\s*([\w\s]+?)\s*§}')
+
+# Size of the rendered text accumulated before writing a chunk
+stream_chunk_size = 1 << 20
+
+
+
+def streamed_source(source:str) -> str:
+  """Return the template source with its whole-file restructure filter replaced by markers, for the stream to apply it instead of buffering the whole file."""
+  begin = _restructure_begin_tag.search(source)
+  if begin is None:
+    return source
+  end = None
+  for end in _endfilter_tag.finditer(source, begin.end()):
+    pass
+  if end is None:
+    return source
+  return source[:begin.start()] + _restructure_begin + source[begin.end():end.start()] + _restructure_end + source[end.end():]
+
+
+
+class _TrimmedLineWriter:
+  """Writer of the rendered text to the output file, trimming the trailing whitespace of each line like the render engine."""
+
+  def __init__(self, output_file, trim_whitespace:bool):
+    self.output_file     = output_file
+    self.trim_whitespace = trim_whitespace
+    self.partial_line    = ""
+
+  def write(self, text:str):
+    if not self.trim_whitespace:
+      self.output_file.write(text)
+      return
+    # The last line is kept until it is complete
+    lines = (self.partial_line + text).split('\n')
+    self.partial_line = lines.pop()
+    if lines:
+      self.output_file.write('\n'.join(line.rstrip(' \t') for line in lines) + '\n')
+
+  def close(self):
+    self.output_file.write(self.partial_line.rstrip(' \t') if self.trim_whitespace else self.partial_line)
+    self.partial_line = ""
+
+
+
+class _RestructureStream:
+  """Streaming counterpart of the restructure filter, the spacing is applied as in the whole file and the alignment within each chunk."""
+
+  def __init__(self, writer:_TrimmedLineWriter, restructure):
+    self.writer            = writer
+    self.restructure       = restructure  # Filter of the render engine, used for the alignment of each chunk
+    self.buffer            = ""           # Rendered text not yet split at the structure tags
+    self.pending           = ""           # Text with the spacing applied and the alignment markers, not yet aligned
+    self.section_started   = False        # The beginning of the current section was already moved to the pending text
+    self.trailing_newlines = 0            # Line breaks at the end of the restructured text
+
+  def _append(self, text:str):
+    """Append restructured text, keeping track of its trailing line breaks."""
+    if not text:
+      return
+    stripped = text.rstrip('\n')
+    if stripped:
+      self.trailing_newlines = len(text) - len(stripped)
+    else:
+      self.trailing_newlines += len(text)
+    self.pending += text
+
+  def _section(self, section:str) -> str:
+    """Strip the line breaks and space around a section, its beginning was already stripped if it started earlier."""
+    section = section.rstrip(' \t').rstrip('\n\r')
+    return section if self.section_started else section.lstrip('\n\r')
+
+  def _close_section(self, section:str, tag:str):
+    """Restructure a section followed by a structure tag, like the restructure filter."""
+    whitespace_only = not self.section_started and not section.strip()
+    section         = self._section(section)
+    tag_split       = re.split(r'\s+', tag)
+    tag_operation   = tag_split[0]
+    tag_operands    = tag_split[1:]
+    # Replace align tag with marker
+    if tag_operation == 'align':
+      justification   = 'left'
+      alignment_index = None
+      for operand in tag_operands:
+        if operand in ('left', 'right', 'center'):
+          justification = operand
+        elif operand.isdigit():
+          alignment_index = int(operand)
+      self._append(f"{section}\x00ALIGN:{justification}:{alignment_index if alignment_index is not None else ''}\x00")
+    # Spacing sections with line breaks
+    elif tag_operation == 'spacing':
+      spacing = int(tag_operands[0]) + 1 if tag_operands else 1
+      if whitespace_only and self.trailing_newlines:
+        if spacing > self.trailing_newlines:
+          self._append('\n' * (spacing - self.trailing_newlines))
+      else:
+        self._append(section + '\n' * spacing)
+    self.section_started = False
+
+  def _flush(self, final:bool=False):
+    """Align and write the pending text, up to its last blank line or line break unless final."""
+    if final:
+      block, self.pending = self.pending, ""
+    else:
+      cut = self.pending.rfind('\n\n')
+      if cut < 0:
+        cut = self.pending.rfind('\n')
+      if cut < 0:
+        return
+      block, self.pending = self.pending[:cut + 1], self.pending[cut + 1:]
+    # The restructure filter aligns the marked columns and strips the surrounding line breaks
+    if '\x00ALIGN' in block:
+      content  = block.strip('\n')
+      leading  = len(block) - len(block.lstrip('\n'))
+      trailing = len(block) - len(block.rstrip('\n')) if content else 0
+      block    = '\n' * leading + self.restructure(content) + '\n' * trailing
+    self.writer.write(block)
+
+  def write(self, text:str):
+    self.buffer += text
+    # Restructure the sections followed by a complete tag
+    position = 0
+    for match in _structure_tag.finditer(self.buffer):
+      self._close_section(self.buffer[position:match.start()], match.group(1))
+      position = match.end()
+    self.buffer = self.buffer[position:]
+    # Move the beginning of a long section, keeping its last lines for the final stripping
+    if len(self.buffer) > stream_chunk_size:
+      content_end = len(self.buffer.rstrip(' \t\n\r'))
+      cut = self.buffer.rfind('\n', 0, content_end)
+      if cut > 0:
+        beginning = self._section(self.buffer[:cut]) if not self.section_started else self.buffer[:cut]
+        self._append(beginning)
+        self.section_started = self.section_started or bool(beginning)
+        self.buffer = self.buffer[cut:]
+    if len(self.pending) > stream_chunk_size:
+      self._flush()
+
+  def close(self):
+    # Add the last section
+    self._append(self._section(self.buffer))
+    self.buffer          = ""
+    self.section_started = False
+    self._flush(final=True)
+
+
+
+def write_stream(chunks, output_file, restructure, trim_whitespace:bool=True):
+  """Write the chunks rendered from a streamed template source, applying the restructure filter between the stream markers."""
+  writer    = _TrimmedLineWriter(output_file, trim_whitespace)
+  stream    = writer
+  collected = []
+  size      = 0
+  for chunk in chunks:
+    # The markers are part of the literal text of the template, never split between chunks
+    while chunk:
+      marker = _restructure_end if stream is not writer else _restructure_begin
+      before, found, chunk = chunk.partition(marker)
+      collected.append(before)
+      size += len(before)
+      if found:
+        stream.write(''.join(collected))
+        collected, size = [], 0
+        if stream is writer:
+          stream = _RestructureStream(writer, restructure)
+        else:
+          stream.close()
+          stream = writer
+    if size > stream_chunk_size:
+      stream.write(''.join(collected))
+      collected, size = [], 0
+  stream.write(''.join(collected))
+  if stream is not writer:
+    stream.close()
+  writer.close()
@@ -0,0 +1,83 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Cache of the compiled templates, kept in memory for the      ║
+# ║              lifetime of the process and optionally on disk in the user   ║
+# ║              cache directory, keyed by the tool versions and the content  ║
+# ║              of the template.                                             ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import os
+import sys
+import marshal
+import hashlib
+from pathlib import Path
+from omnicores_register.manifest import tool_versions
+
+# Compiled code of the templates by cache key, for the lifetime of the process
+_compiled_templates = {}
+
+
+
+def user_cache_directory() -> Path:
+  """Return the directory of the compiled templates in the user cache directory."""
+  if sys.platform == 'win32':
+    cache_root = os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')
+  elif sys.platform == 'darwin':
+    cache_root = Path.home() / 'Library' / 'Caches'
+  else:
+    cache_root = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+  return Path(cache_root) / 'omnicores-registers' / 'templates'
+
+
+
+def template_cache_key(source:str) -> str:
+  """Return the cache key of a template, changing with the tool versions, the Python bytecode version and the template content."""
+  digest = hashlib.sha256()
+  digest.update(tool_versions().encode())
+  digest.update(sys.implementation.cache_tag.encode())
+  digest.update(source.encode())
+  return digest.hexdigest()
+
+
+
+def _load_cached_code(path:Path):
+  """Return the compiled code stored in the disk cache, or None if missing or unreadable."""
+  try:
+    return marshal.loads(path.read_bytes())
+  except (OSError, ValueError, EOFError, TypeError):
+    return None
+
+
+
+def _store_cached_code(path:Path, code):
+  """Store the compiled code in the disk cache, renamed into place so concurrent processes never read a partial file."""
+  try:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary_path.write_bytes(marshal.dumps(code))
+    os.replace(temporary_path, path)
+  except OSError:
+    pass
+
+
+
+def compile_template(environment, source:str, use_cache:bool=True, disk_cache:bool=False):
+  """Return the template compiled in the environment, reusing the code compiled earlier in this process or stored on disk."""
+  if not use_cache:
+    return environment.from_string(source)
+  key  = template_cache_key(source)
+  code = _compiled_templates.get(key)
+  if code is None and disk_cache:
+    code = _load_cached_code(user_cache_directory() / f"{key}.marshal")
+  if code is None:
+    code = environment.compile(source)
+    if disk_cache:
+      _store_cached_code(user_cache_directory() / f"{key}.marshal", code)
+  _compiled_templates[key] = code
+  return environment.template_class.from_code(environment, code, environment.make_globals(None), None)
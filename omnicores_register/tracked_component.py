@@ -0,0 +1,97 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Base class tracking configuration changes of the components  ║
+# ║              so that elaboration only recomputes the modified subtrees.   ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+class TrackedComponent:
+  """Base class flagging the components modified since the last elaboration."""
+
+  # Attributes are stored in slots instead of a per-instance dictionary. Only
+  # one base of a class can hold slots, so the mixins of the concrete classes
+  # list their attributes in _mixin_slots for the concrete classes to declare.
+  __slots__ = ('parent', '_dirty', '_dirty_subtree', '_moved', '_configured')
+
+  # Configuration attributes that invalidate the elaboration when assigned
+  _tracked_attributes = frozenset()
+
+  # Initial values of the slots, new components always need to be elaborated
+  _slot_defaults = {
+    'parent'         : None,
+    '_dirty'         : True,   # The configuration of this component changed
+    '_dirty_subtree' : True,   # This component or one of its descendants changed
+    '_moved'         : False,  # The placement was recomputed during the current elaboration
+    '_configured'    : None,   # Configured values of the attributes overwritten by the elaboration
+  }
+
+  def __new__(cls, *args, **kwargs):
+    component = super().__new__(cls)
+    for name, value in cls._slot_defaults.items():
+      object.__setattr__(component, name, value)
+    return component
+
+  def __setattr__(self, name, value):
+    object.__setattr__(self, name, value)
+    if name in self._tracked_attributes:
+      # The new value is the configuration, no longer the resolved one
+      if self._configured and name in self._configured:
+        del self._configured[name]
+      self.mark_dirty()
+
+  def __getstate__(self):
+    # Copies are new components which need to be elaborated
+    state = {}
+    for cls in type(self).__mro__:
+      for name in cls.__dict__.get('__slots__', ()):
+        if name not in ('_dirty', '_dirty_subtree', '_moved') and hasattr(self, name):
+          state[name] = getattr(self, name)
+    return state
+
+  def __setstate__(self, state):
+    for name, value in state.items():
+      object.__setattr__(self, name, value)
+
+  def mark_dirty(self):
+    """Flag this component for elaboration, and its ancestors as containing a change."""
+    object.__setattr__(self, '_dirty', True)
+    object.__setattr__(self, '_dirty_subtree', True)
+    parent = self.parent
+    while parent is not None and not parent._dirty_subtree:
+      object.__setattr__(parent, '_dirty_subtree', True)
+      parent = parent.parent
+
+  def _clear_dirty(self):
+    """Reset the change flags once the component has been elaborated."""
+    object.__setattr__(self, '_dirty',         False)
+    object.__setattr__(self, '_dirty_subtree', False)
+    object.__setattr__(self, '_moved',         False)
+
+  def _resolve(self, name, value):
+    """Set an attribute to the value resolved by the elaboration, keeping its configured value."""
+    current = getattr(self, name)
+    if current is value or current == value:
+      return
+    if self._configured is None:
+      object.__setattr__(self, '_configured', {})
+    # Only the first overwrite holds the configured value
+    self._configured.setdefault(name, current)
+    object.__setattr__(self, name, value)
+
+  def _configured_value(self, name):
+    """Return the configured value of an attribute, before its resolution by the elaboration."""
+    if self._configured and name in self._configured:
+      return self._configured[name]
+    return getattr(self, name)
+
+  def _restore_configuration(self):
+    """Restore the configured values of the attributes resolved by the last elaboration."""
+    if self._configured:
+      for name, value in self._configured.items():
+        object.__setattr__(self, name, value)
+    object.__setattr__(self, '_configured', None)
@@ -5,8 +5,12 @@
 # ║ License:     MIT License                                                  ║
 # ╟───────────────────────────────────────────────────────────────────────────╢
 # ║ Description: Tree traversal functions for collecting registers, files,    ║
-# ║              and arrays from the component hierarchy. Separated from      ║
-# ║              ComponentContainer to break circular import dependencies.    ║
+# ║              and arrays from the component hierarchy. The generators      ║
+# ║              stream the components with memory bounded by the depth, the  ║
+# ║              collect functions return them as lists. The traversals of    ║
+# ║              elaborated containers are memoized until the next change.    ║
+# ║              Separated from ComponentContainer to break circular import   ║
+# ║              dependencies.                                                ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
 
@@ -14,120 +18,223 @@
 from omnicores_register.register import Register
 from omnicores_register.register_file import RegisterFile
 from omnicores_register.component_array import ComponentArray
+from omnicores_register.component_view import ComponentView
 
 
 
-def collect_files_deep(container):
-  """Collect all RegisterFile objects from the hierarchy in DFS insertion order."""
-  collected = []
+def iter_files_deep(container):
+  """Yield all RegisterFile objects from the hierarchy in DFS insertion order."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      collected.extend(component.get_files_deep())
+      yield from component.iter_files_deep()
     elif isinstance(component, RegisterFile):
-      collected.append(component)
-      collected.extend(collect_files_deep(component))
-  return collected
+      yield component
+      yield from iter_files_deep(component)
 
 
 
-def collect_registers_deep(container):
-  """Collect all Register objects from the hierarchy in DFS insertion order."""
-  collected = []
+def iter_registers_deep(container):
+  """Yield all Register objects from the hierarchy in DFS insertion order."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      collected.extend(component.get_registers_deep())
+      yield from component.iter_registers_deep()
     elif isinstance(component, Register):
-      collected.append(component)
+      yield component
     elif isinstance(component, RegisterFile):
-      collected.extend(collect_registers_deep(component))
-  return collected
+      yield from iter_registers_deep(component)
 
 
 
-def collect_files_postorder(container):
-  """Collect all RegisterFile objects in bottom-up order (deepest first)."""
-  collected = []
+def iter_files_postorder(container):
+  """Yield all RegisterFile objects in bottom-up order (deepest first)."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      collected.extend(component.get_files_postorder())
+      yield from component.iter_files_postorder()
     elif isinstance(component, RegisterFile):
-      collected.extend(collect_files_postorder(component))
-      collected.append(component)
-  return collected
+      yield from iter_files_postorder(component)
+      yield component
 
 
 
-def collect_components_deep(container):
-  """Collect all registers and files in DFS insertion order."""
-  collected = []
+def iter_components_deep(container):
+  """Yield all registers and files in DFS insertion order."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      collected.extend(component.get_components_deep())
+      yield from component.iter_components_deep()
     else:
-      collected.append(component)
+      yield component
       if isinstance(component, RegisterFile):
-        collected.extend(collect_components_deep(component))
-  return collected
+        yield from iter_components_deep(component)
 
 
 
-def collect_array_prototype_registers(container):
-  """Collect unique register prototypes from array wrappers in the hierarchy."""
-  collected = []
+def iter_array_prototype_registers(container, in_prototype=False):
+  """Yield unique register prototypes from array wrappers in the hierarchy, including the registers of file prototypes."""
   for component in container.components:
     if isinstance(component, ComponentArray):
       if isinstance(component.prototype, Register):
-        collected.append(component.prototype)
+        yield component.prototype
       elif isinstance(component.prototype, RegisterFile):
-        collected.extend(collect_array_prototype_registers(component.prototype))
+        yield from iter_array_prototype_registers(component.prototype, True)
+    elif isinstance(component, Register):
+      if in_prototype:
+        yield component
     elif isinstance(component, RegisterFile):
-      collected.extend(collect_array_prototype_registers(component))
-  return collected
+      yield from iter_array_prototype_registers(component, in_prototype)
 
 
 
-def collect_array_prototype_files(container):
-  """Collect unique register file prototypes from array wrappers in the hierarchy."""
-  collected = []
+def iter_array_prototype_files(container, in_prototype=False):
+  """Yield unique register file prototypes from array wrappers in the hierarchy, and their sub-files, in bottom-up order."""
   for component in container.components:
     if isinstance(component, ComponentArray):
       if isinstance(component.prototype, RegisterFile):
-        collected.append(component.prototype)
-        collected.extend(collect_array_prototype_files(component.prototype))
+        yield from iter_array_prototype_files(component.prototype, True)
+        yield component.prototype
     elif isinstance(component, RegisterFile):
-      collected.extend(collect_array_prototype_files(component))
-  return collected
+      yield from iter_array_prototype_files(component, in_prototype)
+      if in_prototype:
+        yield component
 
 
 
-def collect_arrays_deep(container):
-  """Collect all ComponentArray wrappers from the hierarchy in DFS order."""
-  collected = []
+def iter_arrays_deep(container):
+  """Yield all ComponentArray wrappers from the hierarchy in DFS order."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      collected.append(component)
+      yield component
       if isinstance(component.prototype, RegisterFile):
-        collected.extend(collect_arrays_deep(component.prototype))
+        yield from iter_arrays_deep(component.prototype)
     elif isinstance(component, RegisterFile):
-      collected.extend(collect_arrays_deep(component))
-  return collected
+      yield from iter_arrays_deep(component)
 
 
 
-def collect_register_macros_ordered(container):
-  """Return ordered list of (kind, data) tuples for macro emission with array metadata interleaved."""
-  items = []
+def iter_register_macros_ordered(container):
+  """Yield (kind, data) tuples for macro emission with array metadata interleaved."""
   for component in container.components:
     if isinstance(component, ComponentArray):
-      items.append(('array_meta', component))
+      yield ('array_meta', component)
       if isinstance(component.prototype, Register):
-        for clone in component.get_expanded_registers():
-          items.append(('register', clone))
+        for element in component.get_expanded_registers():
+          yield ('register', element)
       elif isinstance(component.prototype, RegisterFile):
-        for clone in component.get_expanded_files():
-          items.extend(collect_register_macros_ordered(clone))
+        for element in component.get_expanded_files():
+          yield from iter_register_macros_ordered(element)
     elif isinstance(component, Register):
-      items.append(('register', component))
+      yield ('register', component)
     elif isinstance(component, RegisterFile):
-      items.extend(collect_register_macros_ordered(component))
-  return items
+      yield from iter_register_macros_ordered(component)
+
+
+
+def top_level_component(register_bank, component):
+  """Return the component of the register bank containing the component, or the component itself if it is directly in the register bank."""
+  while component.parent is not None and component.parent is not register_bank:
+    component = component.parent
+  return component
+
+
+
+# List variants of the generators above
+
+def collect_files_deep(container):
+  """Collect all RegisterFile objects from the hierarchy in DFS insertion order."""
+  return list(iter_files_deep(container))
+
+
+
+def collect_registers_deep(container):
+  """Collect all Register objects from the hierarchy in DFS insertion order."""
+  return list(iter_registers_deep(container))
+
+
+
+def collect_files_postorder(container):
+  """Collect all RegisterFile objects in bottom-up order (deepest first)."""
+  return list(iter_files_postorder(container))
+
+
+
+def collect_components_deep(container):
+  """Collect all registers and files in DFS insertion order."""
+  return list(iter_components_deep(container))
+
+
+
+def collect_array_prototype_registers(container, in_prototype=False):
+  """Collect unique register prototypes from array wrappers in the hierarchy, including the registers of file prototypes."""
+  return list(iter_array_prototype_registers(container, in_prototype))
+
+
+
+def collect_array_prototype_files(container, in_prototype=False):
+  """Collect unique register file prototypes from array wrappers in the hierarchy, and their sub-files, in bottom-up order."""
+  return list(iter_array_prototype_files(container, in_prototype))
+
+
+
+def collect_arrays_deep(container):
+  """Collect all ComponentArray wrappers from the hierarchy in DFS order."""
+  return list(iter_arrays_deep(container))
+
+
+
+def collect_register_macros_ordered(container):
+  """Return ordered list of (kind, data) tuples for macro emission with array metadata interleaved."""
+  return list(iter_register_macros_ordered(container))
+
+
+
+def invalidate_traversals(bank):
+  """Invalidate the memoized traversals of all the containers of a register bank, after an elaboration changed its hierarchy."""
+  bank._traversal_epoch += 1
+
+
+
+def _traversal_results(container):
+  """Return the memoized traversal results of an elaborated container and the register bank it belongs to, the results being None if they cannot be memoized."""
+  bank = container
+  while bank.parent is not None:
+    bank = bank.parent
+  # Changed containers wait for the next elaboration, detached ones are never elaborated
+  if container._dirty_subtree or not hasattr(bank, 'traversal_stats'):
+    return None, None
+  cache = container._traversal_cache
+  if cache is None or cache[0] != bank._traversal_epoch:
+    cache = container._traversal_cache = (bank._traversal_epoch, {})
+  return cache[1], bank
+
+
+
+def memoized_list(container, traversal):
+  """Return a tuple of the components yielded by a traversal of the container, walking the hierarchy once per elaboration."""
+  # Views share the slots of their prototype, they are walked by their array
+  if isinstance(container, ComponentView):
+    return tuple(traversal(container))
+  results, bank = _traversal_results(container)
+  if results is None:
+    return tuple(traversal(container))
+  if traversal in results:
+    bank.traversal_stats['hits'] += 1
+  else:
+    bank.traversal_stats['misses'] += 1
+    # Immutable, shared by all the callers without copying
+    results[traversal] = tuple(traversal(container))
+  return results[traversal]
+
+
+
+def memoized_iter(container, traversal):
+  """Return an iterator over the components yielded by a traversal of the container, streamed from the hierarchy unless already memoized."""
+  if isinstance(container, ComponentView):
+    return traversal(container)
+  results, bank = _traversal_results(container)
+  if results is None:
+    return traversal(container)
+  if traversal in results:
+    bank.traversal_stats['hits'] += 1
+    return iter(results[traversal])
+  # Not memoized on a miss, to keep the early stops of the streamed traversal
+  bank.traversal_stats['misses'] += 1
+  return traversal(container)
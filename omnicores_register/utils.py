@@ -48,12 +48,14 @@ ansi_codes = {
 
 
 
+def format_warning(text):
+  return ansi_codes['yellow']+ansi_codes['bold']+"WARNING: "+text+ansi_codes['reset']
+
+def format_error(text):
+  return ansi_codes['red']+ansi_codes['bold']+"ERROR: "+text+ansi_codes['reset']
+
 def throw_warning(text):
-  print(ansi_codes['yellow']+ansi_codes['bold'], end='')
-  print(f"WARNING:", text, end='')
-  print(ansi_codes['reset'])
+  print(format_warning(text))
 
 def throw_error(text):
-  print(ansi_codes['red']+ansi_codes['bold'], end='', file=sys.stderr)
-  print(f"ERROR:", text, file=sys.stderr, end='')
-  print(ansi_codes['reset'], file=sys.stderr)
+  print(format_error(text), file=sys.stderr)
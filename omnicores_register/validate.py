@@ -10,9 +10,17 @@
 
 
 
-from omnicores_register.utils import throw_warning, throw_error
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from heapq import heappush, heappop
+from math import ceil
+from typing import Optional
 from omnicores_register.register_file import RegisterFile
 from omnicores_register.register import Register
+from omnicores_register.component_array import ComponentArray
+from omnicores_register.component_view import ComponentView
+from omnicores_register.diagnostics import Diagnostics, DiagnosticLimitReached, render_diagnostics
+from omnicores_register.field_table import field_placement_errors, reset_access_behavior_errors, access_option_errors
 from omnicores_register.enums import (
   HardwareWriteOptions,
   HardwareReadOptions,
@@ -22,16 +30,13 @@ from omnicores_register.enums import (
 
 
 
-def _validate_symbol_conflicts(self) -> int:
+def _validate_symbol_conflicts(self, diagnostics:Diagnostics):
   """Check the absence of entities with conflicting symbol names."""
-  error_count = 0
   symbols = set()
   # Internal function to check a symbol and add it to the set
-  def check_add_symbol(symbol:str):
-    nonlocal error_count
+  def check_add_symbol(symbol:str, address:Optional[int]=None):
     if symbol in symbols:
-      throw_error(f"Conflict with two entities having the same symbol '{symbol}'.")
-      error_count += 1
+      diagnostics.error('symbol-conflict', f"Conflict with two entities having the same symbol '{symbol}'.", symbol, address)
     symbols.add(symbol)
   # Add the symbols from the APB interface
   check_add_symbol("control__pclock")
@@ -48,129 +53,259 @@ def _validate_symbol_conflicts(self) -> int:
   check_add_symbol(self.name+"__register_bank")
   # Symbols of the registers and their fields
   for register in self.registers:
-    check_add_symbol(register.hierarchical_name)
+    check_add_symbol(register.hierarchical_name, register.address)
     if register.fields:
       for field in register.fields:
-        check_add_symbol(register.hierarchical_name+"__"+field.name)
+        check_add_symbol(register.hierarchical_name+"__"+field.name, register.address)
   # Symbols of the register files
   for file in self.files:
-    check_add_symbol(file.hierarchical_name)
-  return error_count
+    check_add_symbol(file.hierarchical_name, file.address)
 
 
 
-def _validate_address_conflicts(self) -> int:
+def _validate_address_conflicts(self, diagnostics:Diagnostics):
   """Check the absence of registers with conflicting addresses."""
-  error_count = 0
-  register_addresses = {}
-  for register in self.registers:
-    if register.address in register_addresses:
-      conflicting_register = register_addresses[register.address]
-      throw_error(f"Conflict between registers '{conflicting_register}' and '{register.name}' at the same address '0x{hex(register.address)[2:].upper()}'.")
-      error_count += 1
-    else:
-      register_addresses[register.address] = register.name
-  return error_count
+  # The conflicts are listed by the address index built during elaboration
+  for conflicting_register, register in self._address_conflicts:
+    diagnostics.error('address-conflict', f"Conflict between registers '{conflicting_register.name}' and '{register.name}' at the same address '0x{hex(register.address)[2:].upper()}'.", register.hierarchical_name, register.address)
 
 
 
-def _validate_address_alignments(self) -> int:
-  """Check the absence of registers with unaligned addresses."""
-  error_count = 0
-  for register in self.registers:
-    # TODO: when variable register width is implemented, this should be fixed
-    if register.address % 4 != 0:
-      throw_error(f"Unaligned address '0x{hex(register.address)[2:].upper()}' for register '{register.name}'.")
-      error_count += 1
-  return error_count
+def _region_path(component) -> str:
+  """Return the hierarchical name of a register, file or array, arrays being named after their prototype."""
+  if isinstance(component, ComponentArray):
+    return component.prototype.hierarchical_name
+  return component.hierarchical_name
 
 
 
-def _validate_reset_access_behaviors(self) -> int:
-  """Check the absence of registers or fields with reset access behaviors but no reset value."""
-  error_count = 0
-  for register in self.registers:
-    if register.fields:
-      for field in register.fields:
-        if field.reset_value is None:
-          if field.has_hw_write_option(HardwareWriteOptions.RESET):
-            throw_error(f"Field '{register.hierarchical_name}.{field.name}' has a dedicated hardware reset signal but no defined reset value.")
-            error_count += 1
-          if field.sw_read_behavior == SoftwareReadBehavior.READ_RESETS:
-            throw_error(f"Field '{register.hierarchical_name}.{field.name}' has a read-resets software access behavior but no defined reset value.")
-            error_count += 1
+def _describe_region(component, start:int, end:int) -> str:
+  """Return the description of a register, file or array region for the diagnostics."""
+  if isinstance(component, ComponentArray):
+    kind = 'array'
+  elif isinstance(component, RegisterFile):
+    kind = 'file'
+  else:
+    kind = 'register'
+  return f"{kind} '{_region_path(component)}' at '0x{hex(start)[2:].upper()}-0x{hex(end - 1)[2:].upper()}'"
+
+
+
+def _collect_regions(container, ancestry:frozenset, regions:list, diagnostics:Diagnostics):
+  """Collect the regions of the registers, files and arrays of a container and its sub-containers, with the set of identities of the containers enclosing them."""
+  depth = len(ancestry)
+  for component in container.components:
+    if isinstance(component, Register):
+      address = component.address
+      regions.append((address, depth, len(regions), address + 4, component, ancestry))
+      continue
+    if isinstance(component, ComponentArray):
+      size = component.region_size
+      if component.length > 1 and component.stride < component.element_size:
+        diagnostics.error('array-overlap', f"Elements of array '{component.prototype.hierarchical_name}' overlap with a stride of {component.stride} bytes for {component.element_size}-byte elements.", component.prototype.hierarchical_name, component.address)
+    else:
+      size = component.size
+    if size > 0:
+      address = component.address
+      regions.append((address, depth, len(regions), address + size, component, ancestry))
+    # Array elements share the layout of their prototype
+    if isinstance(component, ComponentArray):
+      if isinstance(component.prototype, RegisterFile):
+        _collect_regions(component.prototype, ancestry | {id(component), id(component.prototype)}, regions, diagnostics)
     else:
-      if register.reset_value is None:
-        if register.has_hw_write_option(HardwareWriteOptions.RESET):
-          throw_error(f"Register '{register.hierarchical_name}' has a dedicated hardware reset signal but no defined reset value.")
-          error_count += 1
-        if register.sw_read_behavior == SoftwareReadBehavior.READ_RESETS:
-          throw_error(f"Register '{register.hierarchical_name}' has a read-resets software access behavior but no defined reset value.")
-          error_count += 1
-  return error_count
-
-
-
-def _validate_access_options(self) -> int:
-  """Check the compatibility of the software and hardware access options and behaviors with the access types."""
-  error_count = 0
-  def _validate_component_access_options(component, label:str) -> int:
-    nonlocal error_count
+      _collect_regions(component, ancestry | {id(component)}, regions, diagnostics)
+
+
+
+def _validate_region_overlaps(self, diagnostics:Diagnostics):
+  """Check the absence of overlapping register, file and array regions, with a sweep line over the sorted regions of the whole bank."""
+  # Regions sorted by start address, the containers before their components,
+  # the array regions are not expanded
+  regions = []
+  _collect_regions(self, frozenset(), regions, diagnostics)
+  regions.sort()
+  # Sweep line over the regions, with the active regions in a heap by end address
+  active   = []
+  reported = {}  # Identities of the regions reported overlapping each region
+  for start, _, index, end, component, ancestry in regions:
+    # The expired regions are popped first, all the remaining ones end past the start
+    while active and active[0][0] <= start:
+      heappop(active)
+    # The containers enclose their components, the other active regions overlap
+    overlapping = [region for region in active if id(region[3]) not in ancestry]
+    if overlapping:
+      chain = ancestry | {id(component)}
+      for other_end, _, other_start, other, other_ancestry in sorted(overlapping, key=lambda region: region[1]):
+        # Registers at the same address are reported as address conflicts
+        if other_start == start and isinstance(other, Register) and isinstance(component, Register):
+          continue
+        # The overlaps of the components of two overlapping regions are only reported once for the outermost ones
+        if any(not chain.isdisjoint(reported.get(outer, ())) for outer in (id(other), *other_ancestry)):
+          continue
+        reported.setdefault(id(other),     set()).add(id(component))
+        reported.setdefault(id(component), set()).add(id(other))
+        diagnostics.error('region-overlap', f"Overlap between {_describe_region(other, other_start, other_end)} and {_describe_region(component, start, end)}.", _region_path(component), start)
+    heappush(active, (end, index, start, component, ancestry))
+
+
+
+def _check_address_alignment(register, diagnostics:Diagnostics):
+  """Check that a register address is aligned."""
+  # TODO: when variable register width is implemented, this should be fixed
+  if register.address % 4 != 0:
+    diagnostics.error('unaligned-address', f"Unaligned address '0x{hex(register.address)[2:].upper()}' for register '{register.name}'.", register.hierarchical_name, register.address)
+
+
+
+def _columnar_error_registers(self, check):
+  """Return the set of registers flagged by a vectorized check of the columnar field table, or None without the columnar backend."""
+  if self.field_table is None:
+    return None
+  return set(self.field_table.registers_with(*check(self.field_table)))
+
+
+
+def _structural_register(register):
+  """Return the register holding the fields of a register or array element."""
+  return register._component if isinstance(register, ComponentView) else register
+
+
+
+def _component_label(register, component):
+  """Return the label and path of a register or field for the diagnostics, only built when reporting an error."""
+  if component is register:
+    return f"Register '{register.hierarchical_name}'", register.hierarchical_name
+  path = f"{register.hierarchical_name}.{component.name}"
+  return f"Field '{path}'", path
+
+
+
+def _check_reset_access_behaviors(register, diagnostics:Diagnostics):
+  """Check the absence of reset access behaviors without reset value in a register or its fields."""
+  # Registers without fields hold their own access attributes
+  for component in register.fields or (register,):
+    if component.reset_value is None:
+      if component.has_hw_write_option(HardwareWriteOptions.RESET):
+        label, path = _component_label(register, component)
+        diagnostics.error('missing-reset-value', f"{label} has a dedicated hardware reset signal but no defined reset value.", path, register.address)
+      if component.sw_read_behavior == SoftwareReadBehavior.READ_RESETS:
+        label, path = _component_label(register, component)
+        diagnostics.error('missing-reset-value', f"{label} has a read-resets software access behavior but no defined reset value.", path, register.address)
+
+
+
+def _check_access_options(register, diagnostics:Diagnostics):
+  """Check the compatibility of the access options and behaviors of a register or its fields with their access types."""
+  # Registers without fields hold their own access attributes
+  for component in register.fields or (register,):
+    messages = []
     if component.sw_write_behavior != SoftwareWriteBehavior.NORMAL and not component.is_software_writable():
-      throw_error(f"{label} has software write behavior '{component.sw_write_behavior!r}' but is not software writable.")
-      error_count += 1
+      messages.append(f"has software write behavior '{component.sw_write_behavior!r}' but is not software writable.")
     if component.sw_read_behavior != SoftwareReadBehavior.NORMAL and not component.is_software_readable():
-      throw_error(f"{label} has software read behavior '{component.sw_read_behavior!r}' but is not software readable.")
-      error_count += 1
+      messages.append(f"has software read behavior '{component.sw_read_behavior!r}' but is not software readable.")
     if component.hw_write_options and not component.is_hardware_writable():
-      throw_error(f"{label} has hardware write options '{component.hw_write_options!r}' but is not hardware writable.")
-      error_count += 1
+      messages.append(f"has hardware write options '{component.hw_write_options!r}' but is not hardware writable.")
     if component.hw_read_options and not component.is_hardware_readable():
-      throw_error(f"{label} has hardware read options '{component.hw_read_options!r}' but is not hardware readable.")
-      error_count += 1
+      messages.append(f"has hardware read options '{component.hw_read_options!r}' but is not hardware readable.")
     if HardwareWriteOptions.CONTINUOUS in component.hw_write_options and component.hw_write_options != HardwareWriteOptions.CONTINUOUS:
-      throw_error(f"{label} combines the continuous write option with other hardware write options '{component.hw_write_options!r}'.")
-      error_count += 1
-  for register in self.registers:
-    if register.fields:
-      for field in register.fields:
-        _validate_component_access_options(field, f"Field '{register.hierarchical_name}.{field.name}'")
-    else:
-      _validate_component_access_options(register, f"Register '{register.hierarchical_name}'")
-  return error_count
-
-
-
-def _validate_field_placements(self) -> int:
-  """Check the absence of overlapping or out-of-range fields in registers and array prototypes."""
-  error_count = 0
-  def _validate_register_field_placements(register) -> int:
-    nonlocal error_count
-    previous_end = 0
-    for field in register.fields:  # Fields are sorted by offset during elaboration
-      if field.offset < previous_end:
-        throw_error(f"Field '{register.hierarchical_name}.{field.name}' overlaps with a previous field.")
-        error_count += 1
-      if field.offset + field.width > register.width:
-        throw_error(f"Field '{register.hierarchical_name}.{field.name}' extends beyond the {register.width}-bit register width.")
-        error_count += 1
-      previous_end = field.offset + field.width
-  for register in self.registers:
-    if not register.is_array_element:
-      _validate_register_field_placements(register)
-  for prototype in self.get_array_prototype_registers():
-    _validate_register_field_placements(prototype)
-  return error_count
-
-
-
-def validate(self) -> int:
-  """Validate the data structure after elaboration and before generation, optional but highly recommended."""
-  error_count  = 0
-  error_count += _validate_symbol_conflicts(self)
-  error_count += _validate_address_conflicts(self)
-  error_count += _validate_address_alignments(self)
-  error_count += _validate_reset_access_behaviors(self)
-  error_count += _validate_access_options(self)
-  error_count += _validate_field_placements(self)
-  return error_count
\ No newline at end of file
+      messages.append(f"combines the continuous write option with other hardware write options '{component.hw_write_options!r}'.")
+    if messages:
+      label, path = _component_label(register, component)
+      for message in messages:
+        diagnostics.error('incompatible-access-option', f"{label} {message}", path, register.address)
+
+
+
+def _check_field_placements(register, diagnostics:Diagnostics):
+  """Check the absence of overlapping or out-of-range fields in a register or array prototype."""
+  previous_end = 0
+  for field in register.fields:  # Fields are sorted by offset during elaboration
+    path = f"{register.hierarchical_name}.{field.name}"
+    if field.offset < previous_end:
+      diagnostics.error('field-overlap', f"Field '{path}' overlaps with a previous field.", path, register.address)
+    if field.offset + field.width > register.width:
+      diagnostics.error('field-out-of-range', f"Field '{path}' extends beyond the {register.width}-bit register width.", path, register.address)
+    previous_end = field.offset + field.width
+
+
+
+def _register_checks(self):
+  """Return the checks of the fused register loop in reporting order, with their scope and the registers flagged by the columnar backend."""
+  # Structural checks run once on the prototypes instead of on the array elements,
+  # the others run on every register of the bank, elements included
+  return (
+    (_check_address_alignment,      False, None),
+    (_check_reset_access_behaviors, False, _columnar_error_registers(self, reset_access_behavior_errors)),
+    (_check_access_options,         False, _columnar_error_registers(self, access_option_errors)),
+    (_check_field_placements,       True,  _columnar_error_registers(self, field_placement_errors)),
+  )
+
+
+
+def _run_register_checks(registers, bank_registers_count, checks, start, stop):
+  """Run all the register checks in a single loop over a chunk of the checked registers, return the entries of each check."""
+  checks_diagnostics = [Diagnostics() for _ in checks]
+  for position in range(start, stop):
+    register     = registers[position]
+    is_prototype = position >= bank_registers_count
+    is_view      = isinstance(register, ComponentView)
+    for (check, structural, error_registers), diagnostics in zip(checks, checks_diagnostics):
+      if structural:
+        if is_view or (error_registers is not None and register not in error_registers):
+          continue
+      elif is_prototype or (error_registers is not None and _structural_register(register) not in error_registers):
+        continue
+      check(register, diagnostics)
+  return [diagnostics.entries for diagnostics in checks_diagnostics]
+
+
+
+# Checked registers inherited by the forked worker processes
+_checked_registers = None
+
+
+
+def _run_register_checks_chunk(bounds):
+  """Run the register checks on a chunk of the registers inherited from the parent process."""
+  return _run_register_checks(*_checked_registers, *bounds)
+
+
+
+def _validate_registers(self, diagnostics:Diagnostics, jobs:int=1):
+  """Run the per-register checks in a single loop over the registers and array prototypes, in chunks checked by worker processes for jobs > 1."""
+  global _checked_registers
+  registers = [*self.registers, *self.get_array_prototype_registers()]
+  checks    = _register_checks(self)
+  # The workers are forked to share the elaborated bank without serializing it
+  if jobs <= 1 or len(registers) < jobs or 'fork' not in get_all_start_methods():
+    results = [_run_register_checks(registers, len(self.registers), checks, 0, len(registers))]
+  else:
+    chunk_size = ceil(len(registers) / jobs)
+    bounds     = [(start, min(start + chunk_size, len(registers))) for start in range(0, len(registers), chunk_size)]
+    _checked_registers = (registers, len(self.registers), checks)
+    try:
+      with ProcessPoolExecutor(max_workers=len(bounds), mp_context=get_context('fork')) as executor:
+        results = list(executor.map(_run_register_checks_chunk, bounds))
+    finally:
+      _checked_registers = None
+  # Merged by check then by chunk, in the same order as a serial run
+  for check_index in range(len(checks)):
+    for chunk_entries in results:
+      diagnostics.extend(chunk_entries[check_index])
+
+
+
+def validate(self, max_errors:Optional[int]=None, sink=render_diagnostics, jobs:int=1) -> Diagnostics:
+  """Validate the data structure after elaboration and before generation, optional but highly recommended. Return the diagnostics, stopping after max_errors errors, and pass them to the sink, the terminal renderer by default or None for no output. The register checks are split between jobs worker processes."""
+  diagnostics = Diagnostics(max_errors)
+  try:
+    _validate_symbol_conflicts(self, diagnostics)
+    _validate_address_conflicts(self, diagnostics)
+    _validate_region_overlaps(self, diagnostics)
+    _validate_registers(self, diagnostics, jobs)
+  # The diagnostics are flagged as truncated
+  except DiagnosticLimitReached:
+    pass
+  if sink is not None:
+    sink(diagnostics)
+  return diagnostics
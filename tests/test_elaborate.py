@@ -0,0 +1,406 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Incremental elaboration tests, each edit of an elaborated    ║
+# ║              register bank is compared against a fresh elaboration of the ║
+# ║              same edited configuration. Tests of the elaboration walks,   ║
+# ║              array views, lookups, traversals and field table.            ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import pytest
+from omnicores_register import (
+  RegisterBank,
+  RegisterFile,
+  Register,
+  Field,
+  SoftwareAccessType,
+  SoftwareReadBehavior,
+  HardwareWriteOptions,
+)
+from omnicores_register.enums import PackingPolicy
+from omnicores_register.component_view import ComponentView
+from omnicores_register.elaborate import elaboration_passes, _schedule_walks
+import omnicores_register.traversal as traversal_module
+
+
+
+def build_bank():
+  """Return a register bank covering the fields, nested files and arrays."""
+  bank = RegisterBank("test")
+  bank.add(Register("ctrl", fields=[
+    Field("enable", width=4),
+    Field("mode",   width=2),
+  ]))
+  bank.add(Register("status", fields=[Field("ready", width=1)]))
+  bank.add(Register("once"))
+  block = RegisterFile("block")
+  block.add(Register("a"))
+  block.add(Register("b"))
+  block.add(Register("c"))
+  inner = RegisterFile("inner")
+  inner.add(Register("x"))
+  inner.add(Register("y"))
+  inner.add(Register("z"))
+  block.add(inner)
+  bank.add(block)
+  port = RegisterFile("port")
+  port.add(Register("p0"))
+  port.add(Register("p1"))
+  port.add(Register("p2"))
+  bank.add(port.as_array(2))
+  return bank
+
+
+
+def find(bank, path):
+  """Return a component of the bank by its path of names, the arrays by the name of their prototype."""
+  component = bank
+  for name in path.split('/'):
+    component = next(child for child in component.components if getattr(child, 'prototype', child).name == name)
+  return component
+
+
+
+def snapshot(bank):
+  """Return the elaborated state of the bank compared between the elaborations."""
+  registers = [
+    (
+      register.hierarchical_name,
+      register.address,
+      register.software_access,
+      register.hardware_access,
+      register.has_sw_read_side_effect,
+      [(field.name, field.offset, field.software_access, field.sw_read_behavior, field.sw_read_side_effect_init) for field in register.fields],
+    )
+    for register in bank.registers
+  ]
+  files = [(file.hierarchical_name, file.address, file.size, file.packing) for file in bank.files]
+  return registers, files, bank.has_sw_read_side_effect, bank.has_sw_write_once, bank.address_width
+
+
+
+def widen_field(bank):
+  find(bank, 'ctrl').fields[0].width = 8
+
+def read_only_register(bank):
+  find(bank, 'ctrl').software_access = SoftwareAccessType.READ_ONLY
+
+def read_only_fields(bank):
+  for field in find(bank, 'ctrl').fields:
+    field.software_access = SoftwareAccessType.READ_ONLY
+
+def pack_bank(bank):
+  bank.packing = PackingPolicy.POWER_OF_TWO
+
+def pack_file(bank):
+  find(bank, 'block').packing = PackingPolicy.POWER_OF_TWO
+
+def read_clears(bank):
+  find(bank, 'status').fields[0].sw_read_behavior = SoftwareReadBehavior.READ_CLEARS
+
+def write_once(bank):
+  find(bank, 'once').software_access = SoftwareAccessType.WRITE_ONCE
+
+def add_field(bank):
+  find(bank, 'ctrl').add_field(Field("extra", width=3))
+
+edits = [widen_field, read_only_register, read_only_fields, pack_bank, pack_file, read_clears, write_once, add_field]
+
+
+
+def fresh_snapshot(*edits):
+  """Return the state of a bank elaborated once after the edits."""
+  bank = build_bank()
+  for edit in edits:
+    edit(bank)
+  bank.elaborate()
+  return snapshot(bank)
+
+
+
+@pytest.mark.parametrize('edit', edits)
+def test_edit(edit):
+  bank = build_bank()
+  bank.elaborate()
+  edit(bank)
+  bank.elaborate()
+  assert snapshot(bank) == fresh_snapshot(edit)
+
+
+
+@pytest.mark.parametrize('edit', edits)
+def test_edit_parallel(edit):
+  bank = build_bank()
+  bank.elaborate(jobs=2)
+  edit(bank)
+  bank.elaborate(jobs=2)
+  assert snapshot(bank) == fresh_snapshot(edit)
+
+
+
+def test_fused_walks():
+  bank = build_bank()
+  # The structure passes and the component passes each share a single walk
+  assert len(_schedule_walks(bank, dict.fromkeys(elaboration_passes, 0))) == 2
+  bank.elaborate()
+  fresh = bank.elaboration_stats
+  assert list(fresh) == list(elaboration_passes) and fresh['addresses'] > 0
+  # Nothing is touched without changes, only the changed register after an edit
+  bank.elaborate()
+  assert not any(bank.elaboration_stats.values())
+  read_only_register(bank)
+  bank.elaborate()
+  assert 0 < bank.elaboration_stats['access_policies'] < fresh['access_policies']
+
+
+
+def test_array_views():
+  bank = build_bank()
+  bank.elaborate()
+  array = find(bank, 'port')
+  elements = [register for register in bank.registers if register.hierarchical_name.startswith("port_")]
+  assert [register.hierarchical_name for register in elements] == [f"port_{index}__p{register}" for index in range(2) for register in range(3)]
+  # The elements share the configuration of the prototype and are placed by the array stride
+  for position, register in enumerate(elements):
+    index, prototype = divmod(position, 3)
+    assert isinstance(register, ComponentView)
+    assert register.fields is array.prototype.components[prototype].fields
+    assert register.address == array.prototype.components[prototype].address + index * array.stride
+  files = [file for file in bank.files if isinstance(file, ComponentView)]
+  assert [(file.hierarchical_name, file.is_array_element, file.array_index) for file in files] == [("port_0", True, 0), ("port_1", True, 1)]
+  with pytest.raises(AttributeError):
+    elements[0].name = "renamed"
+
+
+
+def test_lookup():
+  bank = build_bank()
+  bank.elaborate()
+  # Every register is found by its address and its hierarchical name
+  for register in bank.registers:
+    assert bank.find_by_path(register.hierarchical_name) is register
+    found = bank.find_by_address(register.address)
+    assert (found[0] if isinstance(found, tuple) else found).hierarchical_name == register.hierarchical_name
+  assert bank.find_by_path("block__inner") is find(bank, 'block/inner')
+  assert bank.find_by_path("missing") is None
+  # The elements of a file array are reported with their index
+  element = bank.find_by_path("port_1__p2")
+  assert bank.find_by_address(element.address)[1] == 1
+  assert bank.find_by_address(-1) is None
+
+
+
+def test_slots():
+  bank = build_bank()
+  bank.elaborate()
+  # The components store their attributes in slots, without a dictionary per instance
+  for component in (bank, find(bank, 'ctrl'), find(bank, 'ctrl').fields[0], find(bank, 'block'), find(bank, 'port'), *bank.registers, *bank.files):
+    assert not hasattr(component, '__dict__')
+  with pytest.raises(AttributeError):
+    find(bank, 'ctrl').undeclared = True
+
+
+
+def test_parallel_elaboration():
+  serial, parallel = build_bank(), build_bank()
+  read_clears(serial)
+  read_clears(parallel)
+  serial.elaborate()
+  inner = find(parallel, 'block/inner')
+  parallel.elaborate(jobs=2)
+  # The results of the worker processes are applied to the components of the bank
+  assert find(parallel, 'block/inner') is inner and inner.parent is find(parallel, 'block')
+  assert snapshot(parallel) == snapshot(serial)
+
+
+
+traversals = ['files_deep', 'registers_deep', 'files_postorder', 'components_deep', 'array_prototype_registers', 'array_prototype_files', 'arrays_deep', 'register_macros_ordered']
+
+@pytest.mark.parametrize('traversal', traversals)
+def test_lazy_traversal(traversal):
+  bank = build_bank()
+  bank.elaborate()
+  # The generators yield the components of the lists in the same order
+  for container in (bank, find(bank, 'block')):
+    assert list(getattr(container, f'iter_{traversal}')()) == list(getattr(container, f'get_{traversal}')())
+  assert list(getattr(traversal_module, f'iter_{traversal}')(bank)) == list(getattr(bank, f'get_{traversal}')())
+
+
+
+def test_lazy_traversal_early_stop():
+  bank = build_bank()
+  bank.elaborate()
+  # The walk stops at the first match without visiting the rest of the hierarchy
+  registers = traversal_module.iter_registers_deep(bank)
+  assert next(register for register in registers if register.name == "a") is find(bank, 'block/a')
+  assert next(registers) is find(bank, 'block/b')
+
+
+
+def test_widen_field_offset():
+  bank = build_bank()
+  bank.elaborate()
+  widen_field(bank)
+  bank.elaborate()
+  assert find(bank, 'ctrl').fields[1].offset == 8
+
+
+
+def test_unpack_bank():
+  bank = build_bank()
+  pack_bank(bank)
+  bank.elaborate()
+  bank.packing = PackingPolicy.DENSE
+  bank.elaborate()
+  assert snapshot(bank) == fresh_snapshot()
+
+
+
+def test_revert_read_behavior():
+  bank = build_bank()
+  read_clears(bank)
+  write_once(bank)
+  bank.elaborate()
+  assert bank.has_sw_read_side_effect and bank.has_sw_write_once
+  find(bank, 'status').fields[0].sw_read_behavior = SoftwareReadBehavior.NORMAL
+  find(bank, 'once').software_access = SoftwareAccessType.READ_WRITE
+  bank.elaborate()
+  assert not bank.has_sw_read_side_effect and not bank.has_sw_write_once
+  assert snapshot(bank) == fresh_snapshot()
+
+
+
+def test_empty_field_options():
+  bank = RegisterBank("test")
+  bank.add(Register("ctrl", hw_write_options=HardwareWriteOptions.ENABLE, fields=[Field("enable", width=1, hw_write_options=HardwareWriteOptions(0))]))
+  # Empty options inherit the options of the register
+  for _ in range(2):
+    bank.elaborate()
+    assert find(bank, 'ctrl').fields[0].hw_write_options == HardwareWriteOptions.ENABLE
+
+
+
+def test_successive_edits():
+  bank = build_bank()
+  bank.elaborate()
+  for index, edit in enumerate(edits):
+    edit(bank)
+    bank.elaborate()
+    assert snapshot(bank) == fresh_snapshot(*edits[:index + 1])
+
+
+
+def test_shape_stats():
+  def build_shared_bank():
+    bank = RegisterBank("shared")
+    # Distinct top-level files sharing the shape of a nested file
+    for name, width in (("first", 32), ("second", 16)):
+      block = RegisterFile(name)
+      block.add(Register(name, width=width))
+      shared = RegisterFile("shared")
+      shared.add(Register("a"))
+      shared.add(Register("b"))
+      block.add(shared)
+      bank.add(block)
+    return bank
+  serial, parallel = build_shared_bank(), build_shared_bank()
+  serial.elaborate()
+  parallel.elaborate(jobs=2)
+  assert serial.shape_stats == parallel.shape_stats == {'instances': 4, 'unique_shapes': 3}
+
+
+
+def test_shape_stats_arrays():
+  def build_array_bank():
+    bank = RegisterBank("arrays")
+    # Arrays of the same file shape, only the first one is offloaded
+    for name in ("first", "second"):
+      port = RegisterFile("port")
+      port.add(Register(name))
+      bank.add(port.as_array(2))
+    block = RegisterFile("block")
+    block.add(Register("a", width=16))
+    bank.add(block)
+    bank.add(Register("r").as_array(3))
+    return bank
+  serial, parallel = build_array_bank(), build_array_bank()
+  serial.elaborate()
+  parallel.elaborate(jobs=2)
+  assert serial.shape_stats == parallel.shape_stats == {'instances': 3, 'unique_shapes': 2}
+  assert snapshot(serial) == snapshot(parallel)
+
+
+
+def test_memoized_traversals():
+  bank, other = build_bank(), build_bank()
+  bank.elaborate()
+  registers = bank.get_registers_deep()
+  # Shared without copying until the next elaboration of the same bank
+  assert bank.get_registers_deep() is registers
+  assert bank.traversal_stats == {'hits': 1, 'misses': 1}
+  other.elaborate()
+  assert bank.get_registers_deep() is registers
+  assert other.traversal_stats == {'hits': 0, 'misses': 0}
+  widen_field(bank)
+  bank.elaborate()
+  assert bank.get_registers_deep() is not registers
+
+
+
+def test_layout_per_bank():
+  bank, other = build_bank(), build_bank()
+  bank.elaborate()
+  register = find(bank, 'block/inner').components[0]
+  address  = register.address
+  # Building and elaborating another bank keeps the cached addresses of the first one
+  other.elaborate()
+  other.add(Register("extra"))
+  assert register._cached_epoch == bank._layout_epoch
+  assert register.address == address
+  # A change of placement in the bank invalidates its cached addresses
+  find(bank, 'block').address = find(bank, 'block').address + 0x100
+  assert register.address == address + 0x100
+
+
+
+def test_address_of_unplaced_parent():
+  block = RegisterFile("block")
+  register = Register("a")
+  block.add(register)
+  with pytest.raises(ValueError):
+    register.address = 0x10
+
+
+
+def test_field_table():
+  pytest.importorskip('numpy')
+  bank = build_bank()
+  read_clears(bank)
+  bank.add(Register("wide", width=64, reset_value=None, fields=[Field("low", width=32), Field("high", offset=40, width=16)]))
+  bank.elaborate(columnar=True)
+  table = bank.field_table
+  # One row per field, or per register without fields, the array elements stand for their prototype
+  assert table.registers == [register for register in bank.registers if not isinstance(register, ComponentView)] + list(bank.get_array_prototype_registers())
+  assert table.components == [component for register in table.registers for component in register.fields or (register,)]
+  for index, register in enumerate(table.registers):
+    first, last = table.register_rows[register]
+    assert table.components[first:last] == list(register.fields or (register,))
+    assert table.register_width[index] == register.width
+    for row in range(first, last):
+      component = table.components[row]
+      assert table.register_index[row]    == index
+      assert table.is_field[row]          == (component is not register)
+      assert table.offset[row]            == (component.offset if component is not register else 0)
+      assert table.width[row]             == component.width
+      assert table.has_reset[row]         == (component.reset_value is not None)
+      assert table.software_access[row]   == component.software_access.value
+      assert table.hardware_access[row]   == component.hardware_access.value
+      assert table.sw_write_behavior[row] == component.sw_write_behavior.value
+      assert table.sw_read_behavior[row]  == component.sw_read_behavior.value
+      assert table.hw_write_options[row]  == component.hw_write_options.value
+      assert table.hw_read_options[row]   == component.hw_read_options.value
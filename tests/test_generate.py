@@ -0,0 +1,283 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Generation tests of the selected targets rendered in         ║
+# ║              parallel, of the render engines reused across the register   ║
+# ║              banks of a process, of the manifest skipping the unchanged   ║
+# ║              outputs across processes, and of the sharded, streamed,      ║
+# ║              profiled and paginated outputs and search index.             ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+import os
+import re
+import sys
+import json
+import shutil
+import importlib.metadata
+import subprocess
+from pathlib import Path
+import pytest
+from omnicores_register import RegisterBank, RegisterFile, Register, Field, generate_many
+from omnicores_register.documentation import DocumentationPages
+from omnicores_register.search_index import search_index, search_index_source
+from omnicores_register.sharding import register_shards
+import omnicores_register.streaming as streaming
+import omnicores_register.generate as generation
+
+
+
+# Script building a bank with an inherited file packing in a new process, then
+# printing its digest or generating it
+_process_script = '''
+import sys
+from omnicores_register import RegisterBank, RegisterFile, Register, Field
+from omnicores_register.manifest import bank_digest
+bank = RegisterBank("test")
+bank.add(Register("ctrl", fields=[Field("enable", width=1), Field("mode", width=3)]))
+block = RegisterFile("block")
+block.add(Register("status"))
+bank.add(block)
+bank.elaborate()
+if sys.argv[1] == 'digest':
+  print(bank_digest(bank))
+else:
+  bank.generate(targets=['package', 'register_map'])
+'''
+
+
+
+def build_bank(name):
+  """Return a small elaborated register bank."""
+  bank = RegisterBank(name)
+  bank.add(Register("ctrl", fields=[Field("enable", width=1), Field("mode", width=3)]))
+  bank.add(Register("status"))
+  bank.elaborate()
+  return bank
+
+
+
+def run_process(action, cwd):
+  """Return the output of the test script run in a new process, importing this copy of the library."""
+  environment = dict(os.environ, PYTHONPATH=str(Path(generation.__file__).parents[1]))
+  return subprocess.run([sys.executable, '-c', _process_script, action], cwd=cwd, env=environment, capture_output=True, text=True, check=True).stdout
+
+
+
+def test_reused_render_engine(tmp_path, monkeypatch, capsys):
+  monkeypatch.chdir(tmp_path)
+  assert not build_bank("first").generate(targets=['register_map'])
+  assert not build_bank("second").generate(targets=['register_map'])
+  assert 'overwritten' not in capsys.readouterr().out
+  # The engines kept for the next generations do not keep the banks alive
+  assert all('register_bank' not in render_engine.variables for render_engine in generation._render_engines.values())
+
+
+
+def test_generate_many(tmp_path, monkeypatch, capsys):
+  monkeypatch.chdir(tmp_path)
+  banks   = [build_bank(f"bank_{index}") for index in range(3)]
+  summary = generate_many(banks, targets=['register_map'], jobs=2)
+  assert list(summary) == [bank.name for bank in banks]
+  assert not any(result['failures'] for result in summary.values())
+  assert 'overwritten' not in capsys.readouterr().out
+  assert all((tmp_path / f"{bank.name}__register_bank" / f"{bank.name}__register_bank.regmap").is_file() for bank in banks)
+
+
+
+def test_parallel_generation(tmp_path, monkeypatch):
+  targets = ['register_bank', 'package', 'testbench', 'macros', 'register_map']
+  outputs = []
+  # The targets rendered by the worker processes match the serial rendering
+  for jobs in (1, 2):
+    (tmp_path / str(jobs)).mkdir()
+    monkeypatch.chdir(tmp_path / str(jobs))
+    assert not build_bank("test").generate(targets=targets, jobs=jobs)
+    output_folder = tmp_path / str(jobs) / "test__register_bank"
+    outputs.append({path.name: path.read_bytes() for path in output_folder.iterdir() if path.suffix != '.json'})
+  assert outputs[0] == outputs[1] and len(outputs[0]) == len(targets)
+
+
+
+def test_selected_targets(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  assert generation.select_targets(['register_map', 'package']) == ['package', 'register_map']
+  with pytest.raises(ValueError):
+    generation.select_targets(['package', 'unknown'])
+  # Only the selected outputs are written, with the types used by their templates
+  bank = build_bank("test")
+  assert not bank.generate(targets=['register_map', 'package'])
+  assert sorted(path.name for path in (tmp_path / "test__register_bank").iterdir() if path.suffix != '.json') == ["test__register_bank.package.sv", "test__register_bank.regmap"]
+  assert 'Register' not in generation.create_render_engine(bank, ['package']).variables
+  assert 'Register' in generation.create_render_engine(bank, ['testbench']).variables
+
+
+
+def test_digest_across_processes(tmp_path):
+  assert run_process('digest', tmp_path) == run_process('digest', tmp_path)
+
+
+
+def test_no_op_generation_across_processes(tmp_path):
+  assert 'Successfully generated' in run_process('generate', tmp_path)
+  output = run_process('generate', tmp_path)
+  assert 'is up to date' in output
+  assert 'unchanged' not in output and 'Successfully generated' not in output
+
+
+
+def test_testbench_shards(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  bank = RegisterBank("test")
+  for index in range(5):
+    bank.add(Register(f"r{index}"))
+  bank.elaborate()
+  # The registers are partitioned once for all the shards
+  calls = []
+  def counted_register_shards(*args):
+    calls.append(args)
+    return register_shards(*args)
+  monkeypatch.setattr(generation, 'register_shards', counted_register_shards)
+  assert not bank.generate(targets=['testbench'], testbench_shards=2, jobs=2)
+  assert len(calls) == 1
+  output_folder = tmp_path / "test__register_bank"
+  shard_list    = json.loads((output_folder / "test__register_bank.testbench_shards.json").read_text())
+  assert [shard['registers'] for shard in shard_list['shards']] == [2, 3]
+  assert all((output_folder / shard['file']).is_file() for shard in shard_list['shards'])
+  # The shards of a previous shard count are removed
+  assert not bank.generate(targets=['testbench'], testbench_shards=1)
+  assert not (output_folder / "test__register_bank.testbench_shard_1.sv").exists()
+
+
+
+def test_tool_versions_read_once(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  build_bank("test").generate(targets=['register_map'])
+  # The versions of the installed packages are read once per process
+  calls = []
+  monkeypatch.setattr(importlib.metadata, 'version', lambda package: calls.append(package))
+  build_bank("test").generate(targets=['package', 'register_map'], force=True)
+  assert not calls
+
+
+
+def test_streaming_generation(tmp_path, monkeypatch, capsys):
+  monkeypatch.chdir(tmp_path)
+  targets = ['register_bank', 'package', 'testbench', 'macros']
+  bank    = build_bank("test")
+  assert not bank.generate(targets=targets)
+  output_folder = tmp_path / "test__register_bank"
+  buffered = {path.name: path.read_text() for path in output_folder.iterdir() if path.suffix != '.json'}
+  capsys.readouterr()
+  # Streamed in small chunks, the outputs are rendered again and match the buffered ones
+  monkeypatch.setattr(streaming, 'stream_chunk_size', 64)
+  assert not bank.generate(targets=targets, streaming=True)
+  assert capsys.readouterr().out.count("is unchanged") == len(targets)
+  assert {name: (output_folder / name).read_text() for name in buffered} == buffered
+
+
+
+def test_profiled_generation(tmp_path, monkeypatch, capsys):
+  monkeypatch.chdir(tmp_path)
+  targets = ['register_bank', 'register_map']
+  bank    = build_bank("test")
+  assert not bank.generate(targets=targets)
+  capsys.readouterr()
+  # The profiled generation renders the up to date outputs again
+  assert not bank.generate(targets=targets, profile=True)
+  assert 'is up to date' not in capsys.readouterr().out
+  output_folder = tmp_path / "test__register_bank"
+  profile = json.loads((output_folder / "test__register_bank.profile.json").read_text())
+  assert set(profile['targets']) == {"test__register_bank.sv", "test__register_bank.regmap"}
+  report = profile['targets']["test__register_bank.sv"]
+  assert report['output_bytes'] == (output_folder / "test__register_bank.sv").stat().st_size
+  assert report['peak_memory'] > 0 and report['wall_time'] > 0
+  assert any(section['statement'] == 'filter restructure' for section in report['sections'])
+  assert report['calls']
+
+
+
+def build_paged_bank():
+  """Return an elaborated register bank with top-level registers, a register file and an array."""
+  bank = RegisterBank("test")
+  bank.add(Register("ctrl"))
+  block = RegisterFile("block")
+  block.add(Register("a"))
+  bank.add(block)
+  port = RegisterFile("port")
+  port.add(Register("p"))
+  bank.add(port.as_array(2))
+  bank.elaborate()
+  return bank
+
+
+
+def test_documentation_pages():
+  bank  = build_paged_bank()
+  pages = DocumentationPages(bank)
+  # One page per top-level file or array, the top-level registers on the index
+  assert [pages.page_files[id(page)] for page in pages.pages] == ["test__register_bank.block.html", "test__register_bank.port.html"]
+  assert pages.page_of(bank.find_by_path("ctrl"))     == "test__register_bank.html"
+  assert pages.page_of(bank.find_by_path("block__a")) == "test__register_bank.block.html"
+  assert pages.components == [bank.find_by_path("ctrl")]
+  assert DocumentationPages(bank, 1).components == [bank.components[2]]
+  # The shared assets, the search index, the index page and the pages
+  outputs = generation._target_outputs(bank, 'documentation', documentation_pages=True)
+  assert [output_path.name for _, output_path, _ in outputs] == [
+    "test__register_bank.documentation.css",
+    "test__register_bank.documentation.js",
+    "test__register_bank.documentation_search.js",
+    "test__register_bank.html",
+    "test__register_bank.block.html",
+    "test__register_bank.port.html",
+  ]
+
+
+
+def build_nested_bank():
+  """Return an elaborated register bank with a register file nested at the start of another one."""
+  bank  = RegisterBank("test")
+  outer = RegisterFile("outer")
+  inner = RegisterFile("inner")
+  inner.add(Register("a"))
+  inner.add(Register("b"))
+  outer.add(inner)
+  for name in ("x", "y", "z"):
+    outer.add(Register(name))
+  bank.add(outer)
+  bank.add(Register("last"))
+  bank.elaborate()
+  return bank
+
+
+
+def test_search_index():
+  bank  = build_nested_bank()
+  index = search_index(bank)
+  assert index['addresses'] == sorted(index['addresses'])
+  # Furthest end address up to each component
+  ends = [address + size for address, size in zip(index['addresses'], index['sizes'])]
+  assert index['reaches'] == [max(ends[:entry + 1]) for entry in range(len(ends))]
+  assert index['terms'] == sorted(index['terms'])
+  assert all(term in index['paths'][entry].lower() for term, entry in zip(index['terms'], index['termEntries']))
+
+
+
+def test_search_addresses(tmp_path):
+  node = shutil.which('node')
+  if node is None:
+    pytest.skip("Node.js is not available to run the search script.")
+  # Search functions of the documentation script, run on the index of the bank
+  script   = (Path(generation.__file__).parent / 'templates' / 'documentation.js.j2').read_text()
+  search   = re.search(r'^var searchLimit.*?;$', script, re.MULTILINE).group(0)
+  search  += ''.join(re.search(rf'^function {name}\(.*?^}}$', script, re.MULTILINE | re.DOTALL).group(0) for name in ('lowerBound', 'searchAddresses'))
+  search  += f"var index = {search_index_source(build_nested_bank())};"
+  search  += "console.log(JSON.stringify(searchAddresses(index, 0x10, 0x10).map(function(match) { return index.paths[match.entry]; })));"
+  (tmp_path / "search.js").write_text(search)
+  result = subprocess.run([node, tmp_path / "search.js"], capture_output=True, text=True, check=True).stdout
+  # The file starting before the address still contains it past the end of its nested file
+  assert json.loads(result) == ["outer", "outer__z"]
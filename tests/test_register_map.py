@@ -0,0 +1,76 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Binary register map tests, the records read back from the    ║
+# ║              written file are compared against the elaborated bank.       ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from omnicores_register import (
+  RegisterBank,
+  RegisterFile,
+  Register,
+  Field,
+  RegisterMap,
+)
+from omnicores_register.register_map import write_register_map
+
+
+
+def build_bank():
+  """Return a register bank with reset values wider than 64 bits."""
+  bank = RegisterBank("test")
+  bank.add(Register("ctrl", fields=[Field("enable", width=1, reset_value=1), Field("mode", width=3, reset_value=5)]))
+  bank.add(Register("wide", width=128, reset_value=1 << 100))
+  bank.add(Register("wide_fields", width=128, fields=[
+    Field("low",  width=64, reset_value=0xFFFF_FFFF_FFFF_FFFF),
+    Field("high", width=64, reset_value=0x8000_0000_0000_0000),
+  ]))
+  bank.add(Register("unset", reset_value=None))
+  block = RegisterFile("block")
+  block.add(Register("a", reset_value=7))
+  bank.add(block.as_array(2))
+  bank.elaborate()
+  return bank
+
+
+
+def mapped_register(register_map, name):
+  """Return the register of a register map by its name."""
+  return next(register for register in register_map if register.name == name)
+
+
+
+def test_round_trip(tmp_path):
+  bank = build_bank()
+  write_register_map(bank, tmp_path / "test.regmap")
+  with RegisterMap(tmp_path / "test.regmap") as register_map:
+    assert len(register_map) == len(bank.registers)
+    for mapped, register in zip(register_map, bank.registers):
+      assert mapped.hierarchical_name == register.hierarchical_name
+      assert mapped.address           == register.address
+      assert mapped.width             == register.width
+      assert mapped.reset_value       == register.reset_value
+      assert [(field.name, field.offset, field.reset_value) for field in mapped.fields] == [(field.name, field.offset, field.reset_value) for field in register.fields]
+
+
+
+def test_wide_reset_value(tmp_path):
+  bank = build_bank()
+  write_register_map(bank, tmp_path / "test.regmap")
+  with RegisterMap(tmp_path / "test.regmap") as register_map:
+    assert mapped_register(register_map, "wide").reset_value == 1 << 100
+    assert [field.reset_value for field in mapped_register(register_map, "wide_fields").fields] == [0xFFFF_FFFF_FFFF_FFFF, 0x8000_0000_0000_0000]
+
+
+
+def test_generate_wide_reset_value(tmp_path, monkeypatch):
+  bank = build_bank()
+  monkeypatch.chdir(tmp_path)
+  assert not bank.generate(targets=['register_map'])
+  with RegisterMap(tmp_path / "test__register_bank" / "test__register_bank.regmap") as register_map:
+    assert mapped_register(register_map, "wide").reset_value == 1 << 100
@@ -0,0 +1,140 @@
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║ Project:     OmniCores-Registers                                          ║
+# ║ Author:      Louis Duret-Robert - louisduret@gmail.com                    ║
+# ║ Website:     louis-dr.github.io                                           ║
+# ║ License:     MIT License                                                  ║
+# ╟───────────────────────────────────────────────────────────────────────────╢
+# ║ Description: Validation tests of the region overlaps across the           ║
+# ║              hierarchy, of the diagnostics limit and error count, and     ║
+# ║              of the checks split between worker processes.                ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+
+
+from omnicores_register import RegisterBank, RegisterFile, Register, Field, SoftwareAccessType, HardwareWriteOptions
+
+
+
+def overlaps(diagnostics):
+  """Return the messages of the region overlap diagnostics."""
+  return [diagnostic.message for diagnostic in diagnostics if diagnostic.code == 'region-overlap']
+
+
+
+def test_overlap_across_containers():
+  bank = RegisterBank("test")
+  # The file is sized up to its last placed register, the first one is outside its region
+  outer = RegisterFile("outer")
+  outer.add(Register("outside", offset=0x10))
+  outer.add(Register("inside",  offset=0x0))
+  bank.add(outer)
+  other = RegisterFile("other", offset=0x10)
+  other.add(Register("a"))
+  bank.add(other)
+  bank.elaborate()
+  messages = overlaps(bank.validate(sink=None))
+  assert len(messages) == 1
+  assert "outer__outside" in messages[0] and "'other'" in messages[0]
+
+
+
+def test_overlap_reported_once():
+  bank = RegisterBank("test")
+  first = RegisterFile("first")
+  for name in ("a", "b", "c"):
+    first.add(Register(name))
+  bank.add(first)
+  second = RegisterFile("second", offset=0x4)
+  for name in ("d", "e"):
+    second.add(Register(name))
+  bank.add(second)
+  bank.elaborate()
+  messages = overlaps(bank.validate(sink=None))
+  assert len(messages) == 1
+  assert "'first'" in messages[0] and "'second'" in messages[0]
+
+
+
+def test_nested_overlap_reported_once():
+  bank = RegisterBank("test")
+  for name, offset in (("first", 0x0), ("second", 0x8)):
+    block = RegisterFile(name, offset=offset)
+    inner = RegisterFile("inner")
+    for register in ("a", "b", "c", "d"):
+      inner.add(Register(register))
+    block.add(Register("x"))
+    block.add(inner)
+    bank.add(block)
+  bank.elaborate()
+  messages = overlaps(bank.validate(sink=None))
+  assert len(messages) == 1
+  assert "'first'" in messages[0] and "'second'" in messages[0]
+
+
+
+def test_no_overlap():
+  bank = RegisterBank("test")
+  block = RegisterFile("block")
+  inner = RegisterFile("inner")
+  inner.add(Register("a"))
+  inner.add(Register("b"))
+  block.add(inner)
+  block.add(Register("c"))
+  bank.add(block.as_array(2))
+  bank.add(Register("d"))
+  bank.elaborate()
+  assert not overlaps(bank.validate(sink=None))
+
+
+
+def test_max_errors():
+  def build_conflicting_bank():
+    bank = RegisterBank("test")
+    for name in ("a", "b", "c"):
+      bank.add(Register(name, offset=0x0))
+    bank.elaborate()
+    return bank
+  error_count = int(build_conflicting_bank().validate(sink=None))
+  assert error_count > 1
+  # Only truncated when an error was discarded
+  diagnostics = build_conflicting_bank().validate(max_errors=error_count, sink=None)
+  assert int(diagnostics) == error_count and not diagnostics.truncated
+  diagnostics = build_conflicting_bank().validate(max_errors=error_count - 1, sink=None)
+  assert int(diagnostics) == error_count - 1 and diagnostics.truncated
+
+
+
+def test_error_count_comparisons():
+  bank = RegisterBank("test")
+  bank.add(Register("a"))
+  bank.add(Register("b"))
+  bank.elaborate()
+  diagnostics = bank.validate(sink=None)
+  assert diagnostics == 0 and not diagnostics > 0 and len(diagnostics) == 0
+  conflicting = RegisterBank("test")
+  conflicting.add(Register("a", offset=0x0))
+  conflicting.add(Register("b", offset=0x0))
+  conflicting.elaborate()
+  diagnostics = conflicting.validate(sink=None)
+  assert diagnostics > 0 and diagnostics == len(diagnostics) == int(diagnostics) == len(diagnostics.errors)
+
+
+
+def test_parallel_validation():
+  def build_invalid_bank():
+    bank = RegisterBank("test")
+    for index in range(4):
+      bank.add(Register(f"r{index}", fields=[Field("a", width=8), Field("b", offset=4, width=30)]))
+    bank.add(Register("ro", software_access=SoftwareAccessType.READ_ONLY, hw_write_options=HardwareWriteOptions.ENABLE))
+    port = RegisterFile("port")
+    port.add(Register("p", fields=[Field("a", width=8), Field("b", offset=4, width=8)]))
+    bank.add(port.as_array(3))
+    bank.elaborate()
+    return bank
+  serial = build_invalid_bank().validate(sink=None)
+  assert {diagnostic.code for diagnostic in serial} >= {'field-overlap', 'field-out-of-range'}
+  # The checks split between the workers report the same diagnostics in the same order
+  for max_errors in (None, 3):
+    expected = build_invalid_bank().validate(max_errors=max_errors, sink=None)
+    parallel = build_invalid_bank().validate(max_errors=max_errors, sink=None, jobs=2)
+    assert parallel.as_dicts() == expected.as_dicts() and parallel.truncated == expected.truncated